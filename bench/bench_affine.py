@@ -0,0 +1,56 @@
+"""Timing of transforming coordinates to document space through nested groups: per point
+vec2_rotate / translation / scaling chain against one composed CTM applied in bulk.
+
+Run from the repository root:  python -m bench.bench_affine [npoints]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import Pt, Rotate, Scale, Trans
+from rpSVG.Geometry import vec2_rotate
+from rpSVG.SVGLib import Group, Polyline, Re, SVGContent
+
+def run(p_npoints: int):
+
+	rng = np.random.default_rng(1)
+	coords = rng.uniform(0, 100, (p_npoints, 2))
+
+	sc = SVGContent(Re(0, 0, 1000, 1000))
+	g = sc.addChild(Group())
+	g.addTransform(Trans(10, 20))
+	g.addTransform(Scale(2))
+	g2 = g.addChild(Group())
+	g2.addTransform(Rotate(30, 5, 5))
+	pl = g2.addChild(Polyline())
+	pl.addTransform(Rotate(-12.5))
+
+	print(f"{p_npoints} points, 3 levels of transforms")
+
+	t0 = perf_counter()
+	ref = []
+	center = Pt(5.0, 5.0)
+	for x, y in coords.tolist():
+		p = vec2_rotate(Pt(x, y), -12.5)
+		p = vec2_rotate(p, 30, center=center)
+		ref.append((p.x * 2 + 10, p.y * 2 + 20))
+	t_chain = perf_counter() - t0
+
+	t0 = perf_counter()
+	res = pl.toDocCoords(coords)
+	t_ctm = perf_counter() - t0
+	assert np.allclose(res, ref)
+
+	t0 = perf_counter()
+	back = pl.fromDocCoords(res)
+	t_inv = perf_counter() - t0
+	assert np.allclose(back, coords)
+
+	print(f"  per point chain:        {t_chain:.3f}s")
+	print(f"  CTM, bulk:              {t_ctm:.4f}s  speedup: {t_chain / t_ctm:.0f}x")
+	print(f"  inverse CTM, bulk:      {t_inv:.4f}s")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,39 @@
+"""Timing of all intersections among N random short segments (density kept constant):
+uniform grid segmentIntersections against testing all pairs (vec2_segment_intersect_array, 
+estimated from a subset of rows beyond a few thousand segments).
+
+Run from the repository root:  python -m bench.bench_allintersections [maxsegments]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Geometry import segmentIntersections, vec2_segment_intersect_array
+
+def run(p_maxsegments: int):
+
+	rng = np.random.default_rng(1)
+	n = 1000
+	while n <= p_maxsegments:
+		side = np.sqrt(n) * 10
+		p0 = rng.uniform(0, side, (n, 2))
+		segs = np.hstack((p0, p0 + rng.normal(0, 6, (n, 2))))
+
+		t0 = perf_counter()
+		i, j, _a, _b, _pts = segmentIntersections(segs)
+		t_grid = perf_counter() - t0
+
+		nrows = min(n, 10 ** 7 // n)
+		t0 = perf_counter()
+		_a, _b, _pts, hit = vec2_segment_intersect_array(segs[:nrows], segs, allpairs=True)
+		t_all = (perf_counter() - t0) * n / nrows
+		hit[np.tril_indices(nrows, 0, n)] = False
+		assert set(zip(*[idx.tolist() for idx in np.nonzero(hit)])) == set((a, b) for a, b in zip(i.tolist(), j.tolist()) if a < nrows)
+
+		print(f"{n:>8} segments, {len(i):>7} intersections   grid: {t_grid:.3f}s   all pairs{'' if nrows == n else ' (estimate)'}: {t_all:.3f}s  speedup: {t_all / t_grid:.0f}x")
+		n *= 10
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,51 @@
+"""Timing of per-object SVGContent.addChild (Circle, Rect, Line) against
+the columnar SVGContainer.addCircles / addRects / addLines bulk API.
+
+Run from the repository root:  python -m bench.bench_bulk [nelements]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Structs import Re
+from rpSVG.SVGLib import Circle, Line, Rect, SVGContent
+from rpSVG.SVGStyleText import Sty
+
+def run(p_nelements: int):
+
+	rng = np.random.default_rng(1)
+	xa = np.round(rng.uniform(0, 1000, p_nelements), 2)
+	ya = np.round(rng.uniform(0, 1000, p_nelements), 2)
+	sa = np.round(rng.uniform(1, 20, p_nelements), 2)
+	sty = Sty('stroke', 'black', 'stroke-width', 1)
+
+	xl, yl, sl = xa.tolist(), ya.tolist(), sa.tolist()
+
+	for name, cls, bulkname, cols in (
+			("circle", Circle, "addCircles", lambda x, y, s: (x, y, s)),
+			("rect", Rect, "addRects", lambda x, y, s: (x, y, s, s)),
+			("line", Line, "addLines", lambda x, y, s: (x, y, s, s))
+		):
+
+		sc_obj = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+		t0 = perf_counter()
+		for args in zip(*cols(xl, yl, sl)):
+			sc_obj.addChild(cls(*args)).setStyle(sty)
+		t_obj = perf_counter() - t0
+
+		sc_bulk = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+		t0 = perf_counter()
+		getattr(sc_bulk, bulkname)(*cols(xa, ya, sa), style=sty)
+		t_bulk = perf_counter() - t0
+
+		assert sc_obj.toBytes() == sc_bulk.toBytes()
+
+		print(f"{p_nelements} {name} elements")
+		print(f"  addChild:      {t_obj:.3f}s  ({1e6 * t_obj / p_nelements:.2f} us/element)")
+		print(f"  {bulkname+':':14} {t_bulk:.3f}s  ({1e6 * t_bulk / p_nelements:.2f} us/element)")
+		print(f"  speedup: {t_obj / t_bulk:.1f}x")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,50 @@
+"""Timing of circle division points: the per point polar2rectDegs / ptAdd / glRd chain
+against circleDividersArray, with cold and cached trigonometric tables, for a radial
+layout with many spokes and for many high-n polygons of varying radius.
+
+Run from the repository root:  python -m bench.bench_circledividers [nspokes]
+"""
+
+import sys
+from time import perf_counter
+
+from rpSVG.Basics import Pt, _circleTables, circleDividersArray, polar2rectDegs, ptAdd, ptRemoveDecsep
+
+def _chain(p_center, p_radius, p_n, p_rot_left=0):
+	step = 360 / p_n
+	return [ptRemoveDecsep(*ptAdd(p_center, polar2rectDegs(i * step + p_rot_left, p_radius))) for i in range(p_n)]
+
+def run(p_nspokes: int):
+
+	ct = Pt(500, 500)
+	print(f"{p_nspokes} spokes")
+
+	t0 = perf_counter()
+	ref = _chain(ct, 480, p_nspokes, -90)
+	t_chain = perf_counter() - t0
+	_circleTables.cache_clear()
+	t0 = perf_counter()
+	res = circleDividersArray(ct, 480, p_nspokes, -90)
+	t_cold = perf_counter() - t0
+	t0 = perf_counter()
+	res = circleDividersArray(ct, 480, p_nspokes, -90)
+	t_warm = perf_counter() - t0
+	assert [tuple(p) for p in ref] == [tuple(p) for p in res.tolist()]
+	print(f"  polar2rectDegs chain:       {t_chain:.4f}s")
+	print(f"  array, cold tables:         {t_cold:.4f}s  speedup: {t_chain / t_cold:.1f}x")
+	print(f"  array, cached tables:       {t_warm:.4f}s  speedup: {t_chain / t_warm:.1f}x")
+
+	npolys = 2000
+	t0 = perf_counter()
+	for i in range(npolys):
+		_chain(ct, 10 + i % 50, 64)
+	t_chain = perf_counter() - t0
+	t0 = perf_counter()
+	for i in range(npolys):
+		circleDividersArray(ct, 10 + i % 50, 64)
+	t_arr = perf_counter() - t0
+	print(f"  {npolys} 64-gons, chain:       {t_chain:.4f}s")
+	print(f"  {npolys} 64-gons, array:       {t_arr:.4f}s  speedup: {t_chain / t_arr:.1f}x")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
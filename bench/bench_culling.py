@@ -0,0 +1,39 @@
+"""Timing and output size of zoomed views of a large document: full serialization against
+serialization culled to a window (toBytes window option).
+
+Run from the repository root:  python -m bench.bench_culling [nelements]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import Env
+from rpSVG.SVGLib import Re, SVGContent
+from rpSVG.SVGStyleText import Sty
+
+def run(p_nelements: int):
+
+	rng = np.random.default_rng(1)
+	half = p_nelements // 2
+	sc = SVGContent(Re(0, 0, 10000, 10000))
+	sc.addRects(rng.uniform(0, 10000, half), rng.uniform(0, 10000, half), rng.uniform(1, 20, half), rng.uniform(1, 20, half),
+		style=Sty("fill", "none", "stroke", "black"))
+	sc.addCircles(rng.uniform(0, 10000, half), rng.uniform(0, 10000, half), rng.uniform(1, 10, half), cls="dots")
+
+	print(f"{2 * half} elements")
+
+	t0 = perf_counter()
+	full = sc.toBytes()
+	print(f"  full document:      {perf_counter() - t0:.3f}s  {len(full) / 1e6:.2f} MB")
+
+	# first view includes spatial index build
+	for i, side in enumerate((1000, 1000, 100)):
+		t0 = perf_counter()
+		out = sc.toBytes(window=Env(5000, 5000, 5000 + side, 5000 + side), margin=2)
+		label = f"{side}x{side} view{' (index build)' if i == 0 else ''}:"
+		print(f"  {label:28s}{perf_counter() - t0:.3f}s  {len(out) / 1e6:.2f} MB")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,46 @@
+"""Timing of ellipse-line intersections for graph edges attached to ellipse nodes:
+ellipseIntersections per edge against ellipseIntersectionsArray, for many lines on one
+rotated ellipse and for one line on many ellipses.
+
+Run from the repository root:  python -m bench.bench_ellipseintersect [nedges]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Geometry import Elpg, Lng, ellipseIntersections, ellipseIntersectionsArray
+
+def run(p_nedges: int):
+
+	rng = np.random.default_rng(1)
+	lines = rng.uniform(-100, 100, (p_nedges, 4))
+	elip = Elpg((3, 4), 20, ry=11, vertang=30)
+
+	print(f"{p_nedges} edges")
+
+	t0 = perf_counter()
+	ref = [ellipseIntersections(Lng(l[:2], l[2:]), elip) for l in lines.tolist()]
+	t_scal = perf_counter() - t0
+	t0 = perf_counter()
+	pa, pb, _valid = ellipseIntersectionsArray(lines, elip)
+	t_arr = perf_counter() - t0
+	assert np.allclose(np.array(ref), np.stack((pa, pb), axis=1), rtol=0, atol=1e-9)
+	print(f"  lines on one ellipse, per call: {t_scal:.3f}s")
+	print(f"  lines on one ellipse, array:    {t_arr:.4f}s  speedup: {t_scal / t_arr:.0f}x")
+
+	ells = np.column_stack((rng.uniform(-50, 50, (p_nedges, 2)), rng.uniform(5, 30, (p_nedges, 2)), rng.choice([0, 15, 90], p_nedges)))
+	line = Lng((-40, -7), (35, 12))
+	t0 = perf_counter()
+	ref = [ellipseIntersections(line, Elpg(e[:2], e[2], ry=e[3], vertang=e[4])) for e in ells.tolist()]
+	t_scal = perf_counter() - t0
+	t0 = perf_counter()
+	pa, pb, _valid = ellipseIntersectionsArray(line, ells)
+	t_arr = perf_counter() - t0
+	assert np.allclose(np.array(ref), np.stack((pa, pb), axis=1), rtol=0, atol=1e-9)
+	print(f"  one line on ellipses, per call: {t_scal:.3f}s")
+	print(f"  one line on ellipses, array:    {t_arr:.4f}s  speedup: {t_scal / t_arr:.0f}x")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
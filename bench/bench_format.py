@@ -0,0 +1,57 @@
+"""Timing of number to string formatting: the glRd / removeDecsep / str chain
+against NumFormatter (scalar, cached and vectorized), on random coordinates.
+
+Run from the repository root:  python -m bench.bench_format [nvalues]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import NumFormatter, glRd, ptEnsureStrings, removeDecsep
+
+def _timed(p_func, p_values):
+	t0 = perf_counter()
+	ret = p_func(p_values)
+	return perf_counter() - t0, ret
+
+def run(p_nvalues: int):
+
+	rng = np.random.default_rng(1)
+	arr = rng.uniform(-1000, 1000, p_nvalues)
+	values = arr.tolist()
+	# coordinates drawn from a small set, as in repetitive drawings
+	repeated = np.round(rng.uniform(0, 100, p_nvalues), 1).tolist()
+
+	fmt = NumFormatter(4)
+
+	print(f"{p_nvalues} values, 4 decimal places")
+
+	t_chain, ref = _timed(lambda vals: [str(glRd(v)) for v in vals], values)
+	t_fmt, res = _timed(lambda vals: [fmt.fmt(v) for v in vals], values)
+	assert ref == res
+	t_arr, res = _timed(fmt.fmtArray, arr)
+	assert ref == res
+	print(f"  str(glRd(v)):         {t_chain:.3f}s")
+	print(f"  NumFormatter.fmt:     {t_fmt:.3f}s  speedup: {t_chain / t_fmt:.1f}x")
+	print(f"  NumFormatter.fmtArray:{t_arr:.3f}s  speedup: {t_chain / t_arr:.1f}x")
+
+	t_chain, ref = _timed(lambda vals: [str(glRd(v)) for v in vals], repeated)
+	t_fmt, res = _timed(lambda vals: [fmt.fmt(v) for v in vals], repeated)
+	assert ref == res
+	print(f"  repeated values, str(glRd(v)):     {t_chain:.3f}s")
+	print(f"  repeated values, NumFormatter.fmt: {t_fmt:.3f}s  speedup: {t_chain / t_fmt:.1f}x")
+
+	# Polyline points, no rounding
+	pts = arr.reshape(-1, 2).tolist()
+	nofmt = NumFormatter()
+	t_chain, ref = _timed(lambda pl: ["{0},{1}".format(*ptEnsureStrings(pt)) for pt in pl], pts)
+	t_fmt, res = _timed(lambda pl: [f"{nofmt.fmt(pt[0])},{nofmt.fmt(pt[1])}" for pt in pl], pts)
+	assert ref == res
+	assert res[0] == f"{removeDecsep(pts[0][0])},{removeDecsep(pts[0][1])}"
+	print(f"  points, ptEnsureStrings:  {t_chain:.3f}s")
+	print(f"  points, NumFormatter.fmt: {t_fmt:.3f}s  speedup: {t_chain / t_fmt:.1f}x")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,56 @@
+"""Loading an existing document: parse time, indexed lookups with wrappers created on demand,
+against wrapping every element.
+
+Run from the repository root:  python -m bench.bench_loading [nelements]
+"""
+
+import sys
+from time import perf_counter
+
+from rpSVG.SVGLib import SVGContent
+
+def _document(p_n: int) -> bytes:
+	buf = ['<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">']
+	for i in range(p_n):
+		if i % 1000 == 0:
+			if i > 0:
+				buf.append('</g>')
+			buf.append(f'<g id="grp{i // 1000}">')
+		buf.append(f'<circle cx="{i % 1000}" cy="{i // 1000}" r="2" id="c{i}" class="k{i % 100}"/>')
+	buf.append('</g></svg>')
+	return "".join(buf).encode()
+
+def run(p_n: int):
+
+	data = _document(p_n)
+	print(f"{p_n} elements, {len(data) / 1e6:.1f} MB")
+
+	t0 = perf_counter()
+	sc = SVGContent.fromBytes(data, huge_tree=True)
+	t_parse = perf_counter() - t0
+	print(f"  fromBytes:              {t_parse:.3f}s, wrappers: {len(sc._wrappers)}")
+
+	t0 = perf_counter()
+	sc.getById("c0")
+	t_index = perf_counter() - t0
+	print(f"  indexes, on 1st lookup: {t_index:.3f}s")
+
+	ids = [f"c{i}" for i in range(0, p_n, max(1, p_n // 500))]
+	t0 = perf_counter()
+	for idval in ids:
+		sc.getById(idval).setClass("changed")
+	t_id = (perf_counter() - t0) / len(ids)
+	t0 = perf_counter()
+	found = sc.findByClass("k7")
+	t_cls = perf_counter() - t0
+	print(f"  getById + setClass:     {t_id * 1e6:.1f}us per element")
+	print(f"  findByClass:            {t_cls:.3f}s, {len(found)} found, wrappers: {len(sc._wrappers)}")
+
+	t0 = perf_counter()
+	everything = sc.findByTag("circle")
+	t_all = perf_counter() - t0
+	print(f"  wrapping all elements:  {t_all:.3f}s, wrappers: {len(sc._wrappers)}")
+	assert len(everything) == p_n
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
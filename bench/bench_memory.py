@@ -0,0 +1,52 @@
+"""Memory footprint, in bytes per instance, of attribute structs, path commands,
+transform definitions and element wrappers (including the XML element).
+
+Run from the repository root:  python -m bench.bench_memory [ninstances]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from rpSVG.Basics import Pt, Rotate, Trans, pA, pC, pL, pM
+from rpSVG.Structs import Cir, Re, Us
+from rpSVG.SVGLib import Circle, Polygon, Polyline, Rect, SVGContent
+
+def measure(p_factory, p_n: int) -> float:
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	keep = [p_factory(i) for i in range(p_n)]
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	# list holding the instances is not accounted
+	ret = (after - before - sys.getsizeof(keep)) / p_n
+	del keep
+	return ret
+
+def run(p_n: int):
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+
+	cases = (
+		("pM", lambda i: pM(i, i + 0.5)),
+		("pL (relative)", lambda i: pL(i, -i, relative=True)),
+		("pC", lambda i: pC(i, 1, 2, 3, 4, 5)),
+		("pA", lambda i: pA(10, 20, 0, 1, 0, i, i)),
+		("Trans", lambda i: Trans(i, i)),
+		("Rotate", lambda i: Rotate(i, 10, 20)),
+		("Re", lambda i: Re(i, i, 10, 20)),
+		("Cir", lambda i: Cir(i, i, 5)),
+		("Us", lambda i: Us(i, i, 10, 10, "#Sym1")),
+		("Circle element", lambda i: sc.addChild(Circle(i, i, 5))),
+		("Rect element", lambda i: sc.addChild(Rect(i, i, 10, 20))),
+		("Polyline element", lambda i: sc.addChild(Polyline()).addPList([Pt(i, i), Pt(i + 10, i), Pt(i + 10, i + 5)])),
+		("Polygon element", lambda i: sc.addChild(Polygon()).addPList([Pt(i, i), Pt(i + 10, i), Pt(i + 10, i + 5)])),
+	)
+
+	print(f"bytes per instance, {p_n} instances")
+	for label, factory in cases:
+		print(f"  {label:16} {measure(factory, p_n):8.1f}")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
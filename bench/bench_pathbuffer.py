@@ -0,0 +1,83 @@
+"""Memory and timing of path segments kept as path command objects against
+PathBuffer arrays, for a random data path, and 'd' encoding of both.
+
+Run from the repository root:  python -m bench.bench_pathbuffer [nsegments]
+"""
+
+import gc
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import PathBuffer, pL, pM
+from rpSVG.Structs import Re
+from rpSVG.SVGLib import AnalyticalPath, SVGContent
+
+def _traced(p_func):
+	"Result, memory allocated and elapsed time (untraced run) of p_func"
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	ret = p_func()
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del ret
+	gc.collect()
+	t0 = perf_counter()
+	ret = p_func()
+	elapsed = perf_counter() - t0
+	return ret, after - before, elapsed
+
+def run(p_nsegments: int):
+
+	rng = np.random.default_rng(1)
+	coords = np.round(rng.uniform(-500, 500, (p_nsegments, 2)), 2)
+	pts = coords.tolist()
+
+	def build_cmds():
+		ret = [pM(*pts[0])]
+		for xy in pts[1:]:
+			ret.append(pL(*xy))
+		return ret
+
+	def build_buffer():
+		ret = PathBuffer()
+		ret.moveTo(*pts[0])
+		for xy in pts[1:]:
+			ret.lineTo(*xy)
+		return ret
+
+	cmds, mem_cmds, t_cmds = _traced(build_cmds)
+	buf, mem_buf, t_buf = _traced(build_buffer)
+	arrbuf, _mem, t_arr = _traced(lambda: PathBuffer().addPolyline(coords))
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+	ap_cmds = sc.addChild(AnalyticalPath())
+	ap_buf = sc.addChild(AnalyticalPath())
+	for cmd in cmds:
+		ap_cmds.addCmd(cmd)
+	ap_buf.addCmd(buf)
+	t0 = perf_counter()
+	ap_cmds.refresh()
+	t_enc_cmds = perf_counter() - t0
+	t0 = perf_counter()
+	ap_buf.refresh()
+	t_enc_buf = perf_counter() - t0
+
+	assert ap_cmds.getStruct().get("d") == ap_buf.getStruct().get("d")
+	assert arrbuf.get() == buf.get()
+
+	print(f"{p_nsegments} segments")
+	print(f"  memory, command objects:  {mem_cmds / p_nsegments:8.1f} bytes/segment")
+	print(f"  memory, PathBuffer:       {mem_buf / p_nsegments:8.1f} bytes/segment  ({mem_cmds / mem_buf:.1f}x less)")
+	print(f"  memory, trimmed PathBuffer data: {buf.trim().nbytes() / p_nsegments:8.1f} bytes/segment")
+	print(f"  build, command objects:   {t_cmds:.3f}s")
+	print(f"  build, PathBuffer:        {t_buf:.3f}s  ({t_cmds / t_buf:.1f}x)")
+	print(f"  build, PathBuffer.addPolyline: {t_arr:.4f}s  ({t_cmds / t_arr:.1f}x)")
+	print(f"  encode, command objects:  {t_enc_cmds:.3f}s")
+	print(f"  encode, PathBuffer:       {t_enc_buf:.3f}s  ({t_enc_cmds / t_enc_buf:.1f}x)")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
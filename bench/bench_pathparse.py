@@ -0,0 +1,71 @@
+"""Timing of SVG path data parsing (parsePathData) on multi-megabyte 'd' strings:
+a long implicit 'line to' run and a mix of all command kinds, with the
+round-trip check: written again by AnalyticalPath, path data is unchanged.
+
+Run from the repository root:  python -m bench.bench_pathparse [nsegments]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import PathBuffer, parsePathData
+from rpSVG.Structs import Re
+from rpSVG.SVGLib import AnalyticalPath, SVGContent
+
+def _mixedPath(p_rng, p_nsegments: int) -> PathBuffer:
+	ret = PathBuffer()
+	ret.moveTo(0, 0)
+	rnd = lambda: round(float(p_rng.uniform(-1000, 1000)), 3)
+	kinds = p_rng.integers(0, 7, p_nsegments).tolist()
+	rels = (p_rng.random(p_nsegments) < 0.5).tolist()
+	for kind, rel in zip(kinds, rels):
+		if kind == 0:
+			ret.lineTo(rnd(), rnd(), relative=rel)
+		elif kind == 1:
+			ret.hLineTo(rnd(), relative=rel)
+		elif kind == 2:
+			ret.vLineTo(rnd(), relative=rel)
+		elif kind == 3:
+			ret.cubicTo(rnd(), rnd(), rnd(), rnd(), rnd(), rnd(), relative=rel)
+		elif kind == 4:
+			ret.arcTo(abs(rnd()), abs(rnd()), rnd(), int(rel), 1 - int(rel), rnd(), rnd(), relative=rel)
+		elif kind == 5:
+			ret.add("Q", rnd(), rnd(), rnd(), rnd(), relative=rel)
+		else:
+			ret.close()
+			ret.moveTo(rnd(), rnd(), relative=rel)
+	return ret
+
+def _parse(p_label: str, p_data: str):
+	t0 = perf_counter()
+	buf = parsePathData(p_data)
+	elapsed = perf_counter() - t0
+	mb = len(p_data) / 1e6
+	print(f"  {p_label}: {mb:.1f} MB, {len(buf)} commands, {elapsed:.3f}s ({mb / elapsed:.1f} MB/s)")
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+	ap = sc.addChild(AnalyticalPath())
+	ap.addPathData(p_data)
+	assert ap.getStruct().get("d") == p_data, "round-trip failed"
+
+def run(p_nsegments: int):
+
+	rng = np.random.default_rng(1)
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+	ap = sc.addChild(AnalyticalPath())
+	ap.addPolylineArray(np.round(rng.uniform(0, 1000, (p_nsegments, 2)), 3))
+	polyline = ap.getStruct().get("d")
+
+	ap = sc.addChild(AnalyticalPath())
+	ap.addCmd(_mixedPath(rng, p_nsegments), refresh=True)
+	mixed = ap.getStruct().get("d")
+
+	print(f"{p_nsegments} segments")
+	_parse("polyline", polyline)
+	_parse("mixed commands", mixed)
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
@@ -0,0 +1,39 @@
+"""Timing of building a multi-ring AnalyticalPath with addCmd: each closing
+command ('z') updates the 'd' attribute, only new commands being encoded.
+
+Run from the repository root:  python -m bench.bench_pathrings [nrings] [ringsize]
+"""
+
+import sys
+from time import perf_counter
+
+from rpSVG.Basics import pClose, pL, pM
+from rpSVG.Structs import Re
+from rpSVG.SVGLib import AnalyticalPath, SVGContent
+
+def run(p_nrings: int, p_ringsize: int):
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+	ap = sc.addChild(AnalyticalPath())
+
+	t0 = perf_counter()
+	for k in range(p_nrings):
+		ap.addCmd(pM(k, k))
+		for i in range(1, p_ringsize):
+			ap.addCmd(pL(k + i, k + (i % 7)))
+		ap.addCmd(pClose())
+	t_inc = perf_counter() - t0
+
+	d = ap.getEl().get("d")
+	t0 = perf_counter()
+	ap.refresh()
+	t_full = perf_counter() - t0
+	assert ap.getEl().get("d") == d
+
+	print(f"{p_nrings} rings x {p_ringsize} vertices")
+	print(f"  incremental build:   {t_inc:.3f}s")
+	print(f"  one full refresh:    {t_full:.3f}s")
+	print(f"  full refresh per ring would cost about {p_nrings * t_full / 2:.3f}s")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 500, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
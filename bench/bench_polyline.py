@@ -0,0 +1,42 @@
+"""Timing of AnalyticalPath.addPolylinePList (list of Pt) against
+AnalyticalPath.addPolylineArray (numpy array) on the same random polyline.
+
+Run from the repository root:  python -m bench.bench_polyline [npoints]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import Pt
+from rpSVG.Structs import Re
+from rpSVG.SVGLib import AnalyticalPath, SVGContent
+
+def run(p_npoints: int):
+
+	rng = np.random.default_rng(1)
+	coords = np.round(rng.uniform(0, 1000, (p_npoints, 2)), 3)
+	ptlist = [Pt(*xy) for xy in coords.tolist()]
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+
+	ap_list = sc.addChild(AnalyticalPath())
+	t0 = perf_counter()
+	ap_list.addPolylinePList(ptlist)
+	t_list = perf_counter() - t0
+
+	ap_arr = sc.addChild(AnalyticalPath())
+	t0 = perf_counter()
+	ap_arr.addPolylineArray(coords)
+	t_arr = perf_counter() - t0
+
+	assert ap_list.getStruct().get("d") == ap_arr.getStruct().get("d")
+
+	print(f"{p_npoints} vertices")
+	print(f"  addPolylinePList:  {t_list:.3f}s  ({1e6 * t_list / p_npoints:.2f} us/vertex)")
+	print(f"  addPolylineArray:  {t_arr:.3f}s  ({1e6 * t_arr / p_npoints:.2f} us/vertex)")
+	print(f"  speedup: {t_list / t_arr:.1f}x")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
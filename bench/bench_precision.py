@@ -0,0 +1,36 @@
+"""Output size of the same drawing at default formatting against scale derived precision
+(maxerror 0.1 output pixels), for viewBox extents from 10^2 to 10^7 units on 1000 pixels.
+
+Run from the repository root:  python -m bench.bench_precision [nelements]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import Pt
+from rpSVG.SVGLib import AnalyticalPath, Polyline, Re, SVGContent, VBox
+
+def _drawing(p_extent: float, p_nelements: int, **kwargs):
+	rng = np.random.default_rng(1)
+	sc = SVGContent(Re(0, 0, 1000, 1000), **kwargs).setViewbox(VBox(0, 0, p_extent, p_extent))
+	sc.addCircles(rng.uniform(0, p_extent, p_nelements), rng.uniform(0, p_extent, p_nelements), p_extent / 1000)
+	for _i in range(p_nelements // 1000):
+		coords = rng.uniform(0, p_extent, (1000, 2))
+		sc.addChild(AnalyticalPath()).addPolylineArray(coords)
+		sc.addChild(Polyline()).addPList([Pt(x, y) for x, y in coords.tolist()])
+	return sc
+
+def run(p_nelements: int):
+
+	print(f"{p_nelements} circles, {p_nelements} path and {p_nelements} polyline vertices")
+	for extent in (1e2, 1e4, 1e7):
+		default = len(_drawing(extent, p_nelements).toBytes())
+		t0 = perf_counter()
+		sc = _drawing(extent, p_nelements, maxerror=0.1)
+		scaled = len(sc.toBytes())
+		print(f"  extent {extent:.0e}: default {default / 1e6:.2f} MB, {sc.getPrecision()} places {scaled / 1e6:.2f} MB ({perf_counter() - t0:.2f}s)")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
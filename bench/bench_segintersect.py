@@ -0,0 +1,43 @@
+"""Timing of segment intersections, connectors against box contours: vec2_segment_intersect
+per pair against vec2_segment_intersect_array over all pairs.
+
+Run from the repository root:  python -m bench.bench_segintersect [nconnectors]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import Ln, Pt
+from rpSVG.Geometry import segmentsToArray, vec2_segment_intersect, vec2_segment_intersect_array
+
+def run(p_nconnectors: int):
+
+	rng = np.random.default_rng(1)
+	nboxes = 250
+	contours = []
+	for x, y, w, h in zip(*(rng.uniform(0, 1000, (2, nboxes))), *(rng.uniform(20, 80, (2, nboxes)))):
+		pts = [Pt(x + w, y + h), Pt(x + w, y), Pt(x, y), Pt(x, y + h)]
+		contours.extend(Ln(p1, p2) for p1, p2 in zip(pts, pts[1:] + pts[:1]))
+	conns = rng.uniform(0, 1000, (p_nconnectors, 4))
+
+	print(f"{p_nconnectors} connectors against {len(contours)} contour segments")
+
+	nscal = min(p_nconnectors, 200)
+	t0 = perf_counter()
+	ref = []
+	for x1, y1, x2, y2 in conns[:nscal].tolist():
+		a1, a2 = Pt(x1, y1), Pt(x2, y2)
+		ref.append([not vec2_segment_intersect(a1, a2, *ln) is None for ln in contours])
+	t_scal = (perf_counter() - t0) * p_nconnectors / nscal
+
+	t0 = perf_counter()
+	_a, _b, pts, hit = vec2_segment_intersect_array(conns, segmentsToArray(contours), allpairs=True)
+	t_arr = perf_counter() - t0
+	assert hit[:nscal].tolist() == ref
+	print(f"  per pair (estimate): {t_scal:.3f}s")
+	print(f"  array, all pairs:    {t_arr:.3f}s  speedup: {t_scal / t_arr:.0f}x  ({np.count_nonzero(hit)} intersections)")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
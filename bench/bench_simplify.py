@@ -0,0 +1,37 @@
+"""Output size and timing of a coastline-like ring (random walk radius, closed), written
+as an analytical path with and without simplification at 0.5 output pixels tolerance.
+
+Run from the repository root:  python -m bench.bench_simplify [nvertices]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.SVGLib import AnalyticalPath, Re, SVGContent, VBox
+
+def _coastline(p_nvertices: int):
+	rng = np.random.default_rng(1)
+	ang = np.linspace(0, 2 * np.pi, p_nvertices)
+	rad = 4000 + np.cumsum(rng.normal(0, 2, p_nvertices))
+	rad -= (rad[-1] - rad[0]) * np.linspace(0, 1, p_nvertices)
+	ret = np.column_stack((5000 + rad * np.cos(ang), 5000 + rad * np.sin(ang)))
+	ret[-1] = ret[0]
+	return ret
+
+def run(p_nvertices: int):
+
+	coords = _coastline(p_nvertices)
+	print(f"{p_nvertices} vertices, 10000 user units drawn on 1000 pixels")
+
+	for method in (None, "dp", "vw"):
+		sc = SVGContent(Re(0, 0, 1000, 1000), precision=1).setViewbox(VBox(0, 0, 10000, 10000))
+		t0 = perf_counter()
+		pth = sc.addChild(AnalyticalPath())
+		pth.addPolylineArray(coords, simplify=method, tolerance=0.5)
+		out = sc.toBytes()
+		print(f"  {str(method):5s} {perf_counter() - t0:.3f}s  removed: {pth.removedvertices:8d}  {len(out) / 1e6:.3f} MB")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
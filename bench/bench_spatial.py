@@ -0,0 +1,71 @@
+"""Timing of window and point lookups on a document of random rectangles and circles:
+spatial index (build, queries, queries after incremental changes) against a linear scan
+of element boxes.
+
+Run from the repository root:  python -m bench.bench_spatial [nelements]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from rpSVG.Basics import Env, Pt
+from rpSVG.SVGLib import Rect, SVGContent, Re, _localTag, _xmlElBounds
+
+def _linearScan(p_content, minx, miny, maxx, maxy):
+	ret = []
+	for el in p_content.getEl().iterchildren():
+		box = _xmlElBounds(el, _localTag(el))
+		if not box is None and box[0] <= maxx and box[2] >= minx and box[1] <= maxy and box[3] >= miny:
+			ret.append(el)
+	return ret
+
+def run(p_nelements: int):
+
+	rng = np.random.default_rng(1)
+	half = p_nelements // 2
+	sc = SVGContent(Re(0, 0, 10000, 10000))
+	sc.addRects(rng.uniform(0, 10000, half), rng.uniform(0, 10000, half), rng.uniform(1, 20, half), rng.uniform(1, 20, half))
+	sc.addCircles(rng.uniform(0, 10000, half), rng.uniform(0, 10000, half), rng.uniform(1, 10, half))
+
+	nqueries = 200
+	wins = [(x, y, x + 100, y + 100) for x, y in rng.uniform(0, 9900, (nqueries, 2)).tolist()]
+
+	print(f"{2 * half} elements, {nqueries} window queries")
+
+	t0 = perf_counter()
+	sc._buildSpatialIndex()
+	t_build = perf_counter() - t0
+
+	t0 = perf_counter()
+	found = [sc.findInEnvelope(Env(*w)) for w in wins]
+	t_index = perf_counter() - t0
+
+	nscan = 5
+	t0 = perf_counter()
+	for w, res in zip(wins[:nscan], found):
+		assert _linearScan(sc, *w) == [e.getEl() for e in res]
+	t_scan = (perf_counter() - t0) * nqueries / nscan
+
+	print(f"  index build:           {t_build:.3f}s")
+	print(f"  linear scan (estimate):{t_scan:.3f}s")
+	print(f"  spatial index:         {t_index:.3f}s  speedup: {t_scan / t_index:.0f}x")
+
+	t0 = perf_counter()
+	for x, y in rng.uniform(0, 10000, (nqueries, 2)).tolist():
+		sc.findAtPoint(Pt(x, y))
+	print(f"  {nqueries} point queries:     {perf_counter() - t0:.3f}s")
+
+	# incremental changes: added elements searched apart until next rebuild
+	t0 = perf_counter()
+	for x, y in rng.uniform(0, 10000, (1000, 2)).tolist():
+		sc.addChild(Rect(x, y, 10, 10))
+	t_add = perf_counter() - t0
+	t0 = perf_counter()
+	for w in wins:
+		sc.findInEnvelope(Env(*w))
+	print(f"  1000 single adds:      {t_add:.3f}s, then queries: {perf_counter() - t0:.3f}s")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
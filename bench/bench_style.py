@@ -0,0 +1,36 @@
+"""Timing of style operations: writing style attributes, equality, CSS rendering and
+reading back from XML, on styles with a few properties set.
+
+Run from the repository root:  python -m bench.bench_style [nrepeats]
+"""
+
+import sys
+from time import perf_counter
+
+from lxml import etree
+
+from rpSVG.SVGStyleText import CSSSty, Sty
+
+def _timed(p_label, p_func, p_n):
+	t0 = perf_counter()
+	for _i in range(p_n):
+		p_func()
+	print(f"  {p_label:<22}{(perf_counter() - t0) * 1e6 / p_n:.2f}us")
+
+def run(p_n: int):
+
+	sty = Sty('fill', 'red', 'stroke', 'black', 'stroke-width', 2)
+	other = Sty('fill', 'red', 'stroke', 'black', 'stroke-width', 2)
+	rule = CSSSty('fill', 'red', 'stroke', 'black', 'stroke-width', 2, selector='.marker')
+	el = etree.Element("circle")
+
+	print(f"{p_n} repeats, 3 properties")
+	_timed("getStyleAttrs", sty.getStyleAttrs, p_n)
+	_timed("setXmlAttrs", lambda: sty.setXmlAttrs(el), p_n)
+	_timed("==", lambda: sty == other, p_n)
+	_timed("toDict", sty.toDict, p_n)
+	_timed("toCSSString", rule.toCSSString, p_n)
+	_timed("fromXmlAttrs", lambda: sty.fromXmlAttrs(el), p_n)
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
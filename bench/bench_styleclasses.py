@@ -0,0 +1,33 @@
+"""Output size and serialization time of many identically styled elements, with style
+attributes written on every element against generated style class rules.
+
+Run from the repository root:  python -m bench.bench_styleclasses [nelements]
+"""
+
+import sys
+from time import perf_counter
+
+from rpSVG.Structs import Re
+from rpSVG.SVGLib import Circle, SVGContent
+from rpSVG.SVGStyleText import Sty
+
+def run(p_n: int):
+
+	sc = SVGContent(Re(0, 0, 1000, 1000)).setIdentityViewbox()
+	styles = (Sty('fill', 'red', 'stroke', 'black', 'stroke-width', 2), Sty('fill', '#1a7f37', 'stroke', 'white', 'stroke-width', 1.5))
+	for i in range(p_n):
+		sc.addChild(Circle(i % 1000, i // 1000, 3)).setStyle(styles[i % 7 == 0])
+
+	print(f"{p_n} circles, 2 style sets")
+	t0 = perf_counter()
+	plain = sc.toBytes(pretty_print=False)
+	t_plain = perf_counter() - t0
+	t0 = perf_counter()
+	classed = sc.toBytes(pretty_print=False, styleclasses=True)
+	t_classed = perf_counter() - t0
+	assert sc.toBytes(pretty_print=False) == plain
+	print(f"  style attributes:  {len(plain) / 1e6:.2f} MB, {t_plain:.3f}s")
+	print(f"  style classes:     {len(classed) / 1e6:.2f} MB, {t_classed:.3f}s  size: {100 * len(classed) / len(plain):.0f}%")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
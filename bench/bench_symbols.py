@@ -0,0 +1,30 @@
+"""Output size and timing of a diagram of cylinder and server text boxes in a few sizes,
+each distinct shape written once as a definition.
+
+Run from the repository root:  python -m bench.bench_symbols [nboxes]
+"""
+
+import sys
+from time import perf_counter
+
+from rpSVG.Constructs import TextBox
+from rpSVG.SVGLib import Re, SVGContent
+from rpSVG.Symbols import Cylinder, Server
+
+def run(p_nboxes: int):
+
+	t0 = perf_counter()
+	sc = SVGContent(Re(0, 0, 10000, 10000))
+	for i in range(p_nboxes):
+		tb = TextBox(100 * (i % 100), 100 * (i // 100), 60 + 10 * (i % 3), 40, text=f"box {i}")
+		if i % 2 == 0:
+			tb.setBaseShape(Cylinder(0, 0, pitch_ratio=0.3))
+		else:
+			tb.setBaseShape(Server(0, 0, 0, rotation=18, projangle=145))
+		sc.addChild(tb)
+	out = sc.toBytes()
+	print(f"{p_nboxes} text boxes, 6 distinct shapes")
+	print(f"  {perf_counter() - t0:.3f}s  symbols: {out.count(b'<symbol')}  {len(out) / 1e6:.2f} MB")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
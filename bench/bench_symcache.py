@@ -0,0 +1,44 @@
+"""Timing of building many parametric symbols from a small set of parameter values,
+with the process-wide symbol geometry cache disabled and enabled.
+
+Run from the repository root:  python -m bench.bench_symcache [nsymbols]
+"""
+
+import sys
+from time import perf_counter
+
+from rpSVG.SVGLib import Re, SVGContent
+from rpSVG.Symbols import SYMBOL_GEOMETRY_CACHE, Arrow, Asterisk, DonutPoly, RegPoly, Star, SuspPointCirc, Wedge
+
+_MAKERS = (
+	lambda i: Star(20 + i % 3, 12, 5 + i % 4, rot=10),
+	lambda i: RegPoly(10 + i % 5, 3 + i % 6),
+	lambda i: DonutPoly(12, 6, out_n=8, rot=i % 2 * 15, coffset=4),
+	lambda i: Asterisk(10 + i % 3, separation=3),
+	lambda i: Arrow(40, 6, 14, 12),
+	lambda i: Wedge(24, 40, indent=i % 3),
+	lambda i: SuspPointCirc(6 + i % 2)
+)
+
+def _build(p_nsymbols):
+	sc = SVGContent(Re(0, 0, 1000, 1000))
+	nm = len(_MAKERS)
+	t0 = perf_counter()
+	for i in range(p_nsymbols):
+		sc.addChild(_MAKERS[i % nm](i // nm), todefs=True)
+	return perf_counter() - t0, sc.toBytes()
+
+def run(p_nsymbols: int):
+
+	print(f"{p_nsymbols} symbols")
+
+	SYMBOL_GEOMETRY_CACHE.setSize(0).clear()
+	t_nocache, ref = _build(p_nsymbols)
+	SYMBOL_GEOMETRY_CACHE.setSize(1024).clear()
+	t_cache, res = _build(p_nsymbols)
+	assert ref == res
+	print(f"  no cache:   {t_nocache:.3f}s")
+	print(f"  cache:      {t_cache:.3f}s  speedup: {t_nocache / t_cache:.1f}x  {SYMBOL_GEOMETRY_CACHE.stats()}")
+
+if __name__ == "__main__":
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
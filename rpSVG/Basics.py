@@ -1,9 +1,13 @@
 
 from collections import namedtuple
+from functools import lru_cache
+from re import compile as re_compile, sub as re_sub
 
 from typing import List, Optional, Union
 
-from math import atan, cos, sin, radians, degrees
+from math import atan, ceil, cos, sin, radians, degrees, isfinite, log10, tan
+
+import numpy as np
 
 Pt = namedtuple("Pt", "x y")
 ln = namedtuple("Ln", "pt1 pt2")
@@ -66,6 +70,146 @@ def glRd(p_val):
 	else:
 		return removeDecsep(p_val)
 	 
+class NumFormatter(object):
+	"""Number to string formatting at fixed precision: 'places' decimal places, None for 
+		no rounding. fmt(v) gives the same result as str(glRd(v)) under the equivalent 
+		GLOBAL_ENV rounding settings, shortest form, no trailing zeros or decimal separator. 
+		Formatted values are cached, fmtArray is the vectorized variant."""
+
+	CACHE_SIZE = 8192
+
+	__slots__ = ("places", "_pyfmt", "_exactlimit", "_cache")
+
+	def __init__(self, places: Optional[int] = None) -> None:
+		self.setPlaces(places)
+
+	def setPlaces(self, places: Optional[int]) -> None:
+		"Changes precision, for all holders of this formatter"
+		assert places is None or (isinstance(places, int) and places >= 0), places
+		self.places = places
+		if places is None:
+			self._pyfmt = None
+			self._exactlimit = None
+		else:
+			self._pyfmt = f"%.{places}f"
+			# out of [1e-4, _exactlimit) magnitudes, printf style formatting no longer 
+			# matches float repr (exponent notation, repr exactness)
+			self._exactlimit = 10.0 ** (15 - places)
+		self._cache = {}
+
+	def rd(self, p_val):
+		"Same as glRd, at this formatter precision"
+		if self.places is None:
+			return removeDecsep(p_val)
+		return removeDecsep(round(p_val, self.places))
+
+	def _fmt(self, p_val) -> str:
+		if self._pyfmt is None or isinstance(p_val, int) or not 0.0001 <= abs(p_val) < self._exactlimit:
+			return str(self.rd(p_val))
+		ret = self._pyfmt % p_val
+		if self.places > 0:
+			ret = ret.rstrip('0').rstrip('.')
+		if ret == "-0":
+			ret = "0"
+		return ret
+
+	def fmt(self, p_val) -> str:
+		cache = self._cache
+		ret = cache.get(p_val)
+		if ret is None:
+			pyfmt = self._pyfmt
+			if pyfmt is not None and p_val.__class__ is float and 0.0001 <= abs(p_val) < self._exactlimit:
+				# inlined _fmt common case
+				ret = pyfmt % p_val
+				if self.places > 0:
+					ret = ret.rstrip('0').rstrip('.')
+				if ret == "-0":
+					ret = "0"
+			else:
+				ret = self._fmt(p_val)
+			if len(cache) >= self.CACHE_SIZE:
+				cache.clear()
+			cache[p_val] = ret
+		return ret
+
+	def fmtValue(self, p_val) -> str:
+		"Formats struct typed values (see typedValue): numbers, UnitValue instances, strings kept as they are"
+		if isinstance(p_val, (int, float)):
+			ret = self.fmt(p_val)
+		elif isinstance(p_val, UnitValue):
+			ret = f"{self.fmt(p_val.num)}{p_val.unit}"
+		else:
+			ret = p_val
+		return ret
+
+	def fmtArray(self, p_arr) -> List[str]:
+		"Vectorized fmt: formats every value of a float array, returning a list of strings"
+		vals = np.asarray(p_arr, dtype=np.float64)
+		if self._pyfmt is None:
+			return [str(removeDecsep(v)) for v in vals.tolist()]
+		pyfmt = self._pyfmt
+		if self.places > 0:
+			ret = [(pyfmt % v).rstrip('0').rstrip('.') for v in vals.tolist()]
+		else:
+			ret = [pyfmt % v for v in vals.tolist()]
+		# negative values rounding to zero ('-0') and magnitudes out of printf / repr
+		# equivalence are left to the scalar path
+		absvals = np.abs(vals)
+		tofix = ((vals <= 0) & (vals > -(10.0 ** -self.places))) | (absvals < 0.0001) | (absvals >= self._exactlimit)
+		for i in np.flatnonzero(tofix).tolist():
+			ret[i] = self._fmt(float(vals[i]))
+		return ret
+
+def scalePrecision(p_unitsize: float, p_maxerror: float) -> int:
+	"""Fewest decimal places keeping rounding errors under p_maxerror, given in p_unitsize units 
+		(e.g. output pixels, p_unitsize being the pixel size in user units)"""
+	assert p_unitsize > 0 and p_maxerror > 0
+	# rounding error is half the last place unit
+	return max(0, ceil(-log10(2.0 * p_maxerror * p_unitsize) - 1e-9))
+
+# non rounding formatter, for values other than coordinates at set precision
+_RAW_FORMATTER = NumFormatter()
+
+# formatters matching GLOBAL_ENV rounding settings, by rounding places
+_GL_FORMATTERS = {}
+
+def glFormatter() -> NumFormatter:
+	"NumFormatter following current GLOBAL_ENV rounding settings"
+	rnd = GLOBAL_ENV["ROUND"]
+	places = rnd["places"] if rnd["flag"] else None
+	ret = _GL_FORMATTERS.get(places)
+	if ret is None:
+		ret = _GL_FORMATTERS[places] = NumFormatter(places)
+	return ret
+
+def glFmt(p_val) -> str:
+	"Same as str(glRd(p_val))"
+	return glFormatter().fmt(p_val)
+
+def glRdStrings(p_arr) -> List[str]:
+	"""Array counterpart of str(glRd(x)): formats every value of a float array,
+		returning a list of strings"""
+	return glFormatter().fmtArray(p_arr)
+
+def glRdArray(p_arr) -> np.ndarray:
+	"""Array counterpart of glRd, without integer conversion: rounded float array. 
+		Gives the same values as glRd for every element"""
+	vals = np.asarray(p_arr, dtype=np.float64)
+	rnd = GLOBAL_ENV["ROUND"]
+	if not rnd["flag"]:
+		return vals.copy()
+	places = rnd["places"]
+	scale = 10.0 ** places
+	scaled = vals * scale
+	ret = np.rint(scaled) / scale
+	# values too close to a rounding tie, for the error of the scaling product, and 
+	# magnitudes beyond integer precision are left to the scalar round
+	absscaled = np.abs(scaled)
+	tofix = ~(absscaled < 2.0 ** 52) | (np.abs(absscaled - np.floor(absscaled) - 0.5) <= absscaled * 1e-15 + 1e-12)
+	for i in np.flatnonzero(tofix).tolist():
+		ret[i] = round(float(vals[i]), places)
+	return ret
+
 def ptCoincidence(pa: Pt, pb: Pt, mindelta=MINDELTA):
 	return abs(pa.x - pb.x) < mindelta and abs(pa.y - pb.y)  < mindelta
 
@@ -87,33 +231,56 @@ def ptDyInt(pa: Pt, pb: Pt):
 def ptRemoveDecsep(p_x, p_y):
 	return Pt(removeDecsep(p_x), removeDecsep(p_y))
 
-def toNumberAndUnit(p_val):
-	base = str(p_val)
+# number and unit parsing
+
+UNITS_PARSER_CACHE_SIZE = 4096
+
+# common case: number followed by unit letters, ex.: '1.2em', '100%', '-3'
+_NUMUNIT_RE = re_compile(r"([0-9.,\-]*)([a-zA-Z%]*)")
+
+def _splitNumUnitChars(p_text: str):
+	"General case, number and unit characters may be interleaved"
 	numchars = []
 	unitchars = []
-	for c in base:
+	for c in p_text:
 		if str.isdigit(c) or c in ('.', ',', '-'):
 			numchars.append(c)
 		else:
 			unitchars.append(c)
-	if len(unitchars) > 0:
-		un = ''.join(unitchars)
+	return ''.join(numchars), ''.join(unitchars)
+
+@lru_cache(maxsize=UNITS_PARSER_CACHE_SIZE)
+def _parseNumUnit(p_text: str):
+	"""Splits p_text in number text, unit (None if absent) and number value, None if number 
+		text is not a valid, finite float"""
+	mo = _NUMUNIT_RE.fullmatch(p_text)
+	if mo is None:
+		numtxt, un = _splitNumUnitChars(p_text)
 	else:
-		un = None
-	return removeDecsep(float(''.join(numchars))), un
+		numtxt, un = mo.groups()
+	try:
+		num = removeDecsep(float(numtxt))
+	except (ValueError, OverflowError):
+		num = None
+	return numtxt, (un if len(un) > 0 else None), num
+
+def toNumberAndUnit(p_val):
+	numtxt, un, num = _parseNumUnit(str(p_val))
+	if num is None:
+		# raises the conversion error
+		removeDecsep(float(numtxt))
+	return num, un
 
 def fromNumberAndUnit(p_val, p_unit):
 	return f"{removeDecsep(p_val)}{p_unit}"
 
 def strictToNumber(p_val):
-	base = str(p_val)
-	numchars = []
-	for c in base:
-		if str.isdigit(c) or c in ('.', ',', '-'):
-			numchars.append(c)
-		else:
-			raise ValueWithUnitsError(p_val)
-	return removeDecsep(float(''.join(numchars)))
+	numtxt, un, num = _parseNumUnit(str(p_val))
+	if not un is None:
+		raise ValueWithUnitsError(p_val)
+	if num is None:
+		removeDecsep(float(numtxt))
+	return num
 
 def add(a, b):
 	return strictToNumber(a) + strictToNumber(b)
@@ -122,16 +289,7 @@ def subtr(a, b):
 	return strictToNumber(a) - strictToNumber(b)
 
 def getUnit(p_val):
-	base = str(p_val)
-	unitchars = []
-	for c in base:
-		if not str.isdigit(c) and not c in ('.', ',', '-'):
-			unitchars.append(c)
-	if len(unitchars) > 0:
-		un = ''.join(unitchars)
-	else:
-		un = None
-	return un
+	return _parseNumUnit(str(p_val))[1]
 
 # def fromNumberAndUnit(p_num, p_unit):
 # 	if p_unit is None:
@@ -228,15 +386,38 @@ def isNumeric(p_val):
 		ret = False
 	return ret
 
+CIRCLE_TABLES_CACHE_SIZE = 256
+
+@lru_cache(maxsize=CIRCLE_TABLES_CACHE_SIZE)
+def _circleTables(p_n: int, p_rot_left: Union[float, int]):
+	"""Cosines and sines of the p_n angles equally dividing a circle, starting at p_rot_left
+		degrees, as read-only arrays. Computed as in polar2rectDegs, for identical results"""
+	step = 360 / p_n
+	angs = [radians(i * step + p_rot_left) for i in range(p_n)]
+	coss = np.array([cos(a) for a in angs], dtype=np.float64)
+	sins = np.array([sin(a) for a in angs], dtype=np.float64)
+	coss.flags.writeable = False
+	sins.flags.writeable = False
+	return coss, sins
+
+def circleDividersArray(p_center: Pt, p_radius: Union[float, int], p_n: int, p_rot_left: Optional[Union[float, int]] = 0) -> np.ndarray:
+	"""Array counterpart of circleDividers: (p_n, 2) float array of the same points, 
+		from cached trigonometric tables per (p_n, p_rot_left)"""
+	coss, sins = _circleTables(p_n, p_rot_left)
+	ret = np.empty((p_n, 2), dtype=np.float64)
+	ret[:,0] = glRdArray(coss * p_radius)
+	ret[:,1] = glRdArray(sins * p_radius)
+	ret[:,0] += p_center[0]
+	ret[:,1] += p_center[1]
+	return ret
+
 def circleDividers(p_center: Pt, p_radius: Union[float, int], p_n: int, p_rot_left: Optional[Union[float, int]] = 0):
 	"""Generate p_n points equally dividing a circle defined by:
 		- p_center - a point
 		- p_radius - radius from center
 		- p_rot_left - (degrees) angle on trigonometric circle"""
-	step = 360 / p_n
-	for i in range(p_n):
-		ang = i * step + p_rot_left
-		yield ptRemoveDecsep(*ptAdd(p_center, polar2rectDegs(ang, p_radius)))
+	for x, y in circleDividersArray(p_center, p_radius, p_n, p_rot_left).tolist():
+		yield ptRemoveDecsep(x, y)
 
 def url_href(p_text):
 	if not p_text.startswith('url'):
@@ -299,6 +480,12 @@ class WrongValueTransformDef(RuntimeError):
 	def __str__(self):
 		return f"Transform definition '{self.classname}' accepts no '{self.attr}' value"
 
+class SingularTransformError(RuntimeError):
+	def __init__(self, p_matrix):
+		self.matrix = p_matrix
+	def __str__(self):
+		return f"Transform matrix not invertible: {self.matrix[:2].tolist()}"
+
 class WrongValuePathCmd(RuntimeError):
 	def __init__(self, p_class_instance, p_attr):
 		self.classname = p_class_instance.__class__.__name__
@@ -306,13 +493,114 @@ class WrongValuePathCmd(RuntimeError):
 	def __str__(self):
 		return f"Path command '{self.classname}' accepts no '{self.attr}' value"
 
+class PathDataError(RuntimeError):
+	def __init__(self, p_reason, p_text) -> None:
+		super().__init__()
+		self.reason = p_reason
+		self.text = p_text
+	def __str__(self):
+		return f"invalid path data, {self.reason}: '{self.text[:60]}'"
+
+class UnitValue(namedtuple("UnitValue", "num unit")):
+	"Number with units, as kept in struct fields"
+	__slots__ = ()
+	def __str__(self):
+		return f"{self.num}{self.unit}"
+
+_TYPEDVAL_UNITS_RE = re_compile(r"([-+]?[0-9.]+(?:[eE][-+]?[0-9]+)?)([a-zA-Z%]+)")
+
+def _typedNumber(p_text: str):
+	"Number represented by p_text, only if formatting it back gives exactly p_text, else None"
+	try:
+		ret = int(p_text)
+	except ValueError:
+		try:
+			ret = float(p_text)
+		except ValueError:
+			return None
+		if not isfinite(ret):
+			return None
+	if str(ret) != p_text:
+		ret = None
+	return ret
+
+def typedValue(p_val):
+	"""Value as kept in struct fields: numbers (int, float) and UnitValue instances when
+		the string formatting of these reproduces exactly the original value, else strings"""
+	if p_val is None or isinstance(p_val, (int, float, UnitValue)):
+		return p_val
+	if isinstance(p_val, np.generic):
+		p_val = str(p_val)
+	elif not isinstance(p_val, str):
+		return str(p_val)
+	ret = _typedNumber(p_val)
+	if ret is None:
+		ret = p_val
+		mo = _TYPEDVAL_UNITS_RE.fullmatch(p_val)
+		if not mo is None:
+			num = _typedNumber(mo.group(1))
+			if not num is None:
+				ret = UnitValue(num, mo.group(2))
+	return ret
+
+def _slotNames(p_fields) -> tuple:
+	"""Slot names for struct fields. Fields are accessed through _StructField descriptors
+		installed by _attrs_struct.__init_subclass__, holding typed values in these slots"""
+	if isinstance(p_fields, str):
+		p_fields = (p_fields,)
+	return tuple(["_f_" + re_sub(r"\W", "_", f) for f in p_fields])
+
+class _StructField(object):
+	"""Struct field: value is kept typed in a slot (see typedValue), reading the attribute
+		returns it formatted as string, as written to XML"""
+	__slots__ = ("slot",)
+	def __init__(self, p_slot) -> None:
+		self.slot = p_slot
+	def __get__(self, obj, objtype=None):
+		if obj is None:
+			return self
+		ret = self.slot.__get__(obj, objtype)
+		if not ret is None and not isinstance(ret, str):
+			ret = str(ret)
+		return ret
+	def __set__(self, obj, value) -> None:
+		self.slot.__set__(obj, typedValue(value))
+	def __delete__(self, obj) -> None:
+		self.slot.__delete__(obj)
+
 class _attrs_struct(object):
 	
 	_fields = None # Required -- list to be extended in subclasses
 	_subfields = [] # Optional -- list to be extended in subclasses
-	
+	# Subclasses declare their own fields as slots: __slots__ = _slotNames(_fields), 
+	# '_units' is here as _subfields list is shared among all structs
+	__slots__ = ("_unusedattrs", "_units")
+
+	_slotmap = {}
+
+	def __init_subclass__(cls, **kwargs) -> None:
+		super().__init_subclass__(**kwargs)
+		if cls._fields is None:
+			return
+		fields = (cls._fields,) if isinstance(cls._fields, str) else cls._fields
+		slotmap = dict(cls._slotmap)
+		for f, slot in zip(fields, _slotNames(fields)):
+			descr = getattr(cls, slot, None)
+			if not descr is None:
+				setattr(cls, f, _StructField(descr))
+				slotmap[f] = slot
+		cls._slotmap = slotmap
+
+	def _typed(self, p_attr: str):
+		"Typed field value, AttributeError if not set"
+		slot = self._slotmap.get(p_attr)
+		if slot is None:
+			return typedValue(getattr(self, p_attr))
+		return getattr(self, slot)
+
 	def __init__(self, *args, defaults=None) -> None:
-		self._unusedattrs = []
+		# list only created if unused attributes exist
+		self._unusedattrs = ()
 		self.setall(*args, defaults=defaults) 
 
 	def getfields(self):
@@ -326,16 +614,16 @@ class _attrs_struct(object):
 			if i < la:
 				val = args[i]
 				if not val is None:
-					setattr(self, fld, str(val))
+					setattr(self, fld, typedValue(val))
 					used_fldindexes.add(i)
 			else:
 				revi = lf - i - 1
 				if not defaults is None:
 					if len(defaults) > revi:
-						val = str(defaults[revi])
+						val = defaults[revi]
 					else:
-						val = str(defaults[-1])
-					setattr(self, fld, val)
+						val = defaults[-1]
+					setattr(self, fld, typedValue(val))
 		if len(self._subfields) > 0:
 			if len(self._subfields) == la - lf:
 				for j, sfld in enumerate(self._subfields):
@@ -345,7 +633,7 @@ class _attrs_struct(object):
 		l = len(used_fldindexes)
 		if l > 0 and l < la:
 			for idx in range(l, la):
-				self._unusedattrs.append(args[idx])
+				self._addUnusedAttr(args[idx])
 		return self
 
 	def getall(self) -> List:
@@ -354,8 +642,13 @@ class _attrs_struct(object):
 			ret.append(self.get(fld))
 		return ret
 
+	def _addUnusedAttr(self, p_value):
+		if not self._unusedattrs:
+			self._unusedattrs = []
+		self._unusedattrs.append(p_value)
+
 	def getUnusedAttrs(self):
-		return self._unusedattrs
+		return list(self._unusedattrs)
 
 	def has(self, p_attr: str):
 		return p_attr in self._fields
@@ -376,7 +669,7 @@ class _attrs_struct(object):
 
 	def set(self, p_attr: str, p_value):
 		if self.has(p_attr):
-			setattr(self, p_attr, str(p_value))
+			setattr(self, p_attr, typedValue(str(p_value) if p_value is None else p_value))
 		return self
 
 	def setHREF(self, p_value):
@@ -386,16 +679,37 @@ class _attrs_struct(object):
 				break
 		return self
 
+	def getNumAndUnit(self, p_attr: str):
+		"Same as toNumberAndUnit applied on field value, without string parsing for typed values"
+		val = self._typed(p_attr)
+		if isinstance(val, UnitValue):
+			ret = (removeDecsep(val.num), val.unit)
+		elif isinstance(val, str):
+			ret = toNumberAndUnit(val)
+		else:
+			ret = (removeDecsep(val), None)
+		return ret
+
 	def getNumeric(self, p_attr: str) -> float:
+		"Numeric value of field, units ignored, None if not set"
 		ret = None
 		if self.has(p_attr) and hasattr(self, p_attr):
-			ret, _u = toNumberAndUnit(getattr(self, p_attr))
+			ret, _u = self.getNumAndUnit(p_attr)
+		return ret
+
+	def getNumber(self, p_attr: str):
+		"Same as strictToNumber applied on field value: raises ValueWithUnitsError if value has units"
+		val = self._typed(p_attr)
+		if isinstance(val, (int, float)):
+			ret = removeDecsep(val)
+		else:
+			ret = strictToNumber(val)
 		return ret
 
 	def __repr__(self):
 		out = [self.__class__.__name__]
-		for x in self.__dict__.keys():
-			if x in self._fields:
+		for x in self._fields:
+			if hasattr(self, x):
 				out.append(f"{x}={getattr(self, x)}")
 		return ' '.join(out)
 
@@ -407,7 +721,7 @@ class _attrs_struct(object):
 	# 	return out
 
 	def sharedItems(self, o: object) -> dict:
-		return {f: getattr(self,f) for f in self._fields if f in dir(o) and hasattr(self,f) and getattr(self,f) == getattr(o,f)}
+		return {f: getattr(self,f) for f in self._fields if hasattr(o,f) and hasattr(self,f) and getattr(self,f) == getattr(o,f)}
 
 	def equality(self, o: object) -> bool:
 		l = len([f for f in self._fields if hasattr(self, f) and not getattr(self, f) is None])
@@ -419,11 +733,15 @@ class _attrs_struct(object):
 	def __ne__(self, o: object) -> bool:
 		return not self.__eq__(o)
 
-	def setXmlAttrs(self, xmlel) -> None:  
+	def setXmlAttrs(self, xmlel, numfmt: Optional[NumFormatter] = None) -> None:  
+		"numfmt: optional NumFormatter for numeric values, default formatting is str()"
 		assert not xmlel is None
 		for f in self._fields:
 			if hasattr(self, f):
-				val = getattr(self, f)
+				if numfmt is None:
+					val = getattr(self, f)
+				else:
+					val = numfmt.fmtValue(self._typed(f))
 				if not val is None:
 					assert not val == "None"
 					xmlel.set(f, str(val))
@@ -432,21 +750,27 @@ class _attrs_struct(object):
 	def getFromXmlAttrs(self, xmlel) -> None:  
 		assert not xmlel is None
 		for f in self._fields:
-			if f in xmlel.keys():
-				val = xmlel.get(f)
-				if not val is None:
-					setattr(self, f, xmlel.get(f))
+			val = xmlel.get(f)
+			if not val is None:
+				# typed value kept if unchanged
+				if not hasattr(self, f) or getattr(self, f) != val:
+					setattr(self, f, val)
 		return self
 
 	def cloneFrom(self, p_other):
 		for l in [self._fields, self._subfields]:
 			for fld in l:
 				if hasattr(p_other, fld):
-					setattr(self, fld, getattr(p_other, fld))
+					if fld in self._fields and fld in p_other._fields:
+						setattr(self, fld, p_other._typed(fld))
+					else:
+						setattr(self, fld, getattr(p_other, fld))
 		return self
 
 class _withunits_struct(_attrs_struct):
 
+	__slots__ = ("_maxattrnum_to_applyunits", "_strictparsing")
+
 	def __init__(self, *args, defaults=None) -> None:
 		self._units = None
 		self._maxattrnum_to_applyunits = 4
@@ -477,19 +801,22 @@ class _withunits_struct(_attrs_struct):
 					break
 				if not hasattr(self, f):
 					continue
-				val = getattr(self, f)
+				val = self._typed(f)
 				numval = None
-				try:
-					numval = int(val)
-				except ValueError:
+				if isinstance(val, (int, float)):
+					numval = val
+				elif isinstance(val, str):
 					try:
-						numval = float(val)
+						numval = int(val)
 					except ValueError:
-						pass
+						try:
+							numval = float(val)
+						except ValueError:
+							pass
 				if not numval is None and numval > 0:
-					setattr(self, f, f"{numval}{self._units}")
+					setattr(self, f, UnitValue(numval, self._units))
 		else:
-			self._unusedattrs.append(self._units)
+			self._addUnusedAttr(self._units)
 			self._units = None
 
 	def getUnits(self) -> str:
@@ -509,8 +836,9 @@ class _withunits_struct(_attrs_struct):
 			yield val
 
 	def iterUnitsRemovedNum(self):
-		for val in self.iterUnitsRemoved():
-			yield removeDecsep(float(val))
+		for f in self._fields:
+			if hasattr(self, f):
+				yield self.getNumAndUnit(f)[0]
 
 class _kwarg_attrs_struct(object):
 	
@@ -549,6 +877,7 @@ class _kwarg_attrs_struct(object):
 
 class Env(_attrs_struct):
 	_fields = ("minx",  "miny", "maxx", "maxy") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=["0"])
 	def defFromPointList(self, p_ptlist):
@@ -575,30 +904,28 @@ class Env(_attrs_struct):
 			self.maxx = maxx
 			self.maxy = maxy
 	def getWidth(self):
-		a = strictToNumber(self.maxx)
-		b = strictToNumber(self.minx)
+		a = self.getNumber("maxx")
+		b = self.getNumber("minx")
 		return a - b
 	def getHeight(self):
-		a = strictToNumber(self.maxy)
-		b = strictToNumber(self.miny)
+		a = self.getNumber("maxy")
+		b = self.getNumber("miny")
 		return a - b
 	def getMidPt(self) -> Pt:
-		a = strictToNumber(self.minx)
-		b = strictToNumber(self.miny)
+		a = self.getNumber("minx")
+		b = self.getNumber("miny")
 		return Pt(a + (self.getWidth() / 2.0),
 					b + (self.getHeight() / 2.0))
 	def getRectParams(self):
 		outlist = []
-		outlist.append(self.minx)
-		outlist.append(self.miny)
+		outlist.append(self._typed("minx"))
+		outlist.append(self._typed("miny"))
 		outlist.append(self.getWidth())
 		outlist.append(self.getHeight())
 		return outlist
 	def cloneFromOther(self, other):
-		self.minx = other.minx
-		self.miny = other.miny
-		self.maxx = other.maxx
-		self.maxy = other.maxy
+		for fld in self._fields:
+			setattr(self, fld, other._typed(fld))
 		return self
 	def centerAndDims(self, cntPt, dimx, dimy):
 		self.minx = removeDecsep(strictToNumber(cntPt.x) - dimx/2.0)
@@ -607,14 +934,8 @@ class Env(_attrs_struct):
 		self.maxy = removeDecsep(strictToNumber(cntPt.y) + dimy/2.0)
 		return self
 	def expandFromOther(self, other):
-		a = strictToNumber(self.minx)
-		b = strictToNumber(self.miny)
-		c = strictToNumber(self.maxx)
-		d = strictToNumber(self.maxy)
-		e = strictToNumber(other.minx)
-		f = strictToNumber(other.miny)
-		g = strictToNumber(other.maxx)
-		h = strictToNumber(other.maxy)
+		a, b, c, d = [self.getNumber(fld) for fld in self._fields]
+		e, f, g, h = [other.getNumber(fld) for fld in other._fields]
 		if e < a:
 			self.minx = e
 		if f < b:
@@ -625,10 +946,7 @@ class Env(_attrs_struct):
 			self.maxy = h
 		return self
 	def expandFromPoint(self, pt):
-		a = strictToNumber(self.minx)
-		b = strictToNumber(self.miny)
-		c = strictToNumber(self.maxx)
-		d = strictToNumber(self.maxy)
+		a, b, c, d = [self.getNumber(fld) for fld in self._fields]
 		if pt.x < a:
 			self.minx = pt.x
 		if pt.y < b:
@@ -648,27 +966,302 @@ class Env(_attrs_struct):
 		self.maxy = pt.y + newhheight 	
 		return self
 	def invertY(self):
-		tmp = self.maxy
-		self.maxy = self.miny
+		tmp = self._typed("maxy")
+		self.maxy = self._typed("miny")
 		self.miny = tmp
+	def getBounds(self) -> tuple:
+		"(minx, miny, maxx, maxy) numbers"
+		return tuple([self.getNumber(fld) for fld in self._fields])
+
+# spatial indexing
+
+def _strOrder(p_boxes, p_capacity: int):
+	"Sort-Tile-Recursive order of boxes: vertical slices by center x, each one sorted by center y"
+	n = len(p_boxes)
+	nslices = int(np.ceil(np.sqrt(np.ceil(n / p_capacity))))
+	cx = p_boxes[:, 0] + p_boxes[:, 2]
+	cy = p_boxes[:, 1] + p_boxes[:, 3]
+	sliceids = np.empty(n, dtype=np.int64)
+	sliceids[np.argsort(cx, kind="stable")] = np.arange(n) // (nslices * p_capacity)
+	return np.lexsort((cy, sliceids))
+
+def _rangesConcat(p_starts, p_ends):
+	"Concatenation of integer ranges [start, end)"
+	lengths = p_ends - p_starts
+	total = int(lengths.sum())
+	if total == 0:
+		return np.empty(0, dtype=np.int64)
+	return np.repeat(p_starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+
+def _boxesHit(p_boxes, minx, miny, maxx, maxy):
+	return (p_boxes[:, 0] <= maxx) & (p_boxes[:, 2] >= minx) & (p_boxes[:, 1] <= maxy) & (p_boxes[:, 3] >= miny)
+
+class SpatialIndex(object):
+	"""Boxes (minx, miny, maxx, maxy) keyed by integers, in a packed STR (Sort-Tile-Recursive) tree
+		built in bulk with NumPy, searched level by level, in logarithmic time.
+		Boxes inserted or deleted after a build are kept apart, inserted ones searched linearly, 
+		until their number goes over REPACK_RATIO of the tree size, when the tree is rebuilt on 
+		next search."""
+
+	NODE_CAPACITY = 16
+	REPACK_RATIO = 0.1
+	REPACK_MIN = 512
+
+	__slots__ = ("_boxes", "_treekeys", "_treeboxes", "_levels", "_added", "_removed", "_overlay")
+
+	def __init__(self) -> None:
+		# all current boxes by key
+		self._boxes = {}
+		self._treekeys = np.empty(0, dtype=np.int64)
+		self._treeboxes = np.empty((0, 4), dtype=np.float64)
+		# upper levels, root level last: node boxes and children ranges in level below
+		self._levels = []
+		# changes since last build
+		self._added = {}
+		self._removed = set()
+		# cached arrays: added keys and boxes, removed keys
+		self._overlay = None
+
+	def __len__(self):
+		return len(self._boxes)
+
+	def __contains__(self, p_key: int):
+		return p_key in self._boxes
+
+	def getBox(self, p_key: int) -> Optional[tuple]:
+		return self._boxes.get(p_key)
+
+	def insert(self, p_key: int, p_box) -> None:
+		"Inserts or replaces key box"
+		box = tuple(p_box)
+		if p_key in self._boxes:
+			if self._boxes[p_key] == box:
+				return
+			self.delete(p_key)
+		self._boxes[p_key] = box
+		self._added[p_key] = box
+		self._overlay = None
+
+	def delete(self, p_key: int) -> bool:
+		if self._boxes.pop(p_key, None) is None:
+			return False
+		if self._added.pop(p_key, None) is None:
+			self._removed.add(p_key)
+		self._overlay = None
+		return True
+
+	def build(self):
+		"Packs all boxes in a new tree"
+		n = len(self._boxes)
+		keys = np.fromiter(self._boxes.keys(), dtype=np.int64, count=n)
+		boxes = np.array(list(self._boxes.values()), dtype=np.float64).reshape(n, 4)
+		cap = self.NODE_CAPACITY
+		levels = []
+		if n > 0:
+			order = _strOrder(boxes, cap)
+			keys = keys[order]
+			boxes = boxes[order]
+			lvlboxes = boxes
+			while len(lvlboxes) > 1:
+				starts = np.arange(0, len(lvlboxes), cap)
+				ends = np.minimum(starts + cap, len(lvlboxes))
+				nodeboxes = np.column_stack([np.minimum.reduceat(lvlboxes[:, 0], starts), np.minimum.reduceat(lvlboxes[:, 1], starts),
+					np.maximum.reduceat(lvlboxes[:, 2], starts), np.maximum.reduceat(lvlboxes[:, 3], starts)])
+				if len(nodeboxes) > cap:
+					# nodes grouped in next level by STR order too, each node keeps its children range
+					order = _strOrder(nodeboxes, cap)
+					nodeboxes = nodeboxes[order]
+					starts = starts[order]
+					ends = ends[order]
+				levels.append((nodeboxes, starts, ends))
+				lvlboxes = nodeboxes
+		self._treekeys = keys
+		self._treeboxes = boxes
+		self._levels = levels
+		self._added = {}
+		self._removed = set()
+		self._overlay = None
+		return self
+
+	def _treeSearch(self, minx, miny, maxx, maxy):
+		if len(self._levels) == 0:
+			idxs = np.arange(len(self._treekeys))
+		else:
+			idxs = np.arange(len(self._levels[-1][0]))
+			for nodeboxes, starts, ends in reversed(self._levels):
+				idxs = idxs[_boxesHit(nodeboxes[idxs], minx, miny, maxx, maxy)]
+				idxs = _rangesConcat(starts[idxs], ends[idxs])
+		return self._treekeys[idxs[_boxesHit(self._treeboxes[idxs], minx, miny, maxx, maxy)]]
+
+	def search(self, minx, miny, maxx, maxy):
+		"Keys of boxes intersecting the window, in increasing order"
+		if len(self._added) + len(self._removed) > max(self.REPACK_MIN, self.REPACK_RATIO * len(self._treekeys)):
+			self.build()
+		ret = self._treeSearch(minx, miny, maxx, maxy)
+		if len(self._added) > 0 or len(self._removed) > 0:
+			if self._overlay is None:
+				n = len(self._added)
+				self._overlay = (np.fromiter(self._added.keys(), dtype=np.int64, count=n),
+					np.array(list(self._added.values()), dtype=np.float64).reshape(n, 4),
+					np.fromiter(self._removed, dtype=np.int64, count=len(self._removed)))
+			addedkeys, addedboxes, removed = self._overlay
+			if len(removed) > 0:
+				ret = ret[~np.isin(ret, removed)]
+			ret = np.concatenate((ret, addedkeys[_boxesHit(addedboxes, minx, miny, maxx, maxy)]))
+		ret.sort()
+		return ret
+
+	def searchPoint(self, x, y):
+		"Keys of boxes containing the point, in increasing order"
+		return self.search(x, y, x, y)
+
+# line simplification
+
+def _simplifyCoords(p_coords, p_ring: bool):
+	"(N,2) float array, closed flag and minimum kept vertices count"
+	pts = np.asarray(p_coords, dtype=np.float64).reshape(-1, 2)
+	n = len(pts)
+	explicit = n > 3 and pts[0, 0] == pts[-1, 0] and pts[0, 1] == pts[-1, 1]
+	closed = explicit or (p_ring and n >= 3)
+	if explicit:
+		minkept = 4
+	elif closed:
+		minkept = 3
+	else:
+		minkept = 2
+	return pts, closed, minkept
+
+def simplifyDP(p_coords, p_tolerance: float, ring=False):
+	"""Douglas-Peucker simplification of (N,2) coords, returns kept vertices mask. 
+		Vertices closer than p_tolerance to the simplified line are dropped. All ranges 
+		at a recursion depth are split together, in a few array operations.
+		Closed rings (last vertex repeating the first, or ring=True) are split first at 
+		the vertex farthest from the first one, and keep at least three distinct vertices"""
+	pts, closed, minkept = _simplifyCoords(p_coords, ring)
+	n = len(pts)
+	keep = np.zeros(n, dtype=bool)
+	if n <= minkept:
+		keep[:] = True
+		return keep
+	keep[0] = keep[-1] = True
+	if closed:
+		far = int(np.argmax(((pts - pts[0]) ** 2).sum(axis=1)))
+		keep[far] = True
+		starts = np.array([0, far], dtype=np.int64)
+		ends = np.array([far, n - 1], dtype=np.int64)
+	else:
+		starts = np.array([0], dtype=np.int64)
+		ends = np.array([n - 1], dtype=np.int64)
+	xs = np.ascontiguousarray(pts[:, 0])
+	ys = np.ascontiguousarray(pts[:, 1])
+	tol2 = float(p_tolerance) ** 2
+	# best split points, for closed rings left with too few vertices
+	bestidx = -1
+	bestdist = -1.0
+	while True:
+		lens = ends - starts - 1
+		sel = lens > 0
+		if not sel.any():
+			break
+		starts = starts[sel]
+		ends = ends[sel]
+		lens = lens[sel]
+		idx = _rangesConcat(starts + 1, ends)
+		rids = np.repeat(np.arange(len(starts)), lens)
+		# distance to chord segment, chord end points may coincide
+		dx = xs[ends] - xs[starts]
+		dy = ys[ends] - ys[starts]
+		dd = dx * dx + dy * dy
+		invdd = np.divide(1.0, dd, out=np.zeros(len(dd)), where=dd > 0)[rids]
+		dx = dx[rids]
+		dy = dy[rids]
+		pax = xs[idx] - xs[starts][rids]
+		pay = ys[idx] - ys[starts][rids]
+		t = (pax * dx + pay * dy) * invdd
+		np.clip(t, 0.0, 1.0, out=t)
+		pax -= t * dx
+		pay -= t * dy
+		dist2 = pax * pax + pay * pay
+		offsets = np.cumsum(lens) - lens
+		maxd = np.maximum.reduceat(dist2, offsets)
+		split = maxd > tol2
+		if closed and not split.all():
+			i = int(np.argmax(maxd))
+			if maxd[i] > bestdist:
+				bestdist = float(maxd[i])
+				bestidx = int(idx[offsets[i] + np.argmax(dist2[offsets[i]:offsets[i]+lens[i]])])
+		if not split.any():
+			break
+		ismax = np.flatnonzero((dist2 == maxd[rids]) & split[rids])
+		_u, firsts = np.unique(rids[ismax], return_index=True)
+		far = idx[ismax[firsts]]
+		keep[far] = True
+		starts, ends = np.concatenate((starts[split], far)), np.concatenate((far, ends[split]))
+	if closed and keep.sum() < minkept and bestidx >= 0:
+		keep[bestidx] = True
+	return keep
+
+def simplifyVW(p_coords, p_tolerance: float, ring=False):
+	"""Visvalingam-Whyatt simplification of (N,2) coords, returns kept vertices mask. 
+		Vertices whose triangle with their neighbours has less area than p_tolerance squared 
+		are dropped, smallest first. Each round drops every vertex with a smaller area than 
+		its neighbours, areas then recomputed, instead of one vertex at a time from a heap. 
+		End vertices are kept, closed rings keep at least three distinct vertices"""
+	pts, _closed, minkept = _simplifyCoords(p_coords, ring)
+	n = len(pts)
+	keep = np.ones(n, dtype=bool)
+	thr2 = 2.0 * float(p_tolerance) ** 2
+	idx = np.arange(n)
+	while len(idx) > minkept:
+		p0 = pts[idx[:-2]]
+		p1 = pts[idx[1:-1]]
+		p2 = pts[idx[2:]]
+		# twice the triangle areas
+		area2 = np.abs((p1[:, 0] - p0[:, 0]) * (p2[:, 1] - p0[:, 1]) - (p2[:, 0] - p0[:, 0]) * (p1[:, 1] - p0[:, 1]))
+		small = area2 < thr2
+		if not small.any():
+			break
+		left = np.concatenate(([np.inf], area2[:-1]))
+		right = np.concatenate((area2[1:], [np.inf]))
+		drop = np.flatnonzero(small & (area2 < left) & (area2 <= right))
+		excess = len(idx) - len(drop) - minkept
+		if excess < 0:
+			drop = drop[np.argsort(area2[drop], kind="stable")[:len(drop)+excess]]
+		keep[idx[1:-1][drop]] = False
+		if excess <= 0:
+			break
+		idx = np.flatnonzero(keep)
+	return keep
+
+SIMPLIFY_METHODS = {
+	"dp": simplifyDP,
+	"vw": simplifyVW
+}
 
 # transforms
 
 class transform_def(_attrs_struct):
 	_fields = ()
 	_optfields = ()
+	# factors and angles, not rounded at coordinates precision
+	_ratiofields = ()
 	_label = ""
+	__slots__ = ()
 	def getFromXmlAttrs(self, xmlel) -> None:  
 		raise NotImplementedError("transform attribs not to be translated to xml attribs")
-	def setXmlAttrs(self, xmlel) -> None:  
+	def setXmlAttrs(self, xmlel, numfmt: Optional[NumFormatter] = None) -> None:  
 		raise NotImplementedError("transform attribs not to be translated to xml attribs")
 	def validate(self):
 		for f in self._fields:
 			if not hasattr(self, f) and f not in self._optfields:
 				raise TypeError(f"{self._label}, required value '{f}' not provided")
 		return self
-	def get(self):
-		return f"{self._label}({','.join([getattr(self, f) for f in self._fields if hasattr(self, f)])})"
+	def get(self, numfmt: Optional[NumFormatter] = None):
+		if numfmt is None:
+			vals = [getattr(self, f) for f in self._fields if hasattr(self, f)]
+		else:
+			vals = [(_RAW_FORMATTER if f in self._ratiofields else numfmt).fmtValue(self._typed(f)) for f in self._fields if hasattr(self, f)]
+		return f"{self._label}({','.join(vals)})"
 	def getvalue(self, p_field: str):
 		ret = None
 		if p_field in self._fields and hasattr(self, p_field):
@@ -677,65 +1270,142 @@ class transform_def(_attrs_struct):
 	def setvalue(self, p_field: str, p_value):
 		if p_field not in self._fields:
 			raise WrongValueTransformDef(self, p_field)
-		setattr(self, p_field, str(p_value))
+		setattr(self, p_field, p_value)
 		return self
+	def _optNumber(self, p_field: str, p_default):
+		return self.getNumber(p_field) if hasattr(self, p_field) else p_default
+	def getMatrix(self) -> np.ndarray:
+		"""3x3 affine matrix, on homogeneous column coordinates. Abstract, implemented by each 
+			transform (Mat, Trans, Scale, Rotate, SkewX, SkewY), used by affineCompose"""
+		raise NotImplementedError(f"{self.__class__.__name__}: no affine matrix")
 
 class Mat(transform_def):
 	_fields = ("a", "b", "c", "d", "e", "f")
+	__slots__ = _slotNames(_fields)
+	_ratiofields = ("a", "b", "c", "d")
 	_label = "matrix"
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 		self.validate()
+	def getMatrix(self) -> np.ndarray:
+		a, b, c, d, e, f = [self.getNumber(fld) for fld in self._fields]
+		return np.array(((a, c, e), (b, d, f), (0.0, 0.0, 1.0)), dtype=np.float64)
 
 class Trans(transform_def):
 	_fields = ("tx", "ty")
+	__slots__ = _slotNames(_fields)
 	_optfields = ("ty",)
 	_label = "translate"
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 		self.validate()
+	def getMatrix(self) -> np.ndarray:
+		return np.array(((1.0, 0.0, self.getNumber("tx")), (0.0, 1.0, self._optNumber("ty", 0.0)), (0.0, 0.0, 1.0)), dtype=np.float64)
 	def yinvert(self, p_yheight):
 		if hasattr(self, "ty"):
-			setattr(self, "ty", str(p_yheight - strictToNumber(getattr(self, "ty"))))
+			setattr(self, "ty", p_yheight - self.getNumber("ty"))
 
 class Scale(transform_def):
 	_fields = ("sx", "sy")
+	__slots__ = _slotNames(_fields)
 	_optfields = ("sy",)
+	_ratiofields = _fields
 	_label = "scale"
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 		self.validate()
+	def getMatrix(self) -> np.ndarray:
+		sx = self.getNumber("sx")
+		return np.array(((sx, 0.0, 0.0), (0.0, self._optNumber("sy", sx), 0.0), (0.0, 0.0, 1.0)), dtype=np.float64)
 
 class Rotate(transform_def):
 	_fields = ("rotate-angle", "cx", "cy")
+	__slots__ = _slotNames(_fields)
 	_optfields = ("cx", "cy")
+	_ratiofields = ("rotate-angle",)
 	_label = "rotate"
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 		self.validate()
+	def getMatrix(self) -> np.ndarray:
+		cs, sn = _rotationCosSin(self.getNumber("rotate-angle"))
+		cx = self._optNumber("cx", 0.0)
+		cy = self._optNumber("cy", 0.0)
+		return np.array(((cs, -sn, cx - cs * cx + sn * cy), (sn, cs, cy - sn * cx - cs * cy), (0.0, 0.0, 1.0)), dtype=np.float64)
 	def yinvert(self, p_yheight):
 		if hasattr(self, "cy"):
-			setattr(self, "cy", str(p_yheight - strictToNumber(getattr(self, "cy"))))
+			setattr(self, "cy", p_yheight - self.getNumber("cy"))
 
 class SkewX(transform_def):
 	_fields = ("skew-angle",)
+	__slots__ = _slotNames(_fields)
+	_ratiofields = _fields
 	_label = "skewX"
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 		self.validate()
+	def getMatrix(self) -> np.ndarray:
+		return np.array(((1.0, tan(radians(self.getNumber("skew-angle"))), 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)), dtype=np.float64)
 
 class SkewY(transform_def):
 	_fields = ("skew-angle",)
+	__slots__ = _slotNames(_fields)
+	_ratiofields = _fields
 	_label = "skewY"
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 		self.validate()
+	def getMatrix(self) -> np.ndarray:
+		return np.array(((1.0, 0.0, 0.0), (tan(radians(self.getNumber("skew-angle"))), 1.0, 0.0), (0.0, 0.0, 1.0)), dtype=np.float64)
+
+# affine transforms, 3x3 matrices on homogeneous column coordinates
+
+ROTATION_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=ROTATION_CACHE_SIZE)
+def _rotationCosSin(p_degangle):
+	ang = radians(p_degangle)
+	return cos(ang), sin(ang)
+
+def affineCompose(p_transforms) -> np.ndarray:
+	"""Matrix of a transform_def list, as written in a 'transform' attribute (last one 
+		applied first), or of a list of matrices"""
+	ret = np.identity(3)
+	for tr in p_transforms:
+		ret = ret @ (tr.getMatrix() if isinstance(tr, transform_def) else tr)
+	return ret
+
+def affineInvert(p_matrix) -> np.ndarray:
+	"Inverse affine matrix, raises SingularTransformError if determinant is under NANODELTA"
+	m = np.asarray(p_matrix, dtype=np.float64)
+	(a, c, e), (b, d, f) = m[:2].tolist()
+	det = a * d - b * c
+	if abs(det) < NANODELTA:
+		raise SingularTransformError(m)
+	na = d / det
+	nb = -b / det
+	nc = -c / det
+	nd = a / det
+	return np.array(((na, nc, -na * e - nc * f), (nb, nd, -nb * e - nd * f), (0.0, 0.0, 1.0)), dtype=np.float64)
+
+def affineApply(p_matrix, p_coords) -> np.ndarray:
+	"Transformed (N,2) coordinates array"
+	m = np.asarray(p_matrix, dtype=np.float64)
+	pts = np.asarray(p_coords, dtype=np.float64).reshape(-1, 2)
+	return pts @ m[:2,:2].T + m[:2,2]
+
+def affineBounds(p_matrix, p_box) -> tuple:
+	"Box (minx, miny, maxx, maxy) enclosing the transformed p_box"
+	minx, miny, maxx, maxy = p_box
+	pts = affineApply(p_matrix, ((minx, miny), (minx, maxy), (maxx, miny), (maxx, maxy)))
+	return (*pts.min(axis=0).tolist(), *pts.max(axis=0).tolist())
 
 # Path commands
 
 class path_command(_attrs_struct):
 	_fields = ()
 	_letter = ""
+	__slots__ = ("letter",)
 	#_y_valinverts = ()
 	_y_signinverts = ()
 	
@@ -746,29 +1416,41 @@ class path_command(_attrs_struct):
 		self.validate()
 	def getLetter(self):
 		return self.letter
+	def getFirstLetter(self):
+		return self.letter
 	# def eqLetter(self, o) -> bool:
 	# 	print("\n self:", self.getLetter(), ", other:", o.getLetter())
 	# 	return self.getLetter() == o.getLetter()
 	def getFromXmlAttrs(self, xmlel) -> None:  
 		raise NotImplementedError("transform attribs not to translated to xml attribs")
-	def setXmlAttrs(self, xmlel) -> None:  
+	def setXmlAttrs(self, xmlel, numfmt: Optional[NumFormatter] = None) -> None:  
 		raise NotImplementedError("transform attribs not to translated to xml attribs")
 	def validate(self):
 		for f in self._fields:
 			if not hasattr(self, f):
 				raise TypeError(f"{self.letter}, required value '{f}' not provided")
 		return self
-	def get(self, omitletter: Optional[bool] = False):
+	def get(self, omitletter: Optional[bool] = False, numfmt: Optional[NumFormatter] = None):
 		buf = []
 		first_is_positive = False
-		vals = [getattr(self, f) for f in self._fields]
+		vals = [self._typed(f) for f in self._fields]
 		for i, v in enumerate(vals):
+			if isinstance(v, str):
+				num = float(v)
+			else:
+				num = v
+			if numfmt is None:
+				v = str(v)
+			else:
+				v = numfmt.fmt(num)
+				# sign of the formatted value, small negatives may be rounded to zero
+				num = -1 if v.startswith('-') else 0
 			if i == 0:
 				buf.append(v)
-				if float(v) >= 0:
+				if num >= 0:
 					first_is_positive = True
 			else:
-				if float(v) >= 0:
+				if num >= 0:
 					buf.append(' ')
 				buf.append(v)
 		if omitletter:
@@ -787,13 +1469,14 @@ class path_command(_attrs_struct):
 	def setvalue(self, p_field: str, p_value):
 		if p_field not in self._fields:
 			raise WrongValuePathCmd(self, p_field)
-		setattr(self, p_field, str(p_value))
+		setattr(self, p_field, p_value)
 		return self
 	# def yinvert(self, p_yheight):
 	# 	for f in self._y_valinverts:
 	# 		self.setvalue(f, strictToNumber(self.getvalue(f)))
 
 class rel_path_command(path_command):
+	__slots__ = ("relative",)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args)
 		self.setRelative(relative)
@@ -806,31 +1489,40 @@ class rel_path_command(path_command):
 			self.letter = self._letter.upper()
 	def isRelative(self):
 		return self.relative
+	def _yinvertFields(self, p_yheight, p_fields):
+		"Absolute y becomes p_yheight - y, relative y changes sign"
+		for fld in p_fields:
+			if hasattr(self, fld):
+				if self.relative:
+					setattr(self, fld, -self.getNumber(fld))
+				else:
+					setattr(self, fld, p_yheight - self.getNumber(fld))
 
 class pM(rel_path_command):
 	"Move to"
 	_fields = ("x", "y")
 	_letter = "M"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		if hasattr(self, "y"):
-			setattr(self, "y", str(p_yheight - strictToNumber(getattr(self, "y"))))
+		self._yinvertFields(p_yheight, ("y",))
 	
 class pL(rel_path_command):
 	"Line to"
 	_fields = ("x", "y")
 	_letter = "L"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		if hasattr(self, "y"):
-			setattr(self, "y", str(p_yheight - strictToNumber(getattr(self, "y"))))
+		self._yinvertFields(p_yheight, ("y",))
 
 class pH(rel_path_command):
 	"Horizontal line to"
 	_fields = ("x")
 	_letter = "H"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 
@@ -838,68 +1530,522 @@ class pV(rel_path_command):
 	"Vertical line to"
 	_fields = ("y")
 	_letter = "V"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		if hasattr(self, "y"):
-			setattr(self, "y", str(p_yheight - strictToNumber(getattr(self, "y"))))
+		self._yinvertFields(p_yheight, ("y",))
 
 class pC(rel_path_command):
 	"Cubic Bézier"
 	_fields = ("x1", "y1", "x2", "y2", "x", "y")
 	_letter = "C"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		for fld in ("y1", "y2", "y"):
-			if hasattr(self, fld):
-				setattr(self, fld, str(p_yheight - strictToNumber(getattr(self, fld))))
+		self._yinvertFields(p_yheight, ("y1", "y2", "y"))
 
 class pS(rel_path_command):
 	"Shorthand cubic Bézier"
 	_fields = ("x2", "y2", "x", "y")
 	_letter = "S"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		for fld in ("y2", "y"):
-			if hasattr(self, fld):
-				setattr(self, fld, str(p_yheight - strictToNumber(getattr(self, fld))))
+		self._yinvertFields(p_yheight, ("y2", "y"))
 
 class pQ(rel_path_command):
 	"Quadratic Bézier"
 	_fields = ("x1", "y1", "x", "y")
 	_letter = "Q"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		for fld in ("y1", "y"):
-			if hasattr(self, fld):
-				setattr(self, fld, str(p_yheight - strictToNumber(getattr(self, fld))))
+		self._yinvertFields(p_yheight, ("y1", "y"))
 
 class pT(rel_path_command):
 	"Shorthand quadratic Bézier"
 	_fields = ("x", "y")
 	_letter = "T"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		if hasattr(self, "y"):
-			setattr(self, "y", str(p_yheight - strictToNumber(getattr(self, "y"))))
+		self._yinvertFields(p_yheight, ("y",))
 
 class pA(rel_path_command):
 	"Eliptical arc"
 	_fields = ("rx", "ry", "x-axis-rotation", "large-arc-flag", "sweep-flag", "x", "y")
 	_letter = "A"
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, relative: Optional[bool] = False) -> None:
 		super().__init__(*args, relative=relative)
 	def yinvert(self, p_yheight):
-		if hasattr(self, "y"):
-			setattr(self, "y", str(p_yheight - strictToNumber(getattr(self, "y"))))
+		"Mirrored arc: rotation changes sign and sweep direction is reversed"
+		self._yinvertFields(p_yheight, ("y",))
+		if hasattr(self, "x-axis-rotation"):
+			setattr(self, "x-axis-rotation", -self.getNumber("x-axis-rotation"))
+		if hasattr(self, "sweep-flag"):
+			setattr(self, "sweep-flag", 1 - self.getNumber("sweep-flag"))
 
 class pClose(path_command):
 	_fields = ()
 	_letter = "z"
+	__slots__ = ()
 	def __init__(self, *args) -> None:
 		super().__init__(*args)
 
+class pEncoded(path_command):
+	"Already encoded run of path commands, always starting with an absolute 'move to'"
+	_fields = ()
+	_letter = "M"
+	__slots__ = ("text", "lastletter", "lastrelative")
+	def __init__(self, p_text: str, lastletter: str, lastrelative: Optional[bool] = False) -> None:
+		super().__init__()
+		self.text = p_text
+		self.lastletter = lastletter
+		self.lastrelative = lastrelative
+	def getLetter(self):
+		return self.lastletter
+	def getFirstLetter(self):
+		return self._letter
+	def isRelative(self):
+		return self.lastrelative
+	def setRelative(self, is_relative: bool):
+		# starts with an absolute 'move to', nothing to change
+		pass
+	def get(self, omitletter: Optional[bool] = False, numfmt: Optional[NumFormatter] = None):
+		return self.text
+
+
+# Array-backed path commands
+
+# opcodes, in this order
+_PB_LETTERS = ("M", "L", "H", "V", "C", "S", "Q", "T", "A", "Z")
+_PB_OPCODES = {l: i for i, l in enumerate(_PB_LETTERS)}
+_PB_M, _PB_L, _PB_H, _PB_V, _PB_C, _PB_S, _PB_Q, _PB_T, _PB_A, _PB_Z = range(10)
+_PB_NARGS = np.array([2, 2, 1, 1, 6, 4, 4, 2, 7, 0], dtype=np.int64)
+_PB_NARGS_LIST = _PB_NARGS.tolist()
+_PB_UPPER = np.array(["M", "L", "H", "V", "C", "S", "Q", "T", "A", "z"], dtype=object)
+_PB_LOWER = np.array(["m", "l", "h", "v", "c", "s", "q", "t", "a", "z"], dtype=object)
+
+# coordinate roles
+_PBR_X, _PBR_Y, _PBR_RX, _PBR_RY, _PBR_ROT, _PBR_LARGE, _PBR_SWEEP = range(7)
+_PB_ROLES = np.full((10, 7), -1, dtype=np.int8)
+for _op, _roles in enumerate(((0, 1), (0, 1), (0,), (1,), (0, 1, 0, 1, 0, 1), (0, 1, 0, 1), (0, 1, 0, 1), 
+		(0, 1), (2, 3, 4, 5, 6, 0, 1), ())):
+	_PB_ROLES[_op, :len(_roles)] = _roles
+
+class PathBuffer(object):
+	"""Compact run of path commands: an opcode array, a relative / absolute flags array and
+		a float64 coordinates array, with vectorized transformations.
+		Behaves as a path command, to be added to AnalyticalPath with addCmd, output equals
+		adding the equivalent path command objects, yinvert included. If changed after being added, 
+		AnalyticalPath.refresh must be called."""
+
+	__slots__ = ("_ops", "_rel", "_coords", "_n", "_nc")
+
+	_COMMANDS = (pM, pL, pH, pV, pC, pS, pQ, pT, pA, pClose)
+
+	def __init__(self, capacity: int = 16) -> None:
+		self._ops = np.empty(capacity, dtype=np.int8)
+		self._rel = np.empty(capacity, dtype=np.bool_)
+		self._coords = np.empty(2 * capacity, dtype=np.float64)
+		self._n = 0
+		self._nc = 0
+
+	@classmethod
+	def fromPathData(cls, p_data: str):
+		"Parses SVG path data, see parsePathData"
+		return parsePathData(p_data)
+
+	@classmethod
+	def fromArrays(cls, p_ops, p_rel, p_coords):
+		"From opcodes, relative flags and coordinates, no validation made"
+		ret = cls(capacity=0)
+		ret._ops = np.asarray(p_ops, dtype=np.int8)
+		ret._rel = np.asarray(p_rel, dtype=np.bool_)
+		ret._coords = np.asarray(p_coords, dtype=np.float64)
+		ret._n = len(ret._ops)
+		ret._nc = len(ret._coords)
+		return ret
+
+	@classmethod
+	def fromCommands(cls, p_cmds):
+		ret = cls(capacity=max(len(p_cmds), 1))
+		for cmd in p_cmds:
+			ret.appendCmd(cmd)
+		return ret
+
+	def __len__(self):
+		return self._n
+
+	def nbytes(self) -> int:
+		"Memory used by commands data arrays"
+		return self._ops.nbytes + self._rel.nbytes + self._coords.nbytes
+
+	def trim(self):
+		"Releases unused capacity"
+		self._ops = self._ops[:self._n].copy()
+		self._rel = self._rel[:self._n].copy()
+		self._coords = self._coords[:self._nc].copy()
+		return self
+
+	def _reserve(self, p_ncmds: int, p_ncoords: int) -> None:
+		if self._n + p_ncmds > len(self._ops):
+			cap = max(2 * len(self._ops), self._n + p_ncmds)
+			self._ops = np.resize(self._ops, cap)
+			self._rel = np.resize(self._rel, cap)
+		if self._nc + p_ncoords > len(self._coords):
+			cap = max(2 * len(self._coords), self._nc + p_ncoords)
+			self._coords = np.resize(self._coords, cap)
+
+	def add(self, p_letter: str, *args, relative: Optional[bool] = False):
+		"Appends command by letter (upper case), ex.: add('C', x1, y1, x2, y2, x, y)"
+		op = _PB_OPCODES[p_letter]
+		nargs = _PB_NARGS[op]
+		if len(args) != nargs:
+			raise TypeError(f"{p_letter}, {nargs} values expected, got {len(args)}")
+		self._reserve(1, nargs)
+		n = self._n
+		nc = self._nc
+		self._ops[n] = op
+		self._rel[n] = relative or op == _PB_Z
+		if nargs > 0:
+			self._coords[nc:nc+nargs] = args
+		self._n = n + 1
+		self._nc = nc + nargs
+		return self
+
+	def moveTo(self, x, y, relative: Optional[bool] = False):
+		return self.add("M", x, y, relative=relative)
+
+	def lineTo(self, x, y, relative: Optional[bool] = False):
+		return self.add("L", x, y, relative=relative)
+
+	def hLineTo(self, x, relative: Optional[bool] = False):
+		return self.add("H", x, relative=relative)
+
+	def vLineTo(self, y, relative: Optional[bool] = False):
+		return self.add("V", y, relative=relative)
+
+	def cubicTo(self, x1, y1, x2, y2, x, y, relative: Optional[bool] = False):
+		return self.add("C", x1, y1, x2, y2, x, y, relative=relative)
+
+	def arcTo(self, rx, ry, xaxisrotation, largearcflag, sweepflag, x, y, relative: Optional[bool] = False):
+		return self.add("A", rx, ry, xaxisrotation, largearcflag, sweepflag, x, y, relative=relative)
+
+	def close(self):
+		return self.add("Z")
+
+	def addPolyline(self, p_coords, closed=False):
+		"Appends absolute 'move to' and 'line to' commands from an (N,2) array of points"
+		pts = np.asarray(p_coords, dtype=np.float64).reshape(-1, 2)
+		l = len(pts)
+		if l > 0:
+			ncmds = l + (1 if closed else 0)
+			self._reserve(ncmds, 2 * l)
+			n = self._n
+			self._ops[n:n+l] = _PB_L
+			self._ops[n] = _PB_M
+			self._rel[n:n+l] = False
+			if closed:
+				self._ops[n+l] = _PB_Z
+				self._rel[n+l] = True
+			self._coords[self._nc:self._nc+2*l] = pts.ravel()
+			self._n = n + ncmds
+			self._nc = self._nc + 2 * l
+		return self
+
+	def appendCmd(self, p_cmd: path_command):
+		if isinstance(p_cmd, pEncoded):
+			raise TypeError("already encoded commands cannot be added to PathBuffer")
+		if isinstance(p_cmd, PathBuffer):
+			for cmd in p_cmd.toCommands():
+				self.appendCmd(cmd)
+			return self
+		relative = p_cmd.isRelative() if hasattr(p_cmd, "isRelative") else False
+		return self.add(p_cmd._letter.upper(), *[p_cmd.getNumber(f) for f in p_cmd._fields], relative=relative)
+
+	def toCommands(self) -> List[path_command]:
+		ret = []
+		pos = 0
+		coords = self._coords[:self._nc].tolist()
+		for op, rel in zip(self._ops[:self._n].tolist(), self._rel[:self._n].tolist()):
+			nargs = int(_PB_NARGS[op])
+			args = [removeDecsep(v) for v in coords[pos:pos+nargs]]
+			pos += nargs
+			if op == _PB_Z:
+				ret.append(pClose())
+			else:
+				ret.append(self._COMMANDS[op](*args, relative=rel))
+		return ret
+
+	def _coordRoles(self):
+		"Role and relative flag of each coordinate"
+		ops = self._ops[:self._n]
+		counts = _PB_NARGS[ops]
+		starts = np.cumsum(counts) - counts
+		cmdidx = np.repeat(np.arange(self._n), counts)
+		pos = np.arange(self._nc) - starts[cmdidx]
+		return _PB_ROLES[ops[cmdidx], pos], self._rel[:self._n][cmdidx]
+
+	# transformations
+
+	def translate(self, dx, dy):
+		"Moves absolute coordinates, relative ones are unchanged"
+		roles, rel = self._coordRoles()
+		coords = self._coords[:self._nc]
+		coords[(roles == _PBR_X) & ~rel] += dx
+		coords[(roles == _PBR_Y) & ~rel] += dy
+		return self
+
+	def scale(self, sx, sy=None):
+		"""Scales coordinates around origin. Arcs x-axis-rotation is only kept, 
+			exact for uniform scaling or non rotated arcs"""
+		if sy is None:
+			sy = sx
+		roles, _rel = self._coordRoles()
+		coords = self._coords[:self._nc]
+		coords[roles == _PBR_X] *= sx
+		coords[roles == _PBR_Y] *= sy
+		coords[roles == _PBR_RX] *= abs(sx)
+		coords[roles == _PBR_RY] *= abs(sy)
+		if sx * sy < 0:
+			# mirrored, arcs orientation changes
+			mask = roles == _PBR_ROT
+			coords[mask] = -coords[mask]
+			mask = roles == _PBR_SWEEP
+			coords[mask] = 1 - coords[mask]
+		return self
+
+	def yinvert(self, p_yheight):
+		"""Mirrors y coordinates, as path commands yinvert: absolute y becomes p_yheight - y, 
+			relative y changes sign, arcs x-axis-rotation changes sign and sweep-flag is reversed"""
+		roles, rel = self._coordRoles()
+		coords = self._coords[:self._nc]
+		ys = roles == _PBR_Y
+		mask = ys & ~rel
+		coords[mask] = p_yheight - coords[mask]
+		mask = (ys & rel) | (roles == _PBR_ROT)
+		coords[mask] = -coords[mask]
+		mask = roles == _PBR_SWEEP
+		coords[mask] = 1 - coords[mask]
+		return self
+
+	def getBounds(self) -> Optional[tuple]:
+		"""(minx, miny, maxx, maxy) of end and control points, each arc bounded by its ellipse 
+			maximum radius, None if no points"""
+		ops = self._ops[:self._n].tolist()
+		rels = self._rel[:self._n].tolist()
+		coords = self._coords[:self._nc].tolist()
+		xs = []
+		ys = []
+		curx = cury = startx = starty = 0.0
+		# last control point, for smooth curves reflection
+		ctrlx = ctrly = 0.0
+		ci = 0
+		for op, rel in zip(ops, rels):
+			nargs = _PB_NARGS_LIST[op]
+			args = coords[ci:ci+nargs]
+			ci += nargs
+			if op == _PB_Z:
+				curx, cury = startx, starty
+				ctrlx, ctrly = curx, cury
+				continue
+			if op == _PB_H:
+				curx = args[0] + curx if rel else args[0]
+				args = [curx, cury]
+				ctrlx, ctrly = curx, cury
+			elif op == _PB_V:
+				cury = args[0] + cury if rel else args[0]
+				args = [curx, cury]
+				ctrlx, ctrly = curx, cury
+			elif op == _PB_A:
+				rx, ry, rot, _large, _sweep, x, y = args
+				if rel:
+					x += curx
+					y += cury
+				# radii scaled up as needed for the ellipse to reach both end points
+				hdx = (curx - x) / 2.0
+				hdy = (cury - y) / 2.0
+				rx = abs(rx)
+				ry = abs(ry)
+				r = max(rx, ry)
+				if rx > 0 and ry > 0:
+					rrot = radians(rot)
+					x1 = cos(rrot) * hdx + sin(rrot) * hdy
+					y1 = -sin(rrot) * hdx + cos(rrot) * hdy
+					lmbd = (x1 * x1) / (rx * rx) + (y1 * y1) / (ry * ry)
+					if lmbd > 1:
+						r *= lmbd ** 0.5
+				# ellipse points are closer than its diameter from any other
+				d = 2 * r
+				args = [curx, cury, x, y, max(curx, x) - d, max(cury, y) - d, min(curx, x) + d, min(cury, y) + d]
+				curx, cury = x, y
+				ctrlx, ctrly = curx, cury
+			else:
+				if rel:
+					args = [v + (cury if i % 2 else curx) for i, v in enumerate(args)]
+				if op == _PB_S or op == _PB_T:
+					# reflected control point, taken from any previous curve (a superset of bounds)
+					args.extend([2 * curx - ctrlx, 2 * cury - ctrly])
+				if op == _PB_M:
+					startx, starty = args[0], args[1]
+				if op == _PB_T:
+					ctrlx, ctrly = args[2], args[3]
+				elif nargs > 2:
+					ctrlx, ctrly = args[nargs-4], args[nargs-3]
+				else:
+					ctrlx, ctrly = args[0], args[1]
+				curx, cury = args[nargs-2], args[nargs-1]
+			xs.extend(args[0::2])
+			ys.extend(args[1::2])
+		if len(xs) == 0:
+			return None
+		return (min(xs), min(ys), max(xs), max(ys))
+
+	# path command protocol, as used by AnalyticalPath
+
+	def _letterAt(self, p_idx: int) -> str:
+		if self._n == 0:
+			return ""
+		op = self._ops[p_idx]
+		return _PB_LOWER[op] if self._rel[p_idx] else _PB_UPPER[op]
+
+	def getFirstLetter(self):
+		return self._letterAt(0)
+
+	def getLetter(self):
+		return self._letterAt(self._n - 1)
+
+	def isRelative(self):
+		return self._n > 0 and bool(self._rel[self._n - 1])
+
+	def setRelative(self, is_relative: bool):
+		# applied to first command
+		if self._n > 0 and self._ops[0] != _PB_Z:
+			self._rel[0] = is_relative
+
+	def get(self, omitletter: Optional[bool] = False, numfmt: Optional[NumFormatter] = None):
+		"""Encodes all commands at once, with the same letter omission rules as AnalyticalPath, 
+			omitletter applying to first command"""
+		n = self._n
+		if n == 0:
+			return ""
+		if numfmt is None:
+			numfmt = glFormatter()
+		nc = self._nc
+		ops = self._ops[:n]
+		rel = self._rel[:n]
+		prevops = np.concatenate(([-1], ops[:-1]))
+		prevrel = np.concatenate(([False], rel[:-1]))
+		samerel = prevrel == rel
+		omit = ((ops == _PB_L) & ((prevops == _PB_M) | (prevops == _PB_L)) & samerel) | \
+			((ops != _PB_L) & (ops != _PB_M) & (ops == prevops) & samerel)
+		omit[0] = omitletter
+
+		counts = _PB_NARGS[ops]
+		starts = np.cumsum(counts) - counts
+		strs = numfmt.fmtArray(self._coords[:nc])
+		neg = np.fromiter((v.startswith('-') for v in strs), dtype=bool, count=nc)
+		# values separator, none before negative values, nor after a letter
+		seps = np.where(neg, '', ' ').astype(object)
+		seps[starts[(counts > 0) & ~omit]] = ''
+		prefixes = np.where(rel, _PB_LOWER[ops], _PB_UPPER[ops])
+		prefixes[omit] = ''
+
+		cmdidx = np.repeat(np.arange(n), counts)
+		tokens = np.empty(n + 2 * nc, dtype=object)
+		tokens[2 * starts + np.arange(n)] = prefixes
+		valpos = 2 * np.arange(nc) + cmdidx + 1
+		tokens[valpos] = seps
+		tokens[valpos + 1] = strs
+		return ''.join(tokens.tolist())
+
+# Path data parsing
+
+_PATHDATA_LETTERS = "MmZzLlHhVvCcSsQqTtAa"
+_PATHDATA_LETTERSET = frozenset(_PATHDATA_LETTERS)
+_PATHDATA_NUM = r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?"
+_PATHDATA_TOKEN_RE = re_compile(r"[{0}]|{1}".format(_PATHDATA_LETTERS, _PATHDATA_NUM))
+# longest valid prefix, to locate errors
+_PATHDATA_VALID_RE = re_compile(r"[\s,]*(?:(?:[{0}]|{1})[\s,]*)*".format(_PATHDATA_LETTERS, _PATHDATA_NUM))
+# arc arguments, flags may be packed with no separators, ex.: 'a10 10 0 0110 10'
+_PATHDATA_ARCCHUNK_RE = re_compile(r"([Aa])([^{0}]*)".format(_PATHDATA_LETTERS))
+_PATHDATA_ARC_RE = re_compile(r"[\s,]*({0})[\s,]*({0})[\s,]*({0})[\s,]*([01])[\s,]*([01])[\s,]*({0})[\s,]*({0})[\s,]*".format(_PATHDATA_NUM))
+_PATHDATA_SEPS = " \t\r\n\f,"
+_PATHDATA_DELSEPS = str.maketrans("", "", _PATHDATA_SEPS)
+
+# opcode and relative flag by letter code point
+_PATHDATA_OPS = np.full(128, -1, dtype=np.int8)
+_PATHDATA_RELS = np.zeros(128, dtype=np.bool_)
+for _l in _PATHDATA_LETTERS:
+	_PATHDATA_OPS[ord(_l)] = _PB_OPCODES[_l.upper()]
+	_PATHDATA_RELS[ord(_l)] = _l.islower()
+
+def _parseArcArgs(p_text: str) -> List[str]:
+	ret = []
+	if len(p_text.strip(_PATHDATA_SEPS)) > 0:
+		pos = 0
+		l = len(p_text)
+		while pos < l:
+			mo = _PATHDATA_ARC_RE.match(p_text, pos)
+			if mo is None:
+				raise PathDataError("wrong arc arguments", p_text[pos:])
+			ret.extend(mo.groups())
+			pos = mo.end()
+	return ret
+
+def _normArcChunk(p_mo) -> str:
+	return f"{p_mo.group(1)}{' '.join(_parseArcArgs(p_mo.group(2)))} "
+
+def parsePathData(p_data: str) -> PathBuffer:
+	"""Parses SVG path data ('d' attribute) into a PathBuffer: full path grammar, including 
+		implicit repeated commands, exponent notation and packed arc flags. 
+		Raises PathDataError on invalid data. Path data written by AnalyticalPath is 
+		reproduced exactly when parsed and written again"""
+	data = p_data
+	if 'a' in data or 'A' in data:
+		data = _PATHDATA_ARCCHUNK_RE.sub(_normArcChunk, data)
+	tokens = _PATHDATA_TOKEN_RE.findall(data)
+	# valid if tokens cover all chars but separators
+	if sum(map(len, tokens)) != len(data.translate(_PATHDATA_DELSEPS)):
+		end = _PATHDATA_VALID_RE.match(data).end()
+		raise PathDataError("invalid characters", data[end:])
+	ntok = len(tokens)
+	if ntok == 0:
+		return PathBuffer()
+
+	isletter = np.fromiter(map(_PATHDATA_LETTERSET.__contains__, tokens), dtype=bool, count=ntok)
+	letteridx = np.flatnonzero(isletter)
+	if len(letteridx) == 0 or letteridx[0] != 0:
+		raise PathDataError("path data must start with a command", p_data)
+	codes = np.array([tokens[i] for i in letteridx.tolist()]).view(np.uint32)
+	ops = _PATHDATA_OPS[codes]
+	rels = _PATHDATA_RELS[codes]
+	if ops[0] != _PB_M:
+		raise PathDataError("path data must start with a 'move to'", p_data)
+
+	# values per command letter, implicitly repeated commands
+	nvals = np.diff(np.append(letteridx, ntok)) - 1
+	nargs = _PB_NARGS[ops]
+	wrong = np.where(nargs == 0, nvals != 0, (nvals == 0) | (nvals % np.maximum(nargs, 1) != 0))
+	if wrong.any():
+		i = int(np.flatnonzero(wrong)[0])
+		first = letteridx[i]
+		text = " ".join(tokens[first:first+nvals[i]+1])
+		raise PathDataError(f"{nargs[i]} values per command expected, got {nvals[i]}", text)
+	cnt = np.where(nargs == 0, 1, nvals // np.maximum(nargs, 1))
+	allops = np.repeat(ops, cnt)
+	allrels = np.repeat(rels | (ops == _PB_Z), cnt)
+	# following pairs of a 'move to' are implicit 'line to'
+	firsts = np.zeros(len(allops), dtype=bool)
+	firsts[np.cumsum(cnt) - cnt] = True
+	allops[(allops == _PB_M) & ~firsts] = _PB_L
+
+	vals = np.array(tokens, dtype=object)[~isletter].astype(np.float64)
+	return PathBuffer.fromArrays(allops, allrels, vals)
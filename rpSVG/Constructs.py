@@ -1,6 +1,6 @@
 
 
-from rpSVG.Basics import Ln, Pt, Trans, fontSizeToVPUnits, glRd, strictToNumber, toNumberAndUnit
+from rpSVG.Basics import Ln, Pt, Trans, fontSizeToVPUnits, glRd
 from rpSVG.Structs import Cir, Re
 from rpSVG.SVGLib import BaseSVGElem, Circle, Group, Rect, RectRC, TextParagraph, Use
 from rpSVG.Symbols import Cylinder, Diamond, Server
@@ -58,8 +58,8 @@ class TextBox(Group):
 		return self._txpara
 
 	def getAnchor(self) -> Union[None, Pt]:
-		x, _u = toNumberAndUnit(self._re.get("x"))
-		y, _u = toNumberAndUnit(self._re.get("y"))
+		x, _u = self._re.getNumAndUnit("x")
+		y, _u = self._re.getNumAndUnit("y")
 		return Pt(x, y)
 
 	def _adjustTextVertical(self, l=None):
@@ -186,25 +186,23 @@ class TextBox(Group):
 		elif isinstance(self._shape, Cylinder):
 			self._shape.setDims(width, height)
 		elif isinstance(self._shape, Server):
-			w0 = strictToNumber(width)
+			w0 = width
 			w = 0.3 * w0
 			d = 0.6 * w0
-			h = 1.0 * strictToNumber(height)
+			h = 1.0 * height
 			self._shape.setDims(w, h, depth=d)
 
-		# Symbols (added to DESC)
-		if isinstance(self._shape, Cylinder):
-			if not self._shape.hasEl():
-				assert not self._defselement is None
-				self._defselement.addChild(self._shape)
-			utup = self._shape.getUseTuple(*diamond_pt)
-			self.addChild(Use(*utup, self._shape.getSel()))
-		elif isinstance(self._shape, Server):
-			if not self._shape.hasEl():
-				assert not self._defselement is None
-				self._defselement.addChild(self._shape)
-			utup = self._shape.getUseTuple(*diamond_pt)
-			self.addChild(Use(*utup, self._shape.getSel()))
+		# Symbols (added to DEFS), shape being a template: boxes of equal dimensions share a definition
+		if isinstance(self._shape, (Cylinder, Server)):
+			if self._doc is None:
+				if not self._shape.hasEl():
+					self._defselement.addChild(self._shape)
+				symbol = self._shape
+			else:
+				args, kwargs = self._shape.getParams()
+				symbol = self._doc.getSymbol(type(self._shape), *args, noyinvert=True, **kwargs)
+			utup = symbol.getUseTuple(*diamond_pt)
+			self.addChild(Use(*utup, symbol.getSel()))
 		else:
 			if not self._shape.hasEl():
 				self.addChild(self._shape)
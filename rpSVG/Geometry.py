@@ -1,7 +1,10 @@
 
 from math import sqrt, cos, sin, sqrt, radians
 from typing import List, Optional, Union
-from rpSVG.Basics import Elp, Ln, MINDELTA, NANODELTA, Pt, lineEquationParams, ptAdd, ptMult, ptSub
+
+import numpy as np
+
+from rpSVG.Basics import Elp, Ln, MINDELTA, NANODELTA, Pt, Rotate, _rangesConcat, _rotationCosSin, affineApply, elp, ln, lineEquationParams, ptAdd, ptMult, ptSub
 
 def Ptg(x, y):
 	return Pt(float(x), float(y))
@@ -100,11 +103,148 @@ def vec2_segment_intersect(a1: Pt,a2: Pt, b1: Pt, b2: Pt):
 				ret = intersection
 	return ret
 
+def segmentsToArray(p_segments) -> np.ndarray:
+	"""(N,4) float array, x1 y1 x2 y2 per row, from a sequence of Ln (e.g. from getContour()) 
+		or point pairs"""
+	return np.array([(*pt1, *pt2) for pt1, pt2 in p_segments], dtype=np.float64).reshape(-1, 4)
+
+def _segmentsPair(p_segs_a, p_segs_b, allpairs: bool):
+	a = np.asarray(p_segs_a, dtype=np.float64).reshape(-1, 4)
+	b = np.asarray(p_segs_b, dtype=np.float64).reshape(-1, 4)
+	if allpairs:
+		a = a[:, None, :]
+		b = b[None, :, :]
+	else:
+		assert len(a) == len(b), "aligned segment arrays of different lengths"
+	return a, b
+
+def vec2_line_intersect_array(p_segs_a, p_segs_b, allpairs=False, mindelta=NANODELTA):
+	"""Array counterpart of vec2_line_intersect, for lines described by rows x1 y1 x2 y2 
+		of (N,4) and (M,4) arrays: row by row (N == M) or, with allpairs, each line from A
+		against every line from B, giving (N,M) results. 
+		Returns a tuple of arrays with:
+			- scalar multipliers of vector representation of segments from lines A
+			- scalar multipliers of vector representation of segments from lines B
+			- the intersection points, (..., 2) shaped
+			- the non parallel lines mask
+		For parallel lines, same as vec2_line_intersect, scalars are 0 and points are NaN.
+	"""
+	a, b = _segmentsPair(p_segs_a, p_segs_b, allpairs)
+	vax = a[...,2] - a[...,0]
+	vay = a[...,3] - a[...,1]
+	vbx = b[...,2] - b[...,0]
+	vby = b[...,3] - b[...,1]
+	sepx = a[...,0] - b[...,0]
+	sepy = a[...,1] - b[...,1]
+	denomin = -vay * vbx + vax * vby
+	valid = np.abs(denomin) > mindelta
+	with np.errstate(divide='ignore', invalid='ignore'):
+		a_scalar_multiplier = np.where(valid, (-vby * sepx + vbx * sepy) / denomin, 0.0)
+		b_scalar_multiplier = np.where(valid, (-vay * sepx + vax * sepy) / denomin, 0.0)
+	intpts = np.empty(valid.shape + (2,), dtype=np.float64)
+	intpts[...,0] = np.where(valid, b_scalar_multiplier * vbx + b[...,0], np.nan)
+	intpts[...,1] = np.where(valid, b_scalar_multiplier * vby + b[...,1], np.nan)
+	return a_scalar_multiplier, b_scalar_multiplier, intpts, valid
+
+def vec2_segment_intersect_array(p_segs_a, p_segs_b, allpairs=False, mindelta=NANODELTA):
+	"""Array counterpart of vec2_segment_intersect, segments given as in vec2_line_intersect_array.
+		Returns the same tuple as vec2_line_intersect_array, the mask now flagging intersecting
+		segments and points being NaN where segments don't intersect.
+		Intersecting pairs are given by np.nonzero(mask)."""
+	a_scal, b_scal, intpts, hit = vec2_line_intersect_array(p_segs_a, p_segs_b, allpairs=allpairs, mindelta=mindelta)
+	hit &= (a_scal >= 0) & (a_scal <= 1.0) & (b_scal >= 0) & (b_scal <= 1.0)
+	intpts[~hit] = np.nan
+	return a_scal, b_scal, intpts, hit
+
+def polylineSegments(p_coords, closed=False) -> np.ndarray:
+	"(N,4) segments array, as in segmentsToArray, from polyline or, if closed, polygon vertices"
+	pts = np.asarray(p_coords, dtype=np.float64).reshape(-1, 2)
+	if closed and len(pts) > 2:
+		pts = np.concatenate((pts, pts[:1]))
+	return np.hstack((pts[:-1], pts[1:]))
+
+def _gridCandidatePairs(p_boxes, p_cellsize: float):
+	"""Pairs (i < j) of overlapping boxes among those sharing some cell of a uniform grid, 
+		each pair once"""
+	n = len(p_boxes)
+	orig = p_boxes[:,:2].min(axis=0)
+	cells = np.floor((p_boxes - np.tile(orig, 2)) / p_cellsize).astype(np.int64)
+	nrows = int(cells[:,3].max()) + 1
+	ncols = cells[:,2] - cells[:,0] + 1
+	ncells = ncols * (cells[:,3] - cells[:,1] + 1)
+	# every (cell, box) entry, boxes spread over all their cells
+	entbox = np.repeat(np.arange(n), ncells)
+	within = np.arange(len(entbox)) - np.repeat(np.cumsum(ncells) - ncells, ncells)
+	entcell = (cells[entbox,0] + within % ncols[entbox]) * nrows + cells[entbox,1] + within // ncols[entbox]
+	order = np.argsort(entcell, kind='stable')
+	entcell = entcell[order]
+	entbox = entbox[order]
+	# each entry paired with the following ones in the same cell
+	newcell = np.flatnonzero(np.diff(entcell)) + 1
+	ends = np.repeat(np.append(newcell, len(entcell)), np.diff(np.concatenate(([0], newcell, [len(entcell)]))))
+	npairs = ends - np.arange(len(entcell)) - 1
+	firsts = np.repeat(entbox, npairs)
+	seconds = entbox[_rangesConcat(np.arange(1, len(entcell) + 1), ends)]
+	i = np.minimum(firsts, seconds)
+	j = np.maximum(firsts, seconds)
+	bi = p_boxes[i]
+	bj = p_boxes[j]
+	keep = (bi[:,0] <= bj[:,2]) & (bj[:,0] <= bi[:,2]) & (bi[:,1] <= bj[:,3]) & (bj[:,1] <= bi[:,3])
+	keys = np.unique(i[keep] * n + j[keep])
+	return keys // n, keys % n
+
+def segmentIntersections(p_segs, cellsize: Optional[float] = None, skipjoints=False, mindelta=NANODELTA, chunksize=1000000):
+	"""All intersections among the segments of a (N,4) array (rows x1 y1 x2 y2), testing only
+		segments sharing cells of a uniform grid, cellsize by default near the mean segment 
+		extent. Segment boxes are expanded by MINDELTA.
+		Returns a tuple of arrays with:
+			- indexes of first and second segments, i < j
+			- scalar multipliers along first and second segments
+			- the intersection points, (K,2) shaped
+		As in vec2_segment_intersect, parallel segments (mindelta) are not intersecting.
+		With skipjoints, intersections coinciding (MINDELTA) with an end of both segments, as 
+		between consecutive polyline segments, are left out.
+	"""
+	segs = np.asarray(p_segs, dtype=np.float64).reshape(-1, 4)
+	n = len(segs)
+	boxes = np.empty((n, 4), dtype=np.float64)
+	np.minimum(segs[:,:2], segs[:,2:], out=boxes[:,:2])
+	np.maximum(segs[:,:2], segs[:,2:], out=boxes[:,2:])
+	boxes[:,:2] -= MINDELTA
+	boxes[:,2:] += MINDELTA
+	if n < 2:
+		empty = np.empty(0, dtype=np.int64)
+		return empty, empty, np.empty(0), np.empty(0), np.empty((0, 2))
+
+	if cellsize is None:
+		extent = boxes[:,2:].max(axis=0) - boxes[:,:2].min(axis=0)
+		sizes = boxes[:,2:] - boxes[:,:2]
+		cellsize = max(float(sizes.mean()), sqrt(float(extent[0] * extent[1]) / n), MINDELTA)
+	assert cellsize > 0
+
+	cand_i, cand_j = _gridCandidatePairs(boxes, cellsize)
+
+	rets = []
+	for k in range(0, len(cand_i), chunksize):
+		ci = cand_i[k:k+chunksize]
+		cj = cand_j[k:k+chunksize]
+		a_scal, b_scal, intpts, hit = vec2_segment_intersect_array(segs[ci], segs[cj], mindelta=mindelta)
+		if skipjoints:
+			ends_i = np.where((a_scal < 0.5)[:,None], segs[ci,:2], segs[ci,2:])
+			ends_j = np.where((b_scal < 0.5)[:,None], segs[cj,:2], segs[cj,2:])
+			hit &= ~((np.abs(intpts - ends_i) < MINDELTA).all(axis=1) & (np.abs(intpts - ends_j) < MINDELTA).all(axis=1))
+		rets.append((ci[hit], cj[hit], a_scal[hit], b_scal[hit], intpts[hit]))
+
+	if len(rets) == 0:
+		empty = np.empty(0, dtype=np.int64)
+		return empty, empty, np.empty(0), np.empty(0), np.empty((0, 2))
+	return tuple(np.concatenate(parts) for parts in zip(*rets))
+
 def vec2_rotation_mat(p_degangle):
-    angle = radians(p_degangle)
+    cs, sn = _rotationCosSin(p_degangle)
     return (
-        (cos(angle), -sin(angle)),
-        (sin(angle),  cos(angle))
+        (cs, -sn),
+        (sn,  cs)
     )
 
 def vec2_scale_mat(p_scale):
@@ -127,9 +267,17 @@ def vec2_rotate(p_pt: Pt, p_degangle: Union[float, int], center: Optional[Pt] =
 		r2 = vec2_matmult(vec2_rotation_mat(p_degangle), r1)
 		ret = ptAdd(r2, center)
 	else:
-		ret = vec2_matmult(p_pt, vec2_rotation_mat(p_degangle))
+		ret = vec2_matmult(vec2_rotation_mat(p_degangle), p_pt)
 	return ret
 
+def vec2_rotate_array(p_coords, p_degangle: Union[float, int], center: Optional[Pt] = None) -> np.ndarray:
+	"Array counterpart of vec2_rotate, rotating (N,2) coordinates"
+	if center is None:
+		mat = Rotate(p_degangle).getMatrix()
+	else:
+		mat = Rotate(p_degangle, *center).getMatrix()
+	return affineApply(mat, p_coords)
+
 def vec2_arecollinear(p_p1: Pt, p_p2: Pt, p_p3: Pt, mindelta=MINDELTA, inside_segment=False):
 	assert isinstance(p_p1, Pt)
 	assert isinstance(p_p2, Pt)
@@ -196,6 +344,85 @@ def ellipseIntersections(p_line: Ln, p_ellipse: Elp):
 
 	return ret
 
+def _ellipsesArray(p_ellipses) -> np.ndarray:
+	"(M,5) array, cx cy rx ry rotation angle per row, from Elp, a sequence of Elp or an array"
+	if isinstance(p_ellipses, elp):
+		p_ellipses = (p_ellipses,)
+	if len(p_ellipses) > 0 and isinstance(p_ellipses[0], elp):
+		return np.array([(*e.pt, e.rx, e.rx if e.ry is None else e.ry, e.ang) for e in p_ellipses], dtype=np.float64)
+	return np.asarray(p_ellipses, dtype=np.float64).reshape(-1, 5)
+
+def ellipseIntersectionsArray(p_lines, p_ellipses):
+	"""Array counterpart of ellipseIntersections: lines as rows x1 y1 x2 y2 of an (N,4) array (or 
+		a single Ln), against ellipses as rows cx cy rx ry angle of an (M,5) array (or Elp, or 
+		a sequence of Elp). Rows are taken in pairs (N == M) or either N or M is 1, as in 
+		many lines against one ellipse or one line against many ellipses.
+		Returns a tuple with:
+			- first and second intersection points, (K,2) arrays, as from ellipseIntersections
+			- mask of real intersections (non negative discriminant), lines defined by 
+				coincident points (MINDELTA) give NaN points
+	"""
+	if isinstance(p_lines, ln):
+		p_lines = ((*p_lines.pt1, *p_lines.pt2),)
+	lines = np.asarray(p_lines, dtype=np.float64).reshape(-1, 4)
+	ells = _ellipsesArray(p_ellipses)
+	x1, y1, x2, y2, h, k, a, b, ang = np.broadcast_arrays(*lines.T, *ells.T)
+
+	# same classification as lineEquationParams
+	dx = x2 - x1
+	dy = y2 - y1
+	degenerate = (np.abs(dx) < MINDELTA) & (np.abs(dy) < MINDELTA)
+	vertical = np.abs(dx) <= MINDELTA
+	horizontal = ~vertical & (np.abs(dy) <= MINDELTA)
+	oblique = ~vertical & ~horizontal
+
+	a2 = a * a
+	b2 = b * b
+	with np.errstate(divide='ignore', invalid='ignore'):
+		m = np.where(oblique, dy / dx, 0.0)
+		c = np.where(vertical, x1, np.where(horizontal, y1, y1 - m * x1))
+		c2 = c * c
+		# vertical and horizontal
+		disc_v = a2 - c2 - h * h + (2 * c * h)
+		disc_h = b2 - c2 - k * k + (2 * c * k)
+		p = np.where(vertical, (b / a) * np.sqrt(np.abs(disc_v)), (a / b) * np.sqrt(np.abs(disc_h)))
+		# oblique
+		phi = c - k
+		m2 = m * m
+		p1 = b2 * h - a2 * m * phi
+		disc_o = b2 + a2 * m2 - 2 * m * phi * h - phi * phi - m2 * (h * h)
+		p2 = a * b * np.sqrt(np.abs(disc_o))
+		denom = b2 + a2 * m2
+		xa_o = (p1 + p2) / denom
+		xb_o = (p1 - p2) / denom
+
+	xa = np.where(vertical, c, np.where(horizontal, h + p, xa_o))
+	xb = np.where(vertical, c, np.where(horizontal, h - p, xb_o))
+	ya = np.where(vertical, k + p, np.where(horizontal, c, m * xa_o + c))
+	yb = np.where(vertical, k - p, np.where(horizontal, c, m * xb_o + c))
+	valid = ~degenerate & (np.where(vertical, disc_v, np.where(horizontal, disc_h, disc_o)) >= 0)
+
+	pa = np.stack((xa, ya), axis=-1)
+	pb = np.stack((xb, yb), axis=-1)
+	rotated = ang != 0
+	if rotated.any():
+		# rotation about the center, as vec2_rotate, sines and cosines once per distinct angle
+		angs, inv = np.unique(ang[rotated], return_inverse=True)
+		cossins = np.array([_rotationCosSin(v) for v in angs.tolist()]).reshape(-1, 2)[inv]
+		coss = cossins[:,0]
+		sins = cossins[:,1]
+		ctx = h[rotated]
+		cty = k[rotated]
+		for pts in (pa, pb):
+			r1x = pts[rotated, 0] - ctx
+			r1y = pts[rotated, 1] - cty
+			pts[rotated, 0] = r1x * coss + r1y * -sins + ctx
+			pts[rotated, 1] = r1x * sins + r1y * coss + cty
+	pa[degenerate] = np.nan
+	pb[degenerate] = np.nan
+
+	return pa, pb, valid
+
 def ellipticalArcCenterAndRadii(p_p0: Pt, p_p1: Pt, p_rx, p_ry, largearcflag=0, sweepflag=0, angle=0):
 	"""Code source: Batik Project (adapted from Java)
 	http://svn.apache.org/repos/asf/xmlgraphics/batik/branches/svg11/sources/org/apache/batik/ext/awt/geom/ExtendedGeneralPath.java
@@ -2,20 +2,155 @@
 #import cairo
 #import rsvg
 
+from copy import deepcopy
 from io import StringIO
+from numbers import Number
+from re import compile as re_compile
 from typing import Optional, List, Union
 from warnings import warn
+from xml.sax.saxutils import quoteattr
 
 from lxml import etree
+import numpy as np
 
-from rpSVG.SVGStyleText import CSSSty, Sty
-from rpSVG.Basics import Ln, MINDELTA, Pt, Trans, XLINK_NAMESPACE, _withunits_struct, glRd, \
-	pClose, pH, pL, pM, pV, strictToNumber, toNumberAndUnit, transform_def, path_command, \
-	ptCoincidence, removeDecsep, ptEnsureStrings
+from rpSVG.SVGStyleText import CSSSty, STYLE_ATTRIBS, Sty
+from rpSVG.Basics import Env, Ln, MINDELTA, Mat, NumFormatter, PathDataError, Pt, Rotate, SIMPLIFY_METHODS, Scale, SkewX, SkewY, SpatialIndex, Trans, XLINK_NAMESPACE, _withunits_struct, \
+	affineApply, affineBounds, affineCompose, affineInvert, glFormatter, glRd, pClose, pEncoded, pH, pL, pM, pV, parsePathData, scalePrecision, strictToNumber, toNumberAndUnit, transform_def, path_command, \
+	ptCoincidence, removeDecsep, typedValue
 from rpSVG.Structs import Cir, Elli, GraSt, Img, Li, LiGra, Mrk, MrkProps, Patt, Pl, Pth, RaGra, Re, ReRC, Symb, Tx, TxPth, TxRf, Us, VBox
 
 SVG_NAMESPACE = "http://www.w3.org/2000/svg"
 
+# ids generated on adding elements: idprefix + serial
+_GENID_RE = re_compile("[A-Z][a-z]{0,2}([0-9]+)")
+
+def _svgTag(p_tag: str) -> str:
+	return f"{{{SVG_NAMESPACE}}}{p_tag}"
+
+def _localTag(p_xmlel) -> str:
+	"Tag without namespace: added elements have none, loaded ones are in SVG namespace"
+	ret = p_xmlel.tag
+	if ret[0] == "{":
+		ret = ret[ret.index("}")+1:]
+	return ret
+
+# element geometry boxes, for spatial indexing
+
+# not rendered where they are, neither are their descendants
+_NONRENDERED_TAGS = frozenset(["defs", "symbol", "marker", "pattern", "clipPath", "mask", "linearGradient", 
+	"radialGradient", "filter", "style", "title", "desc", "metadata", "script"])
+# containers whose children are indexed, other elements are indexed as a whole or not at all
+_SPATIAL_GROUP_TAGS = frozenset(["g", "a", "switch"])
+# elements holding no coordinates, see SVGContent._hasContent
+_NOCOORDS_TAGS = frozenset(["defs", "style", "title", "desc", "metadata"])
+
+# identity transform: element boxes under it are not transformed
+_IDENTITY_MATRIX = np.identity(3)
+_IDENTITY_MATRIX.setflags(write=False)
+_TRANSFORM_ITEM_RE = re_compile(r"\s*,?\s*(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)\s*")
+# transform_def classes by 'transform' attribute item name, with accepted number of values
+_TRANSFORM_DEFS = {"matrix": (Mat, (6,)), "translate": (Trans, (1, 2)), "scale": (Scale, (1, 2)), 
+	"rotate": (Rotate, (1, 3)), "skewX": (SkewX, (1,)), "skewY": (SkewY, (1,))}
+_NUMLIST_SEP_RE = re_compile(r"[\s,]+")
+# element references in attribute values and CSS
+_URLREF_RE = re_compile(r"url\(\s*['\"]?#([^'\")\s]+)")
+
+def _affineFromText(p_text: str) -> Optional[np.ndarray]:
+	"3x3 affine matrix of 'transform' attribute text, None if not parsable"
+	trs = []
+	pos = 0
+	n = len(p_text)
+	while pos < n:
+		mo = _TRANSFORM_ITEM_RE.match(p_text, pos)
+		if mo is None:
+			if len(p_text[pos:].strip()) > 0:
+				return None
+			break
+		pos = mo.end()
+		try:
+			args = [float(v) for v in _NUMLIST_SEP_RE.split(mo.group(2).strip()) if len(v) > 0]
+		except ValueError:
+			return None
+		cls, nargs = _TRANSFORM_DEFS[mo.group(1)]
+		if not len(args) in nargs:
+			return None
+		trs.append(cls(*args))
+	return affineCompose(trs)
+
+def _xmlLength(p_xmlel, p_attr: str, default=None) -> Optional[float]:
+	"Attribute value in user units, default if missing, None if in other units"
+	val = p_xmlel.get(p_attr)
+	if val is None:
+		return default
+	try:
+		return float(val)
+	except ValueError:
+		pass
+	try:
+		num, unit = toNumberAndUnit(val)
+	except ValueError:
+		return None
+	return num if unit == "px" else None
+
+def _idRefs(p_attrname: str, p_value: str) -> List[str]:
+	"Ids referenced by an attribute"
+	if p_attrname == "href" or p_attrname.endswith("}href"):
+		return [p_value[1:]] if p_value.startswith("#") else []
+	return _URLREF_RE.findall(p_value)
+
+def _cullCandidate(p_xmlel, p_candidates):
+	"p_xmlel, or its ancestor, found in candidates, None if none"
+	el = p_xmlel
+	while not el is None:
+		if el in p_candidates:
+			return el
+		el = el.getparent()
+	return None
+
+def _xmlElBounds(p_xmlel, p_tag: str) -> Optional[tuple]:
+	"""Geometry box (minx, miny, maxx, maxy) in element user space, stroke not included, 
+		None if unknown. 'use' elements are handled by SVGContent, needing referenced element"""
+	if p_tag in ("rect", "image", "foreignObject", "svg"):
+		x = _xmlLength(p_xmlel, "x", 0.0)
+		y = _xmlLength(p_xmlel, "y", 0.0)
+		w = _xmlLength(p_xmlel, "width")
+		h = _xmlLength(p_xmlel, "height")
+		if x is None or y is None or w is None or h is None:
+			return None
+		return (x, y, x + w, y + h)
+	if p_tag in ("circle", "ellipse"):
+		cx = _xmlLength(p_xmlel, "cx", 0.0)
+		cy = _xmlLength(p_xmlel, "cy", 0.0)
+		if p_tag == "circle":
+			rx = ry = _xmlLength(p_xmlel, "r")
+		else:
+			rx = _xmlLength(p_xmlel, "rx")
+			ry = _xmlLength(p_xmlel, "ry")
+		if cx is None or cy is None or rx is None or ry is None:
+			return None
+		return (cx - rx, cy - ry, cx + rx, cy + ry)
+	if p_tag == "line":
+		vals = [_xmlLength(p_xmlel, attr, 0.0) for attr in ("x1", "y1", "x2", "y2")]
+		if None in vals:
+			return None
+		return (min(vals[0], vals[2]), min(vals[1], vals[3]), max(vals[0], vals[2]), max(vals[1], vals[3]))
+	if p_tag in ("polyline", "polygon"):
+		try:
+			coords = np.array(_NUMLIST_SEP_RE.split(p_xmlel.get("points", "").strip()), dtype=np.float64)
+		except ValueError:
+			return None
+		if len(coords) < 2:
+			return None
+		xs = coords[0:len(coords)-1:2]
+		ys = coords[1::2]
+		return (float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max()))
+	if p_tag == "path":
+		try:
+			return parsePathData(p_xmlel.get("d", "")).getBounds()
+		except PathDataError:
+			return None
+	return None
+
 DOCTYPE_STR = """<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" 
   "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">"""
 
@@ -28,6 +163,9 @@ SVG_ROOT = """<svg
 DECLARATION_ROOT = """<?xml version="1.0" standalone="no"?>
 {0}""".format(SVG_ROOT)
 
+# points formatting when no document precision is set: no rounding
+_POINTS_FORMATTER = NumFormatter()
+
 # childtag is mandatory, parenttag optional
 DBG_FILTER_ADDCHILD = [
 	# {
@@ -36,6 +174,26 @@ DBG_FILTER_ADDCHILD = [
 ]
 
 
+def _bulkColumn(p_values, p_len: int) -> List:
+	"Columnar bulk input (array, sequence or scalar broadcast to p_len) as a list of Python values"
+	if np.ndim(p_values) == 0:
+		ret = [p_values] * p_len
+	elif isinstance(p_values, np.ndarray):
+		ret = p_values.tolist()
+	else:
+		ret = list(p_values)
+	assert len(ret) == p_len, f"bulk column length {len(ret)} differs from {p_len}"
+	return ret
+
+def _bulkYInverted(p_delta, p_values: List, p_subtract: Optional[List] = None) -> List:
+	"Same arithmetic as structs 'yinvert' methods, applied to a whole column"
+	if p_subtract is None:
+		ret = [p_delta - removeDecsep(float(v)) for v in p_values]
+	else:
+		ret = [p_delta - removeDecsep(float(v)) - removeDecsep(float(h)) for v, h in zip(p_values, p_subtract)]
+	return ret
+
+
 class TagOutOfDirectUserManipulation(RuntimeError):
 	def __init__(self, p_tag):
 		self.tag = p_tag
@@ -48,10 +206,21 @@ class TagOutOfDirectUserManipulation(RuntimeError):
 	def __str__(self):
 		return f"Tag '{self.tag}' not to be manipulated by user."
 
+class PrecisionChangeError(RuntimeError):
+	def __init__(self, p_places, p_newplaces):
+		self.places = p_places
+		self.newplaces = p_newplaces
+	def __str__(self):
+		return f"Content already written with {self.places} decimal places, maxerror requires {self.newplaces}: set viewBox and size before adding content"
+
 class BaseSVGElem(object):
 
 	NO_XML_EL = "XML Element not created yet. Must add this to SVGContainer to auto create it."
 
+	# '__dict__' kept for class flags (_FATTR_*) and specialized elements state
+	__slots__ = ("tag", "_struct", "_style", "_transforms", "idprefix", "el", "_pendingXMLDependentOps", 
+		"_yinvertdelta", "_parentadded", "_parenttag", "_numfmt", "_doc", "__dict__")
+
 	def __init__(self, tag: str, 
 			struct: Optional[_withunits_struct] = None):
 		self.tag = tag
@@ -60,16 +229,21 @@ class BaseSVGElem(object):
 		self._transforms = []
 		self.idprefix = tag[:3].title()
 		self.el = None
-		self._pendingXMLDependentOps = []
+		# list only created when some operation has to wait for the XML element
+		self._pendingXMLDependentOps = ()
 		self._yinvertdelta = None
 		self._parentadded = False
+		# document number formatter, None for default formatting
+		self._numfmt = None
+		# SVGContent this element belongs to, set on adding
+		self._doc = None
 		self.setStruct(struct)
 
 	def clone(self):
 		return BaseSVGElem(self.tag, struct=self.getStruct())
 
 	def _getTransform(self) -> str:
-		return " ".join([t.get() for t in self._transforms])
+		return " ".join([t.get(numfmt=self._numfmt) for t in self._transforms])
 
 	def hasEl(self):
 		return  not self.el is None
@@ -83,7 +257,7 @@ class BaseSVGElem(object):
 		self.el = xmlel
 		strct = self._struct
 		if not strct is None:
-			strct.setXmlAttrs(self.getEl())
+			strct.setXmlAttrs(self.getEl(), numfmt=self._numfmt)
 		# Things waiting to XML el to be de
 		if len(self._pendingXMLDependentOps) > 0:
 			op = self._pendingXMLDependentOps.pop(0)
@@ -103,10 +277,13 @@ class BaseSVGElem(object):
 					op = self._pendingXMLDependentOps.pop(0)
 				except IndexError:
 					op = None
+			self._pendingXMLDependentOps = ()
 		return self
 
 	def removeEl(self):
 		assert self.hasEl(), self.NO_XML_EL
+		if not self._doc is None:
+			self._doc._unindexTree(self.getEl())
 		par = self.getEl().getparent()
 		par.remove(self.getEl())
 		return par
@@ -133,6 +310,8 @@ class BaseSVGElem(object):
 
 	def clearChildren(self):
 		for child in list(self.getEl()):
+			if not self._doc is None:
+				self._doc._unindexTree(child)
 			self.getEl().remove(child)		
 
 	def _tailText(self, p_text: str) -> None:
@@ -147,8 +326,24 @@ class BaseSVGElem(object):
 	def _setDirectAttr(self, p_attr: str, p_value):
 		assert self.hasEl(), self.NO_XML_EL
 		self.getEl().set(p_attr, p_value)
+		self._geomChanged()
 		return self
 
+	def _simplifyMask(self, p_coords, p_method: str, p_tolerance: float, ring=False):
+		"Kept vertices mask, p_tolerance in output pixels (see SVGContent.getPixelSize)"
+		assert p_method in SIMPLIFY_METHODS, f"unknown simplification method '{p_method}'"
+		tol = p_tolerance
+		if not self._doc is None:
+			tol = tol * self._doc.getPixelSize()
+		ret = SIMPLIFY_METHODS[p_method](p_coords, tol, ring=ring)
+		self.removedvertices = len(ret) - int(ret.sum())
+		return ret
+
+	def _geomChanged(self) -> None:
+		"Geometry attributes or transform changed, document spatial index to be updated"
+		if not self._doc is None:
+			self._doc._spatialChanged(self.getEl())
+
 	def dispatchXMLDependentOp(self, method, args=None, kwargs=None):
 		if self.hasEl():
 			if args is None:
@@ -162,6 +357,8 @@ class BaseSVGElem(object):
 				else:
 					method(*args, **kwargs)
 		else:
+			if not self._pendingXMLDependentOps:
+				self._pendingXMLDependentOps = []
 			self._pendingXMLDependentOps.append((method, args, kwargs))
 
 	def __repr__(self):
@@ -207,7 +404,8 @@ class BaseSVGElem(object):
 	def _updateStructAttrs(self):
 		assert self.hasEl()
 		if not self._struct is None:
-			self._struct.setXmlAttrs(self.getEl())
+			self._struct.setXmlAttrs(self.getEl(), numfmt=self._numfmt)
+			self._geomChanged()
 		return self
 
 	def updateStructAttrs(self):
@@ -291,6 +489,7 @@ class BaseSVGElem(object):
 	def _updateTransformAttr(self):
 		if len(self._transforms) > 0 and self.hasEl():
 			self.getEl().set('transform', self._getTransform()) 
+			self._geomChanged()
 		return self
 
 	def updateTransformAttr(self):
@@ -305,6 +504,55 @@ class BaseSVGElem(object):
 	def getTransformsList(self):
 		return self._transforms
 
+	def getTransformMatrix(self) -> Optional[np.ndarray]:
+		"""3x3 affine matrix of element's own transforms, from transform list or, for loaded 
+			elements, 'transform' attribute. None if attribute is not parsable"""
+		if len(self._transforms) > 0:
+			return affineCompose(self._transforms)
+		trtxt = self.getEl().get("transform") if self.hasEl() else None
+		return np.identity(3) if trtxt is None else _affineFromText(trtxt)
+
+	def getCTM(self) -> Optional[np.ndarray]:
+		"""3x3 affine matrix from element coordinates to document user space: transforms of 
+			element and of its ancestors, up to document root, composed. None if some 
+			transform is not parsable"""
+		assert self.hasEl(), self.NO_XML_EL
+		ret = self.getTransformMatrix()
+		root = None if self._doc is None else self._doc.getEl()
+		wrappers = {} if self._doc is None else self._doc._wrappers
+		par = self.getEl().getparent()
+		while not ret is None and not par is None and not par is root:
+			wrapper = wrappers.get(par)
+			if wrapper is None:
+				m = _affineFromText(par.get("transform", ""))
+			else:
+				m = wrapper.getTransformMatrix()
+			ret = None if m is None else m @ ret
+			par = par.getparent()
+		return ret
+
+	def toDocCoords(self, p_coords) -> np.ndarray:
+		"(N,2) coordinates in element space transformed to document user space"
+		ctm = self.getCTM()
+		assert not ctm is None, "unparsable transform"
+		return affineApply(ctm, p_coords)
+
+	def fromDocCoords(self, p_coords) -> np.ndarray:
+		"""(N,2) coordinates in document user space transformed to element space, raises 
+			SingularTransformError if not invertible"""
+		ctm = self.getCTM()
+		assert not ctm is None, "unparsable transform"
+		return affineApply(affineInvert(ctm), p_coords)
+
+	def getDocBounds(self) -> Optional[Env]:
+		"Geometry box in document user space, stroke not included, None if unknown"
+		assert self.hasEl(), self.NO_XML_EL
+		box = _xmlElBounds(self.getEl(), _localTag(self.getEl()))
+		ctm = None if box is None else self.getCTM()
+		if ctm is None:
+			return None
+		return Env(*affineBounds(ctm, box))
+
 	def __enter__(self):
 	 	return (self.getStruct(), self.getStyle(), self.getTransformsList())
 
@@ -323,15 +571,22 @@ class BaseSVGElem(object):
 	def readdElToParent(self, p_parent):
 		assert self.hasEl(), self.NO_XML_EL
 		p_parent.append(self.getEl())
+		if not self._doc is None:
+			self._doc._indexTree(self.getEl())
 
 	def delEl(self):
+		if not self._doc is None:
+			self._doc._unindexTree(self.getEl(), forget=True)
 		self.getEl().getparent().remove(self.getEl())
 		self.el = None
 
 	def _setId(self, idval):
 		assert isinstance(idval, str)
 		assert self.hasEl(), self.NO_XML_EL
-		self.getEl().set('id', idval)
+		if self._doc is None:
+			self.getEl().set('id', idval)
+		else:
+			self._doc._setIndexedAttr(self.getEl(), 'id', idval)
 
 	def setId(self, idval):
 		assert isinstance(idval, str)
@@ -350,7 +605,10 @@ class BaseSVGElem(object):
 	def _setClass(self, clsval):
 		assert isinstance(clsval, str)
 		assert self.hasEl(), self.NO_XML_EL
-		self.getEl().set('class', clsval)
+		if self._doc is None:
+			self.getEl().set('class', clsval)
+		else:
+			self._doc._setIndexedAttr(self.getEl(), 'class', clsval)
 
 	def setClass(self, clsval):
 		self.dispatchXMLDependentOp(self._setClass, args=(clsval,))
@@ -368,6 +626,10 @@ class BaseSVGElem(object):
 	def getTag(self):
 		return self.tag
 
+	def getNumFormatter(self) -> Optional[NumFormatter]:
+		"Document number formatter, None if document has no fixed precision"
+		return self._numfmt
+
 	def clearTransforms(self):
 		del self._transforms[:]
 
@@ -378,6 +640,7 @@ class BaseSVGElem(object):
 		trtxt = self._getTransform() 
 		if len(trtxt) > 0:
 			self.getEl().set('transform', trtxt)
+			self._geomChanged()
 		return tr
 
 	def yinvert(self, p_height: Union[float, int]):
@@ -406,6 +669,8 @@ class BaseSVGElem(object):
 
 class GenericSVGElem(BaseSVGElem):
 
+	__slots__ = ("content", "_noyinvert")
+
 	def __init__(self, tag: str, struct: Optional[_withunits_struct] = None) -> None:
 		self.content = []
 		self._noyinvert = False
@@ -441,9 +706,14 @@ class GenericSVGElem(BaseSVGElem):
 				assert self.hasEl()
 				newel = etree.SubElement(parent.getEl(), p_child.tag)
 
+		if p_child._numfmt is None:
+			p_child._numfmt = self._numfmt
 		p_child.setEl(newel)
 		p_child._parenttag = _parent.tag
 		self.content.append(p_child)
+		if not self._doc is None:
+			p_child._doc = self._doc
+			self._doc._registerWrapper(p_child)
 
 		if not self._noyinvert:
 			if not self._yinvertdelta is None and hasattr(p_child, 'yinvert'):
@@ -475,10 +745,15 @@ class GenericSVGElem(BaseSVGElem):
 	def addChildTag(self, p_tag: str):
 		assert self.hasEl()
 		newel = etree.SubElement(self.getEl(), p_tag)
+		if not self._doc is None:
+			self._doc._indexTree(newel)
 		return newel
 
 	def clear(self):
 		assert self.hasEl()
+		if not self._doc is None:
+			for child in self.getEl():
+				self._doc._unindexTree(child)
 		del self.getEl()[:]
 
 	def toJSON(self):
@@ -495,6 +770,10 @@ class GenericSVGElem(BaseSVGElem):
 
 class SVGContainer(GenericSVGElem):
 
+	__slots__ = ("_defs", "genIDMethod")
+
+	BULK_BATCH_SIZE = 10000
+
 	def __init__(self, tag: str, struct: Optional[_withunits_struct] = None, viewbox: Optional[VBox] = None) -> None:
 		super().__init__(tag, struct=struct)
 		self._defs = None
@@ -543,7 +822,7 @@ class SVGContainer(GenericSVGElem):
 
 	def _setViewbox(self, p_viewbox: VBox):
 		assert isinstance(p_viewbox, VBox)
-		p_viewbox.setXmlAttrs(self.getEl())
+		p_viewbox.setXmlAttrs(self.getEl(), numfmt=self._numfmt)
 		return self
 
 	def setViewbox(self, p_viewbox: VBox):
@@ -562,10 +841,104 @@ class SVGContainer(GenericSVGElem):
 		vb.getFromXmlAttrs(self.getEl())
 		return vb
 
+	def _bulkIdMethod(self):
+		"Serial generator for bulk added children ids, None if no ids are to be generated"
+		if not getattr(self, '_FATTR_doSubIdAutoGeneration', True):
+			return None
+		return self.genIDMethod
+
+	def _bulkYInvertDelta(self):
+		if self._noyinvert or getattr(self, '_FATTR_forceNonYInvertChildren', False):
+			return None
+		return self._yinvertdelta
+
+	def _addBulk(self, p_tag: str, p_fields: tuple, p_columns: List[List], cls: Optional[str] = None, style: Optional[Sty] = None, genids=True) -> int:
+		"""Writes child XML elements straight from value columns, no wrapper objects created.
+			Elements are generated as markup text and parsed in batches, far cheaper than
+			setting attributes one by one on each new element"""
+		assert self.hasEl(), self.NO_XML_EL
+		fixed = {}
+		if not cls is None:
+			fixed["class"] = cls
+		if not style is None:
+			assert isinstance(style, Sty)
+			scratch = etree.Element(p_tag)
+			style.setXmlAttrs(scratch)
+			fixed.update(scratch.attrib)
+		fixedtxt = "".join([f" {k}={quoteattr(str(v))}" for k, v in fixed.items()]) + "/>"
+
+		if genids:
+			idmeth = self._bulkIdMethod()
+		else:
+			idmeth = None
+		idprefix = p_tag[:3].title()
+
+		# values other than numbers (lengths with units, for instance) are quoted and escaped as
+		# fixed attributes are, numbers are written as they are
+		textcols = [any([not issubclass(t, Number) for t in set(map(type, col))]) for col in p_columns]
+		# str.format '{}' formats numbers exactly as str()
+		numfmt = self._numfmt
+		if not numfmt is None:
+			p_columns = [[numfmt.fmtValue(typedValue(v)) for v in col] for col in p_columns]
+		p_columns = [[quoteattr(str(v)) for v in col] if istext else col for col, istext in zip(p_columns, textcols)]
+		rowfmt = f"<{p_tag}" + "".join([f' {f}={{}}' if istext else f' {f}="{{}}"' for f, istext in zip(p_fields, textcols)])
+
+		parentel = self.getEl()
+		doc = self._doc
+		rows = list(zip(*p_columns))
+		for start in range(0, len(rows), self.BULK_BATCH_SIZE):
+			buf = []
+			for row in rows[start:start+self.BULK_BATCH_SIZE]:
+				buf.append(rowfmt.format(*row))
+				if not idmeth is None:
+					idval = idmeth()
+					if not idval is None:
+						buf.append(f' id="{idprefix}{idval}"')
+				buf.append(fixedtxt)
+			batch = etree.fromstring("<g>" + "".join(buf) + "</g>")
+			if not doc is None and doc.isIndexed():
+				for el in batch:
+					doc._indexEl(el)
+			parentel.extend(batch)
+		return len(rows)
+
+	def addCircles(self, cx, cy, r, cls: Optional[str] = None, style: Optional[Sty] = None, genids=True) -> int:
+		"""Bulk adds circles from columnar values (arrays, sequences or scalars, broadcast to all elements).
+			Output equals adding Circle objects one by one, without creating them. Returns number of circles added"""
+		n = max(np.size(c) for c in (cx, cy, r))
+		cols = [_bulkColumn(c, n) for c in (cx, cy, r)]
+		delta = self._bulkYInvertDelta()
+		if not delta is None:
+			cols[1] = _bulkYInverted(delta, cols[1])
+		return self._addBulk("circle", Cir._fields, cols, cls=cls, style=style, genids=genids)
+
+	def addRects(self, x, y, width, height, cls: Optional[str] = None, style: Optional[Sty] = None, genids=True) -> int:
+		"""Bulk adds rectangles from columnar values (arrays, sequences or scalars, broadcast to all elements).
+			Output equals adding Rect objects one by one, without creating them. Returns number of rectangles added"""
+		n = max(np.size(c) for c in (x, y, width, height))
+		cols = [_bulkColumn(c, n) for c in (x, y, width, height)]
+		delta = self._bulkYInvertDelta()
+		if not delta is None:
+			cols[1] = _bulkYInverted(delta, cols[1], p_subtract=cols[3])
+		return self._addBulk("rect", Re._fields, cols, cls=cls, style=style, genids=genids)
+
+	def addLines(self, x1, y1, x2, y2, cls: Optional[str] = None, style: Optional[Sty] = None, genids=True) -> int:
+		"""Bulk adds lines from columnar values (arrays, sequences or scalars, broadcast to all elements).
+			Output equals adding Line objects one by one, without creating them. Returns number of lines added"""
+		n = max(np.size(c) for c in (x1, y1, x2, y2))
+		cols = [_bulkColumn(c, n) for c in (x1, y1, x2, y2)]
+		delta = self._bulkYInvertDelta()
+		if not delta is None:
+			cols[1] = _bulkYInverted(delta, cols[1])
+			cols[3] = _bulkYInverted(delta, cols[3])
+		return self._addBulk("line", Li._fields, cols, cls=cls, style=style, genids=genids)
+
 class SVGRoot(SVGContainer):
 
-	def __init__(self, rect: Re, tree = None, viewbox: Optional[VBox] = None) -> None:
+	def __init__(self, rect: Optional[Re], tree = None, viewbox: Optional[VBox] = None, numfmt: Optional[NumFormatter] = None) -> None:
+		"""rect: None only for an existing tree, read from its root element attributes"""
 		super().__init__("svg", struct=rect, viewbox=viewbox)
+		self._numfmt = numfmt
 		if tree is None:
 			self.tree = etree.parse(StringIO(SVG_ROOT))
 		elif hasattr(tree, 'getroot'):
@@ -573,8 +946,15 @@ class SVGRoot(SVGContainer):
 		else:
 			raise RuntimeError("object supplied is not ElementTree")
 		assert not self.tree is None
+		if etree.QName(self.tree.getroot()).localname != "svg":
+			raise RuntimeError("root element of tree supplied is not 'svg'")
 		self.setEl(self.tree.getroot())
-		self.setRect(rect)
+		if rect is None:
+			assert not tree is None
+			# existing attributes are kept as they are
+			self._struct = Re(defaults=None).getFromXmlAttrs(self.getEl())
+		else:
+			self.setRect(rect)
 		# Viewbox must be (re)inited here: in SVGContainer __init__ , 
 		# 	setViewbox finds no XML Element, is not yet created)
 		if not viewbox is None:
@@ -583,7 +963,7 @@ class SVGRoot(SVGContainer):
 	def setRect(self, p_rect: Re):
 		assert isinstance(p_rect, Re)
 		self.setStruct(p_rect)
-		p_rect.setXmlAttrs(self.getEl())
+		p_rect.setXmlAttrs(self.getEl(), numfmt=self._numfmt)
 		return self
 
 	def _addComment(self, p_text: str) -> None:
@@ -598,14 +978,463 @@ class SVGRoot(SVGContainer):
 class SVGContent(SVGRoot):
 
 	forbidden_user_tags = ["defs", "style"]
-	def __init__(self, rect: Re, viewbox: Optional[VBox] = None, yinvert=False) -> None:
-		super().__init__(rect, viewbox=viewbox)
-		self._id_serial = 0
-		self._defs = super().addChild(Defs())
+	# generated style classes, see toBytes
+	STYLECLASS_PREFIX = "s"
+	STYLECLASS_MINCOUNT = 2
+
+	def __init__(self, rect: Optional[Re], viewbox: Optional[VBox] = None, yinvert=False, precision: Optional[int] = None, tree=None, 
+			maxerror: Optional[float] = None) -> None:
+		"""precision: fixed number of decimal places for all numbers written in this document, 
+			by default, numbers are written as given (path commands rounded to GLOBAL_ENV places);
+			maxerror: instead of precision, maximum rounding error in output pixels, the fewest decimal 
+			places are derived from pixel size (see getPixelSize) as viewBox, width or height are set,
+			to be set before adding content (see _updateScalePrecision);
+			tree: existing document, see fromFile / fromBytes"""
+		assert precision is None or maxerror is None, "either precision or maxerror"
+		self._maxerror = maxerror
+		if not maxerror is None:
+			numfmt = NumFormatter()
+		elif precision is None:
+			numfmt = None
+		else:
+			numfmt = NumFormatter(precision)
+		super().__init__(rect, tree=tree, viewbox=viewbox, numfmt=numfmt)
+		self._updateScalePrecision()
+		self._doc = self
+		# wrappers by XML element, loaded document elements are wrapped on first lookup
+		self._wrappers = { self.getEl(): self }
+		# XML elements by id, class and tag, built on first lookup (see _buildIndexes)
+		self._idindex = None
+		self._classindex = None
+		self._tagindex = None
+		# element boxes by integer key, built on first spatial lookup (see _buildSpatialIndex)
+		self._spatial = None
+		self._spatialkeys = {}
+		self._spatialels = {}
+		self._spatialserial = 0
+		# elements whose boxes are to be recomputed on next spatial lookup
+		self._spatialdirty = {}
+		# definitions by class and constructor arguments, see getSymbol
+		self._symbols = {}
+		if tree is None:
+			self._id_serial = 0
+			self._defs = super().addChild(Defs())
+		else:
+			# first id serial computed on first use, not to clash with existing generated ids
+			self._id_serial = None
+			self._defs = self._loadedDefs()
 		self._defs.setGenIdMethod(self.nextIDSerial)
 		self._styleel = self._defs.addChild(Style())
 		self._yinvert = yinvert
 
+	@classmethod
+	def fromBytes(cls, p_data: bytes, huge_tree=False, yinvert=False, precision: Optional[int] = None, maxerror: Optional[float] = None):
+		"""Existing SVG document, its elements wrapped only when found by getById, findByTag or findByClass.
+			huge_tree: lift lxml limits on tree depth and text size, for very large drawings"""
+		parser = etree.XMLParser(huge_tree=huge_tree)
+		root = etree.fromstring(p_data, parser)
+		return cls(None, yinvert=yinvert, precision=precision, tree=root.getroottree(), maxerror=maxerror)
+
+	@classmethod
+	def fromFile(cls, p_path, huge_tree=False, yinvert=False, precision: Optional[int] = None, maxerror: Optional[float] = None):
+		"""As fromBytes, p_path being a file name or a binary file-like object"""
+		parser = etree.XMLParser(huge_tree=huge_tree)
+		return cls(None, yinvert=yinvert, precision=precision, tree=etree.parse(p_path, parser), maxerror=maxerror)
+
+	def _hasContent(self) -> bool:
+		"True if elements, other than empty defs and metadata, were added"
+		for el in self.getEl().iter(etree.Element):
+			if not el is self.getEl() and not _localTag(el) in _NOCOORDS_TAGS:
+				return True
+		return False
+
+	def _updateScalePrecision(self) -> None:
+		"""Document precision following pixel size. Already written attributes are not rewritten:
+			a finer precision, once content is added, raises PrecisionChangeError"""
+		if not self._maxerror is None and self.hasEl():
+			places = scalePrecision(self.getPixelSize(), self._maxerror)
+			if places != self._numfmt.places:
+				if not self._numfmt.places is None and places > self._numfmt.places and self._hasContent():
+					raise PrecisionChangeError(self._numfmt.places, places)
+				self._numfmt.setPlaces(places)
+
+	def getPrecision(self) -> Optional[int]:
+		"Decimal places numbers are written with, None if written as given"
+		return None if self._numfmt is None else self._numfmt.places
+
+	def _updateStructAttrs(self):
+		prev = dict(self.getEl().attrib)
+		super()._updateStructAttrs()
+		try:
+			self._updateScalePrecision()
+		except PrecisionChangeError:
+			self.getEl().attrib.clear()
+			self.getEl().attrib.update(prev)
+			self._struct.getFromXmlAttrs(self.getEl())
+			raise
+		return self
+
+	def _setViewbox(self, p_viewbox: VBox):
+		prev = self.getEl().get("viewBox")
+		super()._setViewbox(p_viewbox)
+		try:
+			self._updateScalePrecision()
+		except PrecisionChangeError:
+			if prev is None:
+				del self.getEl().attrib["viewBox"]
+			else:
+				self.getEl().set("viewBox", prev)
+			raise
+		return self
+
+	def _loadedDefs(self):
+		root = self.getEl()
+		el = root.find(_svgTag("defs"))
+		if el is None:
+			el = root.find("defs")
+		if el is None:
+			ret = super().addChild(Defs())
+			root.insert(0, ret.getEl())
+		else:
+			ret = self._wrapEl(el)
+		return ret
+
+	def _registerWrapper(self, p_elem: BaseSVGElem) -> None:
+		self._wrappers[p_elem.getEl()] = p_elem
+		if not self._tagindex is None:
+			self._indexEl(p_elem.getEl())
+
+	def isIndexed(self) -> bool:
+		return not self._tagindex is None
+
+	def _buildIndexes(self):
+		"""Indexes all elements in one pass. From then on, indexes are kept as elements are added, 
+			removed or get id or class changed through this library, not through lxml directly"""
+		self._idindex = {}
+		self._classindex = {}
+		self._tagindex = {}
+		for el in self.getEl().iter(etree.Element):
+			self._indexEl(el)
+
+	def _indexEl(self, p_el) -> None:
+		# dicts as insertion ordered sets of elements
+		if not self._spatial is None:
+			self._spatialdirty[p_el] = None
+		tag = _localTag(p_el)
+		els = self._tagindex.get(tag)
+		if els is None:
+			self._tagindex[tag] = {p_el: None}
+		else:
+			els[p_el] = None
+		idval = p_el.get("id")
+		if not idval is None:
+			# every holder of repeated ids kept, first one wins on lookups, as in getElementById
+			els = self._idindex.get(idval)
+			if els is None:
+				self._idindex[idval] = {p_el: None}
+			else:
+				els[p_el] = None
+		clsval = p_el.get("class")
+		if not clsval is None:
+			for cls in clsval.split():
+				els = self._classindex.get(cls)
+				if els is None:
+					self._classindex[cls] = {p_el: None}
+				else:
+					els[p_el] = None
+
+	def _unindexEl(self, p_el) -> None:
+		if not self._spatial is None:
+			self._spatialDelete(p_el)
+			self._spatialdirty.pop(p_el, None)
+		els = self._tagindex.get(_localTag(p_el))
+		if not els is None:
+			els.pop(p_el, None)
+		idval = p_el.get("id")
+		if not idval is None:
+			els = self._idindex.get(idval)
+			if not els is None:
+				els.pop(p_el, None)
+				if len(els) == 0:
+					del self._idindex[idval]
+		clsval = p_el.get("class")
+		if not clsval is None:
+			for cls in clsval.split():
+				els = self._classindex.get(cls)
+				if not els is None:
+					els.pop(p_el, None)
+
+	def _indexTree(self, p_el) -> None:
+		if not self._tagindex is None:
+			for el in p_el.iter(etree.Element):
+				self._indexEl(el)
+
+	def _unindexTree(self, p_el, forget=False) -> None:
+		"forget: element gone for good, its wrappers and descendants wrappers released"
+		if self._tagindex is None and not forget:
+			return
+		for el in p_el.iter(etree.Element):
+			if not self._tagindex is None:
+				self._unindexEl(el)
+			if forget:
+				self._wrappers.pop(el, None)
+
+	def _setIndexedAttr(self, p_el, p_attr: str, p_value: str) -> None:
+		"Sets 'id' or 'class' attribute value, updating indexes if p_el is indexed"
+		indexed = not self._tagindex is None and p_el in self._tagindex.get(_localTag(p_el), ())
+		if indexed:
+			self._unindexEl(p_el)
+		p_el.set(p_attr, p_value)
+		if indexed:
+			self._indexEl(p_el)
+
+	def _idLookup(self, p_id: str):
+		"First indexed XML element having p_id, None if none"
+		els = self._idindex.get(p_id)
+		return None if els is None else next(iter(els))
+
+	def _wrapEl(self, p_el) -> BaseSVGElem:
+		"Wrapper of XML element, created on first request for loaded elements"
+		ret = self._wrappers.get(p_el)
+		if ret is None:
+			tag = _localTag(p_el)
+			cls = LOADED_ELEMENT_CLASSES.get(tag)
+			ret = GenericSVGElem(tag) if cls is None else cls()
+			strct = ret._struct
+			if not strct is None:
+				# no default values for attributes absent from element
+				for f in strct._fields:
+					if hasattr(strct, f) and p_el.get(f) is None:
+						delattr(strct, f)
+				strct.getFromXmlAttrs(p_el)
+			# element is bound as it is, no attribute writing
+			ret._pendingXMLDependentOps = ()
+			ret.el = p_el
+			ret._numfmt = self._numfmt
+			ret._doc = self
+			par = p_el.getparent()
+			if not par is None:
+				ret._parenttag = _localTag(par)
+			if isinstance(ret, SVGContainer):
+				ret.setGenIdMethod(self.nextIDSerial)
+			self._wrappers[p_el] = ret
+		return ret
+
+	def getById(self, p_id: str) -> Optional[BaseSVGElem]:
+		if self._tagindex is None:
+			self._buildIndexes()
+		el = self._idLookup(p_id)
+		if el is None:
+			return None
+		return self._wrapEl(el)
+
+	def findByTag(self, p_tag: str) -> List[BaseSVGElem]:
+		"Elements by tag, in document order for loaded or bulk added elements, in adding order afterwards"
+		if self._tagindex is None:
+			self._buildIndexes()
+		return [self._wrapEl(el) for el in self._tagindex.get(p_tag, ())]
+
+	def findByClass(self, p_class: str) -> List[BaseSVGElem]:
+		"Elements having p_class among its classes, ordered as in findByTag"
+		if self._tagindex is None:
+			self._buildIndexes()
+		return [self._wrapEl(el) for el in self._classindex.get(p_class, ())]
+
+	# spatial index
+
+	def _buildSpatialIndex(self):
+		"""Indexes boxes of all rendered elements in one pass. As for id, class and tag indexes, 
+			it is kept from then on, boxes being recomputed on the next spatial lookup"""
+		if self._tagindex is None:
+			self._buildIndexes()
+		self._spatial = SpatialIndex()
+		self._spatialkeys = {}
+		self._spatialels = {}
+		self._spatialdirty = {}
+		for el in self.getEl().iterchildren(etree.Element):
+			self._spatialWalk(el, _IDENTITY_MATRIX)
+		self._spatial.build()
+
+	def _spatialChanged(self, p_el) -> None:
+		if not self._spatial is None:
+			self._spatialdirty[p_el] = None
+
+	def _spatialDelete(self, p_el) -> None:
+		key = self._spatialkeys.pop(p_el, None)
+		if not key is None:
+			del self._spatialels[key]
+			self._spatial.delete(key)
+
+	def _spatialCTM(self, p_el) -> Optional[np.ndarray]:
+		"Transform from p_el parent user space to document user space, None if not rendered, unknown or detached"
+		root = self.getEl()
+		trtexts = []
+		par = p_el.getparent()
+		while not par is root:
+			if par is None or not _localTag(par) in _SPATIAL_GROUP_TAGS:
+				return None
+			trtxt = par.get("transform")
+			if not trtxt is None:
+				trtexts.append(trtxt)
+			par = par.getparent()
+		ret = _IDENTITY_MATRIX
+		for trtxt in reversed(trtexts):
+			m = _affineFromText(trtxt)
+			if m is None:
+				return None
+			ret = ret @ m
+		return ret
+
+	def _useBounds(self, p_xmlel) -> Optional[tuple]:
+		"Box of 'use' element referencing a 'symbol' or 'svg' with given width and height"
+		href = p_xmlel.get(f"{{{XLINK_NAMESPACE}}}href", p_xmlel.get("href"))
+		if href is None or not href.startswith("#"):
+			return None
+		ref = self._idLookup(href[1:])
+		if ref is None or not _localTag(ref) in ("symbol", "svg"):
+			return None
+		return _xmlElBounds(p_xmlel, "svg")
+
+	def _spatialWalk(self, p_el, p_ctm: Optional[np.ndarray]) -> None:
+		"(Re)indexes boxes of p_el and its descendants, p_ctm being p_el parent transform, None if unknown"
+		stack = [(p_el, p_ctm)]
+		while len(stack) > 0:
+			el, m = stack.pop()
+			tag = _localTag(el)
+			if not m is None:
+				if tag in _NONRENDERED_TAGS:
+					m = None
+				else:
+					trtxt = el.get("transform")
+					if not trtxt is None:
+						t = _affineFromText(trtxt)
+						m = None if t is None else m @ t
+			if tag in _SPATIAL_GROUP_TAGS:
+				stack.extend([(chld, m) for chld in el.iterchildren(etree.Element)])
+				continue
+			box = None
+			if not m is None:
+				if tag == "use":
+					box = self._useBounds(el)
+				else:
+					box = _xmlElBounds(el, tag)
+			if box is None:
+				self._spatialDelete(el)
+			else:
+				key = self._spatialkeys.get(el)
+				if key is None:
+					key = self._spatialserial
+					self._spatialserial += 1
+					self._spatialkeys[el] = key
+					self._spatialels[key] = el
+				self._spatial.insert(key, box if m is _IDENTITY_MATRIX else affineBounds(m, box))
+
+	def _spatialSearch(self, minx, miny, maxx, maxy) -> list:
+		"XML elements whose boxes intersect the window, in indexing order"
+		if self._spatial is None:
+			self._buildSpatialIndex()
+		if len(self._spatialdirty) > 0:
+			tagindex = self._tagindex
+			for el in self._spatialdirty:
+				# removed elements were already unindexed
+				if el in tagindex.get(_localTag(el), ()):
+					self._spatialWalk(el, self._spatialCTM(el))
+			self._spatialdirty = {}
+		els = self._spatialels
+		return [els[key] for key in self._spatial.search(minx, miny, maxx, maxy).tolist()]
+
+	def _cullDetach(self, minx, miny, maxx, maxy) -> list:
+		"""Detaches elements to be left out of output for a window: elements of known box not intersecting 
+			it and 'defs' children having ids, unless referenced, directly or not, by elements in output.
+			Returns (parent, children) pairs to restore them. Straight lxml changes, indexes not touched"""
+		root = self.getEl()
+		inside = set(self._spatialSearch(minx, miny, maxx, maxy))
+		candidates = {el: None for el in self._spatialkeys if not el in inside}
+		for defsel in root.iter(_svgTag("defs"), "defs"):
+			for el in defsel.iterchildren(etree.Element):
+				if not el.get("id") is None and _localTag(el) != "style":
+					candidates[el] = None
+		ret = {}
+		for el in candidates:
+			par = el.getparent()
+			candidates[el] = par
+			if not par in ret:
+				ret[par] = list(par)
+		for par, children in ret.items():
+			par[:] = [el for el in children if not el in candidates]
+		try:
+			self._cullRevive(ret, candidates)
+		except BaseException:
+			for par, children in ret.items():
+				par[:] = children
+			raise
+		return list(ret.items())
+
+	def _cullRevive(self, p_detached: dict, p_candidates: dict) -> None:
+		"Puts back in detached candidates referenced by elements left in tree, see _cullDetach"
+		root = self.getEl()
+		candidates = p_candidates
+		# only references from elements left in tree are searched, a referenced candidate is put 
+		# back in and references from it searched in turn
+		idstack = []
+		for el in root.iter(etree.Element):
+			for k, v in el.items():
+				if "#" in v:
+					idstack.extend(_idRefs(k, v))
+		for el in root.iter(_svgTag("style"), "style"):
+			if not el.text is None:
+				idstack.extend(_URLREF_RE.findall(el.text))
+		revived = set()
+		reached = set()
+		while len(idstack) > 0:
+			idval = idstack.pop()
+			if idval in reached:
+				continue
+			reached.add(idval)
+			el = self._idLookup(idval)
+			if el is None:
+				continue
+			cand = _cullCandidate(el, candidates)
+			if not cand is None:
+				revived.add(candidates.pop(cand))
+				for subel in cand.iter(etree.Element):
+					for k, v in subel.items():
+						if "#" in v:
+							idstack.extend(_idRefs(k, v))
+		for par in revived:
+			par[:] = [el for el in p_detached[par] if not el in candidates]
+
+	def getPixelSize(self) -> float:
+		"""Document user units per output pixel, from viewBox and width and height, as scaled 
+			by default preserveAspectRatio. 1 if there is no viewBox or sizes are not in pixels"""
+		root = self.getEl()
+		vb = root.get("viewBox")
+		if vb is None:
+			return 1.0
+		try:
+			_minx, _miny, vbw, vbh = [float(v) for v in _NUMLIST_SEP_RE.split(vb.strip())]
+		except ValueError:
+			return 1.0
+		scales = []
+		for attr, vbsize in (("width", vbw), ("height", vbh)):
+			size = _xmlLength(root, attr)
+			if not size is None and vbsize > 0:
+				scales.append(size / vbsize)
+		if len(scales) == 0 or min(scales) <= 0:
+			return 1.0
+		return 1.0 / min(scales)
+
+	def findInEnvelope(self, p_env: Env) -> List[BaseSVGElem]:
+		"""Elements whose geometry box, in document user units and not including stroke, intersects p_env. 
+			Elements of unknown box (text, relative units, unparsable data) are not found"""
+		return [self._wrapEl(el) for el in self._spatialSearch(*p_env.getBounds())]
+
+	def findAtPoint(self, p_pt: Pt) -> List[BaseSVGElem]:
+		"Elements whose geometry box contains p_pt, as in findInEnvelope"
+		x = strictToNumber(p_pt.x)
+		y = strictToNumber(p_pt.y)
+		return [self._wrapEl(el) for el in self._spatialSearch(x, y, x, y)]
+
 	def _calcYInvertDelta(self):
 		vb = self.getViewbox()
 		vbvals = vb.getValues()
@@ -617,9 +1446,9 @@ class SVGContent(SVGRoot):
 		else:
 			strct = self.getStruct()
 			if hasattr(strct, 'height'):
-				height = strictToNumber(getattr(strct, 'height'))
+				height = strct.getNumber('height')
 			if hasattr(strct, 'y'):
-				miny = strictToNumber(getattr(strct, 'y'))
+				miny = strct.getNumber('y')
 		assert not miny is None and not height is None
 		return 2 * miny + height
 
@@ -629,11 +1458,31 @@ class SVGContent(SVGRoot):
 	def getYInvertDelta(self):
 		return self._calcYInvertDelta()
 
+	def _loadedIdSerial(self) -> int:
+		ret = 0
+		for idval in self.getEl().xpath("//@id"):
+			mo = _GENID_RE.fullmatch(idval)
+			if not mo is None:
+				ret = max(ret, int(mo.group(1)) + 1)
+		return ret
+
 	def nextIDSerial(self):
+		if self._id_serial is None:
+			self._id_serial = self._loadedIdSerial()
 		ret = self._id_serial
 		self._id_serial = self._id_serial + 1
 		return ret
 
+	def _bulkIdMethod(self):
+		if not getattr(self, '_FATTR_doSubIdAutoGeneration', True):
+			return None
+		return self.nextIDSerial
+
+	def _bulkYInvertDelta(self):
+		if self._yinvert:
+			return self._calcYInvertDelta()
+		return None
+
 	def addChild(self, p_child: BaseSVGElem, todefs: Optional[bool] = False, nsmap=None, noyinvert=False) -> BaseSVGElem:
 		gotid = False
 
@@ -678,6 +1527,21 @@ class SVGContent(SVGRoot):
 
 		return ret
 
+	def getSymbol(self, p_class, *args, noyinvert=False, **kwargs) -> BaseSVGElem:
+		"""Definition of a symbol class (see Symbols) built with these arguments, added to defs on first 
+			request, the same element returned afterwards, for Use elements to refer to"""
+		key = (p_class, args, tuple(sorted(kwargs.items())), noyinvert)
+		try:
+			hash(key)
+		except TypeError:
+			key = (p_class, repr(key[1:]))
+		ret = self._symbols.get(key)
+		# removed definitions are created again
+		if ret is None or not ret.hasEl() or not ret.getEl().getroottree().getroot() is self.getEl():
+			ret = self.addChild(p_class(*args, **kwargs), todefs=True, noyinvert=noyinvert)
+			self._symbols[key] = ret
+		return ret
+
 	def addStyleRule(self, p_child: CSSSty) -> str:
 		return self._styleel.addRule(p_child)
 
@@ -697,23 +1561,310 @@ class SVGContent(SVGRoot):
 	def render(self):
 		return self._styleel.render(depth=-1)
 
-	def toBytes(self, inc_declaration=False, inc_doctype=False, pretty_print=True):
-		parelem = None
-		if not self.render():
-			parelem = self._styleel.removeEl()
+	def _addStyleClasses(self):
+		"""Adds a generated class rule for each style attribute set shared by at least STYLECLASS_MINCOUNT 
+			elements, when output gets smaller. Returns rule selectors and, for each one, its style 
+			attribute names and the elements order numbers (see _styleClassesTree)."""
+		root = self.getEl()
+		styleel = self._styleel.getEl()
+		for el in root.iter(_svgTag("style"), "style"):
+			if not el is styleel:
+				# unparsed CSS, cascade can't be preserved
+				return None
+		# properties set by existing rules stay as attributes: rules take precedence over
+		# attributes, not over other rules
+		ruleprops = set()
+		for rule in self._styleel.stylerules.values():
+			ruleprops.update(rule.getStyleAttrs())
+		styleattrs = STYLE_ATTRIBS.difference(ruleprops)
+		usedclasses = set([sel[1:] for sel in self._styleel.stylerules.keys() if sel.startswith(".")])
+		# grouped by attributes in element order first, same style sets are usually written in the same order
+		ordgroups = {}
+		for idx, el in enumerate(root.iter(etree.Element)):
+			fingerprint = tuple([(k, v) for k, v in el.items() if k in styleattrs])
+			if len(fingerprint) > 0:
+				idxs = ordgroups.get(fingerprint)
+				if idxs is None:
+					ordgroups[fingerprint] = [idx]
+				else:
+					idxs.append(idx)
+			clsval = el.get("class")
+			if not clsval is None:
+				usedclasses.update(clsval.split())
+		groups = {}
+		for fingerprint, idxs in ordgroups.items():
+			groups.setdefault(tuple(sorted(fingerprint)), []).extend(idxs)
+		ret = []
+		serial = 0
+		for fingerprint, idxs in sorted(groups.items(), key=lambda item: -len(item[1])):
+			count = len(idxs)
+			if count < self.STYLECLASS_MINCOUNT:
+				break
+			while f"{self.STYLECLASS_PREFIX}{serial}" in usedclasses:
+				serial += 1
+			clsname = f"{self.STYLECLASS_PREFIX}{serial}"
+			# sizes in output: attributes removed, class attribute added, CSS rule added
+			attrsize = sum([len(k) + len(v) + 4 for k, v in fingerprint])
+			if count * (attrsize - len(clsname) - 9) <= attrsize + len(clsname) + 4:
+				continue
+			serial += 1
+			rule = CSSSty(selector="." + clsname)
+			if not "fill" in [k for k, _v in fingerprint]:
+				del rule.fill
+			for k, v in fingerprint:
+				rule.set(k, v)
+			ret.append((self.addStyleRule(rule), [k for k, _v in fingerprint], idxs))
+		return ret
 
-		if inc_doctype:
-			ret = etree.tostring(self.getEl(), doctype=DOCTYPE_STR, xml_declaration=inc_declaration, pretty_print=pretty_print, encoding='utf-8')
-		else:
-			ret = etree.tostring(self.getEl(), xml_declaration=inc_declaration, pretty_print=pretty_print, encoding='utf-8')	
+	def _styleClassesTree(self, p_classes):
+		"Copy of the XML tree, elements styled by generated class rules"
+		ret = deepcopy(self.getEl())
+		els = list(ret.iter(etree.Element))
+		for selector, attrs, idxs in p_classes:
+			clsname = selector[1:]
+			for idx in idxs:
+				el = els[idx]
+				attrib = el.attrib
+				for k in attrs:
+					del attrib[k]
+				clsval = attrib.get("class")
+				attrib["class"] = clsname if clsval is None else f"{clsval} {clsname}"
+		return ret
+
+	def toBytes(self, inc_declaration=False, inc_doctype=False, pretty_print=True, styleclasses=False, 
+			window: Optional[Env] = None, margin=0.0):
+		"""styleclasses: style attributes repeated on many elements are written as generated class rules, 
+			in the output only, this content is not changed;
+			window: only elements whose box intersects window, expanded by margin, are written and viewBox 
+			is set to expanded window, in document user units. Boxes don't include stroke width, margin 
+			should. Elements of unknown box are written, definitions only if referenced"""
+		root = self.getEl()
+		culled = None
+		viewbox = root.get("viewBox")
+		classes = None
+		parelem = None
+		try:
+			if not window is None:
+				minx, miny, maxx, maxy = window.getBounds()
+				minx -= margin
+				miny -= margin
+				maxx += margin
+				maxy += margin
+				# style rules rendered for their references to be found
+				self.render()
+				culled = self._cullDetach(minx, miny, maxx, maxy)
+				VBox(minx, miny, maxx - minx, maxy - miny).setXmlAttrs(root, numfmt=self._numfmt)
+
+			if styleclasses:
+				classes = self._addStyleClasses()
+
+			if not self.render():
+				parelem = self._styleel.removeEl()
+
+			if classes:
+				outel = self._styleClassesTree(classes)
+			else:
+				outel = self.getEl()
 
-		if not parelem is None:
-			self._styleel.readdElToParent(parelem)
+			if inc_doctype:
+				ret = etree.tostring(outel, doctype=DOCTYPE_STR, xml_declaration=inc_declaration, pretty_print=pretty_print, encoding='utf-8')
+			else:
+				ret = etree.tostring(outel, xml_declaration=inc_declaration, pretty_print=pretty_print, encoding='utf-8')	
+
+		finally:
+			# this content is left as it was, output failing or not
+			if not parelem is None:
+				self._styleel.readdElToParent(parelem)
+
+			if classes:
+				for selector, _attrs, _idxs in classes:
+					self.delStyleRule(selector)
+
+			if not culled is None:
+				for par, children in culled:
+					par[:] = children
+			if root.get("viewBox") != viewbox:
+				if viewbox is None:
+					del root.attrib["viewBox"]
+				else:
+					root.set("viewBox", viewbox)
 
 		return ret
 
-	def toString(self, inc_declaration=False, inc_doctype=False, pretty_print=True):
-		return self.toBytes(inc_declaration=inc_declaration, inc_doctype=inc_doctype, pretty_print=pretty_print).decode('utf-8')
+	def toString(self, inc_declaration=False, inc_doctype=False, pretty_print=True, styleclasses=False, 
+			window: Optional[Env] = None, margin=0.0):
+		return self.toBytes(inc_declaration=inc_declaration, inc_doctype=inc_doctype, pretty_print=pretty_print, 
+			styleclasses=styleclasses, window=window, margin=margin).decode('utf-8')
+
+	def streamTo(self, p_output, inc_declaration=False, inc_doctype=False, pretty_print=True):
+		"""Returns a SVGStreamWriter writing this content incrementally to p_output (file name or
+			binary file-like object). Style rules, background and any other header content must be
+			already added"""
+		return SVGStreamWriter(self, p_output, inc_declaration=inc_declaration, inc_doctype=inc_doctype, pretty_print=pretty_print)
+
+class SVGStreamWriter(object):
+	"""Incremental writer for SVGContent, for documents too big to be held in memory.
+		Elements are added through the writer, which flushes each one to the output
+		on the next writer operation, dropping both XML element and Python wrapper.
+		Groups are opened and closed in order; group attributes must be set before opening.
+		Use as a context manager or call open() and close()."""
+
+	def __init__(self, p_content: SVGContent, p_output, inc_declaration=False, inc_doctype=False, pretty_print=True) -> None:
+		assert isinstance(p_content, SVGContent)
+		self.content = p_content
+		self.output = p_output
+		self.inc_declaration = inc_declaration
+		self.inc_doctype = inc_doctype
+		self.pretty_print = pretty_print
+		self._xmlfile = None
+		self._xf = None
+		# stack of (container, XML element context) pairs, root at bottom
+		self._stack = []
+
+	def __enter__(self):
+		return self.open()
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		if exc_type is None:
+			self.close()
+		else:
+			self._abort(exc_type, exc_value, traceback)
+
+	def _abort(self, exc_type, exc_value, traceback):
+		"Output left unfinished: open elements are not closed, underlying output is closed all the same"
+		if not self._xmlfile is None:
+			xmlfile = self._xmlfile
+			self._xf = None
+			self._xmlfile = None
+			del self._stack[:]
+			xmlfile.__exit__(exc_type, exc_value, traceback)
+
+	def isOpen(self) -> bool:
+		return not self._xf is None
+
+	def _newline(self):
+		if self.pretty_print:
+			self._xf.write('\n')
+
+	def _writeDetached(self, p_xmlel):
+		# written elements are gone from content
+		self.content._unindexTree(p_xmlel, forget=True)
+		p_xmlel.getparent().remove(p_xmlel)
+		self._xf.write(p_xmlel, pretty_print=self.pretty_print)
+
+	def _enterElement(self, p_xmlel, nsmap=None):
+		if nsmap is None:
+			ctx = self._xf.element(p_xmlel.tag, dict(p_xmlel.attrib))
+		else:
+			ctx = self._xf.element(p_xmlel.tag, dict(p_xmlel.attrib), nsmap=nsmap)
+		ctx.__enter__()
+		self._newline()
+		return ctx
+
+	def _flushDefs(self):
+		defs = self.content._defs
+		defsel = defs.getEl()
+		if len(defsel) > 0:
+			ctx = self._enterElement(defsel)
+			for chld in list(defsel):
+				self._writeDetached(chld)
+			ctx.__exit__(None, None, None)
+			self._newline()
+		del defs.content[:]
+
+	def _flushContainer(self, p_container: SVGContainer):
+		for chld in list(p_container.getEl()):
+			self._writeDetached(chld)
+		if p_container is self.content:
+			p_container.content = [self.content._defs]
+		else:
+			del p_container.content[:]
+
+	def open(self):
+		"Writes declaration, doctype, root start tag and the header: defs, including the rendered style rules"
+		assert not self.isOpen(), "SVGStreamWriter already open"
+		self._xmlfile = etree.xmlfile(self.output, encoding='utf-8')
+		self._xf = self._xmlfile.__enter__()
+		if self.inc_declaration:
+			self._xf.write_declaration()
+		if self.inc_doctype:
+			self._xf.write_doctype(DOCTYPE_STR)
+
+		rootel = self.content.getEl()
+		self._stack.append((self.content, self._enterElement(rootel, nsmap=rootel.nsmap)))
+
+		if not self.content.render():
+			self.content._styleel.removeEl()
+		# defs get detached from root, children added later to defs are
+		# flushed in new defs elements
+		defsel = self.content._defs.getEl()
+		self._writeDetached(defsel)
+		del defsel[:]
+		self._flushContainer(self.content)
+		return self
+
+	def flush(self):
+		"Writes every element pending on currently open container and defs"
+		assert self.isOpen(), "SVGStreamWriter not open"
+		self._flushContainer(self._stack[-1][0])
+		self._flushDefs()
+		self._xf.flush()
+		return self
+
+	def addChild(self, p_child: BaseSVGElem, todefs: Optional[bool] = False, nsmap=None, noyinvert=False) -> BaseSVGElem:
+		"Adds child to currently open container. Child remains changeable until next writer operation"
+		self.flush()
+		return self._stack[-1][0].addChild(p_child, todefs=todefs, nsmap=nsmap, noyinvert=noyinvert)
+
+	def addCircles(self, *args, **kwargs) -> int:
+		self.flush()
+		return self._stack[-1][0].addCircles(*args, **kwargs)
+
+	def addRects(self, *args, **kwargs) -> int:
+		self.flush()
+		return self._stack[-1][0].addRects(*args, **kwargs)
+
+	def addLines(self, *args, **kwargs) -> int:
+		self.flush()
+		return self._stack[-1][0].addLines(*args, **kwargs)
+
+	def openGroup(self, p_group: Optional[SVGContainer] = None) -> SVGContainer:
+		"Adds p_group (new Group if none supplied) and writes its start tag, following children are added to it"
+		if p_group is None:
+			grp = Group()
+		else:
+			grp = p_group
+		assert isinstance(grp, SVGContainer)
+		self.addChild(grp)
+		self._stack.append((grp, self._enterElement(grp.getEl())))
+		return grp
+
+	def closeGroup(self):
+		assert len(self._stack) > 1, "no open group to close"
+		self.flush()
+		grp, ctx = self._stack.pop()
+		ctx.__exit__(None, None, None)
+		self._newline()
+		grp.removeEl()
+		parent = self._stack[-1][0]
+		parent.content.remove(grp)
+		return parent
+
+	def close(self):
+		"Closes open groups and root element, flushing all pending content"
+		try:
+			while len(self._stack) > 1:
+				self.closeGroup()
+			self.flush()
+			_cont, ctx = self._stack.pop()
+			ctx.__exit__(None, None, None)
+		except BaseException as e:
+			self._abort(type(e), e, e.__traceback__)
+			raise
+		xmlfile = self._xmlfile
+		self._xf = None
+		self._xmlfile = None
+		xmlfile.__exit__(None, None, None)
 
 class Group(SVGContainer):
 	def __init__(self) -> None:
@@ -808,10 +1959,7 @@ class Rect(GenericSVGElem):
 
 	def getContour(self, forceanchor=None):
 		"ccw from lower right"
-		x, _u = toNumberAndUnit(self._re.get("x"))
-		y, _u = toNumberAndUnit(self._re.get("y"))
-		w, _u = toNumberAndUnit(self._re.get("width"))
-		h, _u = toNumberAndUnit(self._re.get("height"))
+		x, y, w, h = [self._re.getNumAndUnit(f)[0] for f in ("x", "y", "width", "height")]
 		hw = w/2
 		hh = h/2
 
@@ -884,8 +2032,8 @@ class RectRC(GenericSVGElem):
 		strct = self.getStruct()
 		x = p_anchorpt.x
 		y = p_anchorpt.y
-		w, _u = toNumberAndUnit(strct.get("width"))
-		h, _u = toNumberAndUnit(strct.get("height"))
+		w, _u = strct.getNumAndUnit("width")
+		h, _u = strct.getNumAndUnit("height")
 		hw = w/2
 		hh = h/2
 
@@ -951,6 +2099,7 @@ class Ellipse(GenericSVGElem):
 		super().__init__("ellipse", struct=Elli(*args))
 
 class MarkeableSVGElem(GenericSVGElem):
+	__slots__ = ("_markerprops",)
 	def __init__(self, tag: str, struct: Optional[_withunits_struct] = None, marker_props: Optional[MrkProps] = None) -> None:
 		super().__init__(tag, struct=struct)
 		if not marker_props is None:
@@ -989,60 +2138,155 @@ class Path(MarkeableSVGElem):
 
 class AnalyticalPath(Path):
 
+	__slots__ = ("cmds", "_dtokens", "_dfirstdirty", "_dtext", "_dtextlen", "_dnumfmt", "removedvertices")
+
 	def __init__(self, marker_props: Optional[MrkProps] = None) -> None:
 		super().__init__("", marker_props=marker_props)
 		self.cmds = []
-
-	def refresh(self):
-		prevcmd = None
-		buf = []
-		for cmd in self.cmds:
-			do_omit = False
-			lett = cmd.getLetter()
-			if prevcmd is None:
-				assert lett.lower() == 'm', cmd.getLetter()	
-				cmd.setRelative(False)			
-			else:
-				prevlett = prevcmd.getLetter()
-				if lett.lower() == 'l':
-					if prevlett.lower() in ('m', 'l') and prevcmd.isRelative() == cmd.isRelative():
-						do_omit = True
-				elif lett.lower() != 'm':
-					if lett == prevlett:
-						do_omit = True
-			buf.append(cmd.get(omitletter=do_omit))
+		# Encoded 'd' cache: one token per command, None for commands to be (re)encoded,
+		# from _dfirstdirty onwards; _dtext is the join of the first _dtextlen tokens
+		self._dtokens = []
+		self._dfirstdirty = 0
+		self._dtext = ""
+		self._dtextlen = 0
+		self._dnumfmt = None
+		# vertices dropped by last simplification, see addPolylinePList
+		self.removedvertices = 0
+
+	def _encodeCmd(self, p_prevcmd: Optional[path_command], p_cmd: path_command) -> str:
+		do_omit = False
+		lett = p_cmd.getFirstLetter()
+		if p_prevcmd is None:
+			assert lett.lower() == 'm', p_cmd.getLetter()	
+			p_cmd.setRelative(False)			
+		else:
+			prevlett = p_prevcmd.getLetter()
+			if lett.lower() == 'l':
+				# letter case tells relative commands, also for multiple commands runs 
+				# (PathBuffer, pEncoded) where first and last commands may differ
+				if prevlett.lower() in ('m', 'l') and prevlett.islower() == lett.islower():
+					do_omit = True
+			elif lett.lower() != 'm':
+				if lett == prevlett:
+					do_omit = True
+		return p_cmd.get(omitletter=do_omit, numfmt=self._numfmt)
+
+	def _dirtyFrom(self, p_idx: int) -> None:
+		"Command at p_idx and the next one (letter omission depends on previous command) to be reencoded"
+		tokens = self._dtokens
+		for i in (p_idx, p_idx + 1):
+			if i < len(tokens):
+				tokens[i] = None
+		if p_idx < self._dfirstdirty:
+			self._dfirstdirty = p_idx
+
+	def _updateD(self):
+		"""Writes 'd' attribute, encoding only new or changed commands, same output as a 
+			full refresh"""
+		cmds = self.cmds
+		tokens = self._dtokens
+		fmtkey = None if self._numfmt is None else (self._numfmt, self._numfmt.places)
+		if len(tokens) != len(cmds) or self._dnumfmt != fmtkey:
+			# commands list changed by other means or document formatting changed
+			tokens = self._dtokens = [None] * len(cmds)
+			self._dfirstdirty = 0
+			self._dnumfmt = fmtkey
+		start = self._dfirstdirty
+		if start > 0:
+			prevcmd = cmds[start-1]
+		else:
+			prevcmd = None
+		for i in range(start, len(cmds)):
+			cmd = cmds[i]
+			if tokens[i] is None:
+				tokens[i] = self._encodeCmd(prevcmd, cmd)
 			prevcmd = cmd
-		if len(buf) > 0:
-			self.getStruct().setall("".join(buf))
+		self._dfirstdirty = len(tokens)
+		if len(tokens) > 0:
+			if start >= self._dtextlen:
+				text = self._dtext + "".join(tokens[self._dtextlen:])
+			else:
+				text = "".join(tokens)
+			self._dtext = text
+			self._dtextlen = len(tokens)
+			self.getStruct().setall(text)
 			self.updateStructAttrs()
 
+	def refresh(self):
+		"Encodes all commands, changes made on already added commands are included"
+		self._dtokens = [None] * len(self.cmds)
+		self._dfirstdirty = 0
+		self._updateD()
+
 	def addCmd(self, p_cmd: path_command, tostart=False, refresh=False):
 		if hasattr(p_cmd, 'yinvert'):
 			if not self._noyinvert and not self._yinvertdelta is None:
 				p_cmd.yinvert(self._yinvertdelta)
 		if tostart:
 			self.cmds.insert(0,p_cmd)
+			self._dtokens.insert(0, None)
+			self._dirtyFrom(0)
 		else:
 			self.cmds.append(p_cmd)
+			self._dtokens.append(None)
 		if isinstance(p_cmd, pClose) or refresh:
-			self.refresh()
+			self._updateD()
 		return self
 
 	def delCmd(self, p_idx: int):
-		del self.cmds[p_idx]
-		self.refresh()
+		idx = range(len(self.cmds))[p_idx]
+		del self.cmds[idx]
+		del self._dtokens[idx]
+		self._dirtyFrom(idx)
+		self._updateD()
 
 	def clear(self, refresh=True):
 		del self.cmds[:]
+		del self._dtokens[:]
+		self._dfirstdirty = 0
+		self._dtext = ""
+		self._dtextlen = 0
 		if refresh:
-			self.refresh()
+			self._updateD()
 
 	def insCmd(self, p_idx: int, p_cmd: path_command):
-		self.cmds.insert(p_idx, p_cmd)
-		self.refresh()
+		# same index normalization as list.insert
+		l = len(self.cmds)
+		idx = min(max(p_idx if p_idx >= 0 else l + p_idx, 0), l)
+		self.cmds.insert(idx, p_cmd)
+		self._dtokens.insert(idx, None)
+		self._dirtyFrom(idx)
+		self._updateD()
+
+	def addPathData(self, p_data: str, editable=False):
+		"""Appends commands parsed from SVG path data, as a single PathBuffer or, if editable, 
+			as path command objects"""
+		buf = parsePathData(p_data)
+		if len(buf) > 0:
+			if editable:
+				for cmd in buf.toCommands():
+					self.addCmd(cmd)
+			else:
+				self.addCmd(buf)
+		self._updateD()
+		return self
 
-	def addPolylinePList(self, p_list: List[Pt]):
+	def _cmdsAppended(self, p_from: int):
+		"Commands appended to self.cmds from p_from, to be encoded"
+		self._dtokens.extend([None] * (len(self.cmds) - len(self._dtokens)))
+		if p_from < self._dfirstdirty:
+			self._dfirstdirty = p_from
+
+	def addPolylinePList(self, p_list: List[Pt], simplify: Optional[str] = None, tolerance=1.0):
+		"""simplify: vertices dropped first, by 'dp' (Douglas-Peucker) or 'vw' (Visvalingam-Whyatt) 
+			simplification, tolerance in output pixels; count of dropped vertices left in removedvertices"""
+		if isinstance(p_list, (np.ndarray, memoryview)):
+			return self.addPolylineArray(p_list, simplify=simplify, tolerance=tolerance)
+		if not simplify is None:
+			keep = self._simplifyMask([(strictToNumber(pt.x), strictToNumber(pt.y)) for pt in p_list], simplify, tolerance).tolist()
+			p_list = [pt for pt, k in zip(p_list, keep) if k]
 		l = len(p_list)
+		ncmds = len(self.cmds)
 		new_list = []
 		for pi, pt in enumerate(p_list):
 			wkpt = [strictToNumber(pt.x), strictToNumber(pt.y)]
@@ -1076,7 +2320,87 @@ class AnalyticalPath(Path):
 						self.cmds.append(pL(removeDecsep(diffX), removeDecsep(diffY), relative=True))
 					else:
 						self.cmds.append(pL(*wkpt))
-		self.refresh()
+		self._cmdsAppended(ncmds)
+		self._updateD()
+
+	# addPolylineArray command kinds
+	_PLKINDS_LETTERS = ("M", "v", "h", "l", "L")
+
+	def addPolylineArray(self, p_coords, simplify: Optional[str] = None, tolerance=1.0):
+		"""Vectorized counterpart of addPolylinePList, taking an (N,2) float array
+			(or any buffer-protocol object holding x,y pairs).
+			Produces the same path data, appended as a single pEncoded run."""
+		pts = np.array(p_coords, dtype=np.float64).reshape(-1, 2)
+		if not simplify is None:
+			pts = pts[self._simplifyMask(pts, simplify, tolerance)]
+		l = len(pts)
+		if l > 0:
+			x = pts[:, 0]
+			y = pts[:, 1]
+			if not self._noyinvert and not self._yinvertdelta is None:
+				y = self._yinvertdelta - y
+
+			closes = l > 1 and x[0] - x[-1] == 0 and y[0] - y[-1] == 0
+			last = l - 1 if closes else l
+			wx = x[1:last]
+			wy = y[1:last]
+			diffx = wx - x[:last-1]
+			diffy = wy - y[:last-1]
+
+			skip = (diffx == 0) & (diffy == 0)
+			isv = (diffx == 0) & ~skip
+			ish = (diffy == 0) & ~skip & ~isv
+			isrel = ~(skip | isv | ish) & (np.abs(diffx) < np.abs(wx)) & (np.abs(diffy) < np.abs(wy))
+
+			# 0: M, 1: v, 2: h, 3: l, 4: L
+			kinds = np.full(len(wx), 4, dtype=np.int8)
+			kinds[isrel] = 3
+			kinds[ish] = 2
+			kinds[isv] = 1
+			firstvals = np.where(isv, diffy, np.where(kinds == 4, wx, diffx))
+			secondvals = np.where(kinds == 4, wy, diffy)
+
+			keep = ~skip
+			kinds = np.concatenate(([0], kinds[keep]))
+			firstvals = np.concatenate(([x[0]], firstvals[keep]))
+			secondvals = np.concatenate(([y[0]], secondvals[keep]))
+
+			prevkinds = np.concatenate(([-1], kinds[:-1]))
+			omit = ((kinds == prevkinds) & (kinds != 0)) | ((kinds == 4) & (prevkinds == 0))
+
+			n = len(kinds)
+			twovals = (kinds == 0) | (kinds >= 3)
+			numfmt = glFormatter() if self._numfmt is None else self._numfmt
+			firststrs = numfmt.fmtArray(firstvals)
+			secondstrs = np.full(n, '', dtype=object)
+			secondstrs[twovals] = numfmt.fmtArray(secondvals[twovals])
+
+			firstneg = np.fromiter((v.startswith('-') for v in firststrs), dtype=bool, count=n)
+			secondneg = np.fromiter((v.startswith('-') for v in secondstrs.tolist()), dtype=bool, count=n)
+
+			prefixes = np.array(self._PLKINDS_LETTERS, dtype=object)[kinds]
+			prefixes[omit & firstneg] = ''
+			prefixes[omit & ~firstneg] = ' '
+			seps = np.full(n, '', dtype=object)
+			seps[twovals & ~secondneg] = ' '
+
+			tokens = np.empty(4 * n, dtype=object)
+			tokens[0::4] = prefixes
+			tokens[1::4] = firststrs
+			tokens[2::4] = seps
+			tokens[3::4] = secondstrs
+			text = ''.join(tokens.tolist())
+
+			lastkind = kinds[-1]
+			if closes:
+				text = text + "z"
+				lastletter = "z"
+			else:
+				lastletter = self._PLKINDS_LETTERS[lastkind]
+
+			self.cmds.append(pEncoded(text, lastletter, lastrelative=bool(lastkind in (1, 2, 3))))
+			self._dtokens.append(None)
+		self._updateD()
 
 	def yinvert(self, p_height: Union[float, int]):
 		if not self._noyinvert:
@@ -1089,15 +2413,26 @@ class AnalyticalPath(Path):
 		self.refresh()
 
 class _pointsElement(MarkeableSVGElem):
+	__slots__ = ("initialpoint", "omitclosingpoint", "removedvertices")
 	def __init__(self, tag, *args, marker_props: Optional[MrkProps] = None) -> None:
 		super().__init__(tag, struct=Pl(*args), marker_props=marker_props)
 		self.initialpoint = None
 		self.omitclosingpoint = False
+		# vertices dropped by last simplification, see addPList
+		self.removedvertices = 0
 	def hasPoints(self):
 		return self.getStruct().hasPoints()
-	def addPList(self, p_list: List[Pt], mindelta=MINDELTA):
+	def addPList(self, p_list: List[Pt], mindelta=MINDELTA, simplify: Optional[str] = None, tolerance=1.0):
+		"""simplify: vertices dropped first, by 'dp' (Douglas-Peucker) or 'vw' (Visvalingam-Whyatt) 
+			simplification, tolerance in output pixels; count of dropped vertices left in removedvertices.
+			Polygons are simplified as rings, closing point kept or omitted as without simplification"""
+		if not simplify is None:
+			keep = self._simplifyMask([(strictToNumber(pt.x), strictToNumber(pt.y)) for pt in p_list], simplify, tolerance, 
+				ring=self.omitclosingpoint).tolist()
+			p_list = [pt for pt, k in zip(p_list, keep) if k]
 		l = len(p_list)
 		buf = []
+		fmt = (_POINTS_FORMATTER if self._numfmt is None else self._numfmt).fmt
 		for pi, pt in enumerate(p_list):
 			if pi == 0 and self.initialpoint is None: # first point
 				self.initialpoint = pt
@@ -1107,7 +2442,7 @@ class _pointsElement(MarkeableSVGElem):
 			wkpt = [strictToNumber(pt.x), strictToNumber(pt.y)]
 			if not self._noyinvert and not self._yinvertdelta is None:
 				wkpt[1] = self._yinvertdelta - wkpt[1]
-			buf.append("{0},{1}".format(*ptEnsureStrings(wkpt)))
+			buf.append(f"{fmt(wkpt[0])},{fmt(wkpt[1])}")
 		self.getStruct().setall(" ".join(buf))
 		self.updateStructAttrs()
 		return self
@@ -1119,10 +2454,12 @@ class _pointsElement(MarkeableSVGElem):
 
 
 class Polyline(_pointsElement):
+	__slots__ = ()
 	def __init__(self, *args, marker_props: Optional[MrkProps] = None) -> None:
 		super().__init__("polyline", *args, marker_props=marker_props)
 
 class Polygon(_pointsElement):
+	__slots__ = ()
 	def __init__(self, *args, marker_props: Optional[MrkProps] = None) -> None:
 		super().__init__("polygon", *args, marker_props=marker_props)
 		self.omitclosingpoint = True
@@ -1227,8 +2564,12 @@ class TextParagraph(Group):
 			self.tx.setStyle(Sty('fill', 'inherit', 'text-anchor', 'end'))
 		self._build()
 
-
-
-
-
-
+# Wrapper classes of loaded document elements, by tag (see SVGContent._wrapEl).
+# Classes constructed with no arguments, other tags are wrapped in GenericSVGElem.
+LOADED_ELEMENT_CLASSES = {
+	"g": Group, "defs": Defs, "symbol": Symbol, "use": Use, "desc": Desc,
+	"rect": Rect, "circle": Circle, "ellipse": Ellipse, "line": Line, "path": Path, 
+	"polyline": Polyline, "polygon": Polygon, "stop": GradientStop, "linearGradient": LinearGradient,
+	"radialGradient": RadialGradient, "text": Text, "tspan": TSpan, "textPath": TextPath, 
+	"image": Image, "pattern": Pattern
+}
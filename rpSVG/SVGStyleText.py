@@ -83,26 +83,72 @@ def toCSSRule(indict, outbuf, depth=-1):
 			outbuf.append('{0}{1}: {2};'.format(indent, k, indict[k]))
 
 class Sty(object):
+	"""Style properties, kept in insertion order, also readable and writable as attributes 
+		(getattr(sty, 'stroke-width')). Properties are listed and written in name order."""
+
+	__slots__ = ("_props", "_frozen")
 
 	def __init__(self, *args) -> None:
+		self._props = {}
+		# cached frozen view, see getFrozen
+		self._frozen = None
 		self.add(args)
 
+	def __getattr__(self, name):
+		# only called if normal lookup fails
+		if not name.startswith('_'):
+			props = self._props
+			if name in props:
+				return props[name]
+		raise AttributeError(name)
+
+	def __setattr__(self, name, value) -> None:
+		if name in STYLE_ATTRIBS:
+			self._props[name] = value
+			self._frozen = None
+		else:
+			object.__setattr__(self, name, value)
+
+	def __delattr__(self, name) -> None:
+		if name in STYLE_ATTRIBS:
+			try:
+				del self._props[name]
+			except KeyError:
+				raise AttributeError(name)
+			self._frozen = None
+		else:
+			object.__delattr__(self, name)
+
+	def getFrozen(self) -> tuple:
+		"Hashable view: (property, value string) pairs in name order"
+		ret = self._frozen
+		if ret is None:
+			ret = tuple(sorted([(k, str(v)) for k, v in self._props.items()]))
+			self._frozen = ret
+		return ret
+
 	def getStyleAttrs(self):
-		return [attr for attr in dir(self) if not attr.startswith('__') and attr in STYLE_ATTRIBS]
+		return [k for k, _v in self.getFrozen()]
 
-	def diffDict(self, o: object) -> dict:
+	def _diffProps(self, o: object) -> dict:
 		ret = {}
+		props = self._props
+		oprops = o._props
+		if props.keys() == oprops.keys():
+			for attr, a in props.items():
+				b = oprops[attr]
+				if a != b:
+					ret[attr] = (a, b)
+			# differences in name order
+			if len(ret) > 1:
+				ret = dict(sorted(ret.items()))
+		else:
+			ret = { "attrs": (self.getStyleAttrs(), o.getStyleAttrs())  }
+		return ret
+
+	def diffDict(self, o: object) -> dict:
 		if not hasattr(o, 'selector'):
-			attrs = self.getStyleAttrs()
-			oattrs = o.getStyleAttrs()
-			if set(attrs) == set(oattrs):
-				for attr in attrs:
-					a = getattr(self, attr)
-					b = getattr(o, attr)
-					if a != b:
-						ret[attr] = (a, b)
-			else:
-				ret = { "attrs": (attrs, oattrs)  }
+			ret = self._diffProps(o)
 		else:
 			ret = { "selector": (None, o.selector)  }
 		return ret
@@ -119,8 +165,8 @@ class Sty(object):
 			out = [prefix]
 		else:
 			out = []
-		for x in self.getStyleAttrs():
-			out.append(f"{x}={getattr(self, x)}")
+		for k, v in self.getFrozen():
+			out.append(f"{k}={v}")
 		return ' '.join(out)
 
 	def __repr__(self):
@@ -128,19 +174,22 @@ class Sty(object):
 
 	def add(self, *args):
 		alist = tuple(*args)
+		props = self._props
 		for ix, val in enumerate(zip(alist, alist[1:])):
 			if ix % 2 == 1:
 				continue
 			attrib, value = val
 			if attrib in STYLE_ATTRIBS:
-				setattr(self, attrib, str(value))
-		if not hasattr(self, 'fill'):
-			setattr(self, 'fill', 'none')
+				props[attrib] = str(value)
+		if not 'fill' in props:
+			props['fill'] = 'none'
+		self._frozen = None
 		return self
 
 	def set(self, attrib: str, value):
 		if attrib in STYLE_ATTRIBS:
-			setattr(self, attrib, str(value))
+			self._props[attrib] = str(value)
+			self._frozen = None
 
 	def addFromDict(self, in_dict):
 		ld = len(in_dict)
@@ -162,31 +211,36 @@ class Sty(object):
 				isec = set(usable_dict.keys()).intersection(STYLE_ATTRIBS)
 				if len (isec) > 0:
 					for sa in isec:
-						setattr(self, sa, usable_dict[sa])
+						self._props[sa] = usable_dict[sa]
+					self._frozen = None
 
 		return self
 
 	def toDict(self) -> dict:
-		ret = {}
-		for f in self.getStyleAttrs():
-			ret[f] = str(getattr(self, f))
-		return ret
+		return dict(self.getFrozen())
 
 	def setXmlAttrs(self, xmlel) -> None:  
-		for f in self.getStyleAttrs():
-			if hasattr(self, f):
-				xmlel.set(f, str(getattr(self, f)))
+		xset = xmlel.set
+		for k, v in self.getFrozen():
+			xset(k, v)
 		return self
 
 	def fromXmlAttrs(self, xmlel):
-		for attr in xmlel.keys():
-			if attr in STYLE_ATTRIBS:
-				setattr(self, attr, xmlel.get(attr))
+		props = self._props
+		changed = False
+		for attr, val in xmlel.items():
+			if attr in STYLE_ATTRIBS and props.get(attr) != val:
+				props[attr] = val
+				changed = True
+		if changed:
+			self._frozen = None
 		return self
 
 
 class CSSSty(Sty):
 
+	__slots__ = ("selector",)
+
 	def __init__(self, *args, selector) -> None:
 		if selector is None:
 			raise TypeError("CSSSty() needs keyword-only argument 'selector'")
@@ -203,16 +257,7 @@ class CSSSty(Sty):
 	def diffDict(self, o: object, exclude_selector: Optional[bool] = False) -> dict:
 		ret = {}
 		if exclude_selector or self.selector == o.selector:
-			attrs = self.getStyleAttrs()
-			oattrs = o.getStyleAttrs()
-			if set(attrs) == set(oattrs):
-				for attr in attrs:
-					a = getattr(self, attr)
-					b = getattr(o, attr)
-					if a != b:
-						ret[attr] = (a, b)
-			else:
-				ret = { "attrs": (attrs, oattrs)  }
+			ret = self._diffProps(o)
 		else:
 			ret = { "selector": (self.selector, o.selector)  }
 		return ret
@@ -245,7 +290,8 @@ class CSSSty(Sty):
 				isec = set(usable_dict.keys()).intersection(STYLE_ATTRIBS)
 				if len (isec) > 0:
 					for sa in isec:
-						setattr(self, sa, usable_dict[sa])
+						self._props[sa] = usable_dict[sa]
+					self._frozen = None
 
 		return self
 
@@ -256,11 +302,10 @@ class CSSSty(Sty):
 		return self
 
 	def toCSSRule(self, outbuf, depth=-1):
-		attrs = self.getStyleAttrs()
 		if self.selector is None:
-			the_dict = {attr: getattr(self, attr) for attr in attrs}
+			the_dict = self.toDict()
 		else:
-			the_dict = {self.selector: {attr: getattr(self, attr) for attr in attrs}}
+			the_dict = {self.selector: self.toDict()}
 		toCSSRule(the_dict, outbuf,  depth=-1)
 		return self
 
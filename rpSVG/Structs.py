@@ -3,11 +3,12 @@ from typing import Optional, Union
 from math import atan, degrees
 from re import split as re_split
 
-from rpSVG.Basics import MINDELTA, Pt, Env, XLINK_NAMESPACE, _attrs_struct, _withunits_struct, _kwarg_attrs_struct, glRd, hashed_href, isNumeric, removeDecsep, strictToNumber, toNumberAndUnit
+from rpSVG.Basics import MINDELTA, Pt, Env, XLINK_NAMESPACE, NumFormatter, _attrs_struct, _slotNames, _withunits_struct, _kwarg_attrs_struct, glRd, hashed_href, isNumeric, toNumberAndUnit, typedValue
 
 
 class Re(_withunits_struct):
 	_fields = ("x",  "y", "width", "height") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args, defaults=["0"]) -> None:
 		if len(args) == 1 and isinstance(args[0], list):
 			super().__init__(*args[0], defaults=defaults)
@@ -22,16 +23,20 @@ class Re(_withunits_struct):
 		self.setUnits('%')
 		return self
 	def getValues(self):
-		return [glRd(x[0]) for x in [toNumberAndUnit(v) for v in self.getall()]]
+		return [glRd(self.getNumAndUnit(f)[0]) for f in self._fields]
 	def isEmpty(self):
-		return [x[0] for x in [toNumberAndUnit(v) for v in self.getall()]] == [0,0,0,0]
+		return [self.getNumAndUnit(f)[0] for f in self._fields] == [0,0,0,0]
 	def yinvert(self, p_contentheight: Union[float, int]):
-		h = strictToNumber(self.height)
-		self.y = p_contentheight - strictToNumber(self.y) - h
+		h = self.getNumber("height")
+		self.y = p_contentheight - self.getNumber("y") - h
 		return self
 
+# no rounding, same as str(removeDecsep(v))
+_VBOX_FORMATTER = NumFormatter()
+
 class VBox(_attrs_struct):
 	_fields = ("viewBox",)
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		rect = None
 		if len(args) == 1 and isinstance(args[0], list):
@@ -45,10 +50,16 @@ class VBox(_attrs_struct):
 			super().__init__(*args)
 	def cloneFromRect(self, p_rect: Re, scale: Optional[float] = None):
 		if not scale is None:
-			cont = " ".join([str(removeDecsep(round(float(at)) * scale)) for at in p_rect.iterUnitsRemoved()])
+			cont = " ".join([_VBOX_FORMATTER.fmt(round(float(at)) * scale) for at in p_rect.iterUnitsRemoved()])
 		else:
 			cont = " ".join(list(p_rect.iterUnitsRemoved()))
 		setattr(self, 'viewBox', cont)
+	def setXmlAttrs(self, xmlel, numfmt: Optional[NumFormatter] = None) -> None:
+		if numfmt is None or not hasattr(self, 'viewBox'):
+			return super().setXmlAttrs(xmlel)
+		val = getattr(self, 'viewBox')
+		xmlel.set('viewBox', " ".join([numfmt.fmtValue(typedValue(v)) for v in re_split(r"[\s]+", val)]))
+		return self
 	def getValues(self):
 		ret = []
 		val = getattr(self, 'viewBox')
@@ -59,15 +70,18 @@ class VBox(_attrs_struct):
 		return [x[0] for x in [toNumberAndUnit(v) for v in self.getValues()]] == [0,0,0,0]
 
 class VBox600x800(VBox):
+	__slots__ = ()
 	def __init__(self) -> None:
 		super().__init__(0, 0, 600, 800)
 
 class VBox1280x1024(VBox):
+	__slots__ = ()
 	def __init__(self) -> None:
 		super().__init__(0, 0, 1280, 1024)
 
 class ReRC(Re):
 	_fields = ("x",  "y", "width", "height", "rx", "ry") 
+	__slots__ = _slotNames(("rx", "ry"))
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=None)
 	def setRCRadiuses(self, rx, ry=None):
@@ -79,22 +93,25 @@ class ReRC(Re):
 
 class Cir(_withunits_struct):
 	_fields = ("cx",  "cy", "r") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=["0"])
 	def yinvert(self, p_contentheight: Union[float, int]):
-		self.cy = p_contentheight - strictToNumber(self.cy)
+		self.cy = p_contentheight - self.getNumber("cy")
 		return self
 
 class Elli(_withunits_struct):
 	_fields = ("cx",  "cy", "rx", "ry") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=["0"])
 	def yinvert(self, p_contentheight: Union[float, int]):
-		self.cy = p_contentheight - strictToNumber(self.cy)
+		self.cy = p_contentheight - self.getNumber("cy")
 		return self
 
 class Li(_withunits_struct):
 	_fields = ("x1",  "y1", "x2", "y2") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l =  len(args)
 		if l == 2 and isinstance(args[0], Pt) and isinstance(args[1], Pt):
@@ -104,8 +121,8 @@ class Li(_withunits_struct):
 		super().__init__(*argslist, defaults=["0"])
 	def getAngle(self):
 		ret = None
-		dx = strictToNumber(getattr(self, "x2")) - strictToNumber(getattr(self, "x1"))
-		dy = strictToNumber(getattr(self, "y2")) - strictToNumber(getattr(self, "y1"))
+		dx = self.getNumber("x2") - self.getNumber("x1")
+		dy = self.getNumber("y2") - self.getNumber("y1")
 		if dx < MINDELTA:
 			if dy > MINDELTA:
 				ret = 90
@@ -115,12 +132,13 @@ class Li(_withunits_struct):
 			ret = degrees(atan(dy/dx))
 		return ret
 	def yinvert(self, p_contentheight: Union[float, int]):
-		self.y1 = p_contentheight - strictToNumber(self.y1)
-		self.y2 = p_contentheight - strictToNumber(self.y2)
+		self.y1 = p_contentheight - self.getNumber("y1")
+		self.y2 = p_contentheight - self.getNumber("y2")
 		return self
 
 class Us(_withunits_struct):
 	_fields = ("x",  "y", "width", "height", f"{{{XLINK_NAMESPACE}}}href") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l =  len(args)
 		argslist = []
@@ -147,12 +165,13 @@ class Us(_withunits_struct):
 		super().__init__(*argslist, defaults=None)
 	def yinvert(self, p_contentheight: Union[float, int]):
 		if hasattr(self, 'y'):
-			prevval = strictToNumber(self.y)
+			prevval = self.getNumber("y")
 			self.y = p_contentheight - prevval
 		return self
 
 class Pth(_withunits_struct):
 	_fields = ("d") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=None)
 	def hasPoints(self) -> bool:
@@ -164,6 +183,7 @@ class Pth(_withunits_struct):
 
 class Pl(_withunits_struct):
 	_fields = ("points",) 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=None)
 	def hasPoints(self) -> bool:
@@ -176,6 +196,7 @@ class Pl(_withunits_struct):
 
 class Mrk(_withunits_struct):
 	_fields = ("refX", "refY", "markerWidth", "markerHeight", "orient", "markerUnits") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l = len(args)
 		assert l >= 4, f"Mrk needs at least 4 arguments, {l} given"
@@ -193,11 +214,13 @@ class MrkProps(_kwarg_attrs_struct):
 
 class GraSt(_attrs_struct):
 	_fields = ("offset", "stop-color", "stop-opacity") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		super().__init__(*args, defaults=None)
 
 class LiGra(_withunits_struct):
 	_fields = ("x1",  "y1", "x2", "y2", f"{{{XLINK_NAMESPACE}}}href", "gradientUnits", "spreadMethod", "gradientTransform") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l =  len(args)
 		if l >= 2 and isinstance(args[0], Pt) and isinstance(args[1], Pt):
@@ -212,12 +235,13 @@ class LiGra(_withunits_struct):
 			assert argslist[6] in ("pad", "reflect", "repeat")
 		super().__init__(*argslist)
 	def yinvert(self, p_contentheight: Union[float, int]):
-		self.y1 = p_contentheight - strictToNumber(self.y1)
-		self.y2 = p_contentheight - strictToNumber(self.y2)
+		self.y1 = p_contentheight - self.getNumber("y1")
+		self.y2 = p_contentheight - self.getNumber("y2")
 		return self
 
 class RaGra(_withunits_struct):
 	_fields = ("cx",  "cy", "r", "fx", "fy", f"{{{XLINK_NAMESPACE}}}href", "gradientUnits", "spreadMethod", "gradientTransform") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		#argslist = list(args)
 		l =  len(args)
@@ -227,12 +251,13 @@ class RaGra(_withunits_struct):
 			assert args[7] in ("pad", "reflect", "repeat")
 		super().__init__(*args)
 	def yinvert(self, p_contentheight: Union[float, int]):
-		self.cy = p_contentheight - strictToNumber(self.cy)
-		self.fy = p_contentheight - strictToNumber(self.fy)
+		self.cy = p_contentheight - self.getNumber("cy")
+		self.fy = p_contentheight - self.getNumber("fy")
 		return self
 
 class Tx(_withunits_struct):
 	_fields = ("x",  "y", "dx", "dy", "rotate", "textLength", "lengthAdjust") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l =  len(args)
 		if l > 6:
@@ -240,9 +265,9 @@ class Tx(_withunits_struct):
 		super().__init__(*args)
 	def yinvert(self, p_contentheight: Union[float, int]):
 		if hasattr(self, "y"):
-			self.y = p_contentheight - strictToNumber(self.y)
+			self.y = p_contentheight - self.getNumber("y")
 		if hasattr(self, "dy"):
-			dyv, _u = toNumberAndUnit(self.dy)
+			dyv, _u = self.getNumAndUnit("dy")
 			if dyv > 0:
 				self.dy =  "-" + str(self.dy)
 			else:
@@ -251,11 +276,13 @@ class Tx(_withunits_struct):
 
 class TxRf(_attrs_struct):
 	_fields = (f"{{{XLINK_NAMESPACE}}}href",) 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, p_text: str) -> None:
 		super().__init__(hashed_href(p_text))
 
 class TxPth(_withunits_struct):
 	_fields = (f"{{{XLINK_NAMESPACE}}}href", "startOffset",  "method", "spacing") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		argslist = list(args)
 		l =  len(argslist)
@@ -269,6 +296,7 @@ class TxPth(_withunits_struct):
 
 class Img(_withunits_struct):
 	_fields = ("x",  "y", "width", "height", f"{{{XLINK_NAMESPACE}}}href", "preserveAspectRatio") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l =  len(args)
 		argslist = None
@@ -284,12 +312,13 @@ class Img(_withunits_struct):
 			argslist = args
 		super().__init__(*argslist, defaults=None)
 	def yinvert(self, p_contentheight: Union[float, int]):
-		h = strictToNumber(self.height)
-		self.y = p_contentheight - strictToNumber(self.y) - h
+		h = self.getNumber("height")
+		self.y = p_contentheight - self.getNumber("y") - h
 		return self
 
 class Patt(_withunits_struct):
 	_fields = ("x",  "y", "width", "height", "patternUnits", "patternTransform", f"{{{XLINK_NAMESPACE}}}href", "patternContentUnits", "preserveAspectRatio") 
+	__slots__ = _slotNames(_fields)
 	def __init__(self, *args) -> None:
 		l =  len(args)
 		argslist = list(args)
@@ -304,12 +333,13 @@ class Patt(_withunits_struct):
 				argslist[6] = hashed_href(argslist[6])
 		super().__init__(*argslist, defaults=None)
 	def yinvert(self, p_contentheight: Union[float, int]):
-		h = strictToNumber(self.height)
-		self.y = p_contentheight - strictToNumber(self.y) - h
+		h = self.getNumber("height")
+		self.y = p_contentheight - self.getNumber("y") - h
 		return self
 
 class Symb(VBox):
 	_fields = ("viewBox", "preserveAspectRatio")
+	__slots__ = _slotNames(("preserveAspectRatio",))
 	def __init__(self, *viewboxargs, preserveAspectRatio=None) -> None:
 		super().__init__(*viewboxargs)
 		if not preserveAspectRatio is None:
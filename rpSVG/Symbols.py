@@ -1,12 +1,79 @@
 
 from rpSVG.Structs import Re, VBox
 from rpSVG.SVGStyleText import Sty
-from typing import Optional, Union
+from typing import Callable, Hashable, Optional, Union
+from collections import OrderedDict
+from copy import copy
 from math import cos, radians, sin, sqrt, pow
 
-from rpSVG.Basics import Pt, Trans, calc3rdPointInLine, circleDividers, glRd, pA, pClose, pL, pM, polar2rectDegs, ptAdd, ptRemoveDecsep, removeDecsep, strictToNumber, toNumberAndUnit
+from rpSVG.Basics import GLOBAL_ENV, Pt, Trans, calc3rdPointInLine, circleDividersArray, glRd, pA, pClose, pL, pM, polar2rectDegs, ptAdd, ptRemoveDecsep, removeDecsep, strictToNumber, toNumberAndUnit
 from rpSVG.SVGLib import AnalyticalPath, Desc, Rect, Symbol
 
+class SymbolGeometryCache(object):
+	"""Process-wide cache of built symbol geometry (path commands and derived values),
+		keyed by symbol class, parameters and current rounding. Cached commands are
+		prototypes, copies are added to each path. 'lru' or 'fifo' eviction, maxsize 0
+		disables caching, None for no size limit."""
+
+	POLICIES = ('lru', 'fifo')
+
+	def __init__(self, maxsize: Optional[int] = 1024, policy: str = 'lru') -> None:
+		self._entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.setSize(maxsize, policy=policy)
+
+	def setSize(self, maxsize: Optional[int], policy: Optional[str] = None):
+		assert maxsize is None or maxsize >= 0
+		if not policy is None:
+			assert policy in self.POLICIES, policy
+			self.policy = policy
+		self.maxsize = maxsize
+		self._evict()
+		return self
+
+	def _evict(self):
+		if not self.maxsize is None:
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+
+	def get(self, p_key: Hashable, p_builder: Callable):
+		"Cached value for p_key under current rounding, p_builder() result stored on miss"
+		rnd = GLOBAL_ENV["ROUND"]
+		key = (p_key, rnd["flag"], rnd["places"])
+		ret = self._entries.get(key)
+		if ret is None:
+			self.misses += 1
+			ret = p_builder()
+			if self.maxsize != 0:
+				self._entries[key] = ret
+				self._evict()
+		else:
+			self.hits += 1
+			if self.policy == 'lru':
+				self._entries.move_to_end(key)
+		return ret
+
+	def clear(self, counters=True):
+		self._entries.clear()
+		if counters:
+			self.hits = 0
+			self.misses = 0
+
+	def __len__(self):
+		return len(self._entries)
+
+	def stats(self) -> dict:
+		return { "hits": self.hits, "misses": self.misses, "size": len(self._entries), 
+			"maxsize": self.maxsize, "policy": self.policy }
+
+SYMBOL_GEOMETRY_CACHE = SymbolGeometryCache()
+
+def addCachedCmds(p_analytic_path, p_cmds):
+	"Adds copies of cached prototype commands, as addCmd may change them (y inversion)"
+	for cmd in p_cmds:
+		p_analytic_path.addCmd(copy(cmd))
+
 class Diamond(AnalyticalPath):
 
 	def __init__(self, width=0, height=0, x=0, y=0, handle='cc') -> None:			
@@ -221,12 +288,7 @@ class Asterisk(AnalyticalPath):
 	def getComment(self):
 		return f"Asterisk symbol, width:{self.radius} separation:{self.separation}"
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return False
-
+	def _buildGeometry(self):
 		step = 30
 		def nextangle(p_ang, halve=False):
 			seed = 0
@@ -237,16 +299,26 @@ class Asterisk(AnalyticalPath):
 			for i in range(round(steps)):
 				yield seed + i * p_ang
 
+		cmds = []
 		if self.separation is None:
 			for ang in nextangle(step, halve=True):
 				p1 = ptRemoveDecsep(*polar2rectDegs(ang, self.radius))
 				p2 = Pt(-p1.x, -p1.y)
-				self.addCmd(pM(*p1)).addCmd(pL(*p2))
+				cmds.extend((pM(*p1), pL(*p2)))
 		else:
 			for ang in nextangle(step):
 				p1 = ptRemoveDecsep(*polar2rectDegs(ang, self.radius))
 				p2 = ptRemoveDecsep(*polar2rectDegs(ang, self.separation))
-				self.addCmd(pM(*p1)).addCmd(pL(*p2))
+				cmds.extend((pM(*p1), pL(*p2)))
+		return tuple(cmds)
+
+	def onAfterParentAdding(self, defselement=None):	
+		if not self._parentadded:
+			self._parentadded = True
+		else:
+		 	return False
+
+		addCachedCmds(self, SYMBOL_GEOMETRY_CACHE.get((Asterisk, self.radius, self.separation), self._buildGeometry))
 		self.refresh()
 
 		return True
@@ -283,11 +355,8 @@ class Arrow(AnalyticalPath):
 	def changeFillRule(self, filled=True):
 		self._rhr = filled
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return False
+	def _buildGeometry(self):
+		cmds = []
 		length, basewidth, headwidth, headlength, handle = self.dims
 		baselength = length - headlength
 		mw = basewidth / 2
@@ -296,42 +365,52 @@ class Arrow(AnalyticalPath):
 		hhmw = (headwidth-basewidth) / 2
 		if handle == 'cb':
 			if self._rhr:
-				self.addCmd(pM(0,-length))
-				self.addCmd(pL(-hmw,headlength, relative=True))
-				self.addCmd(pL(hhmw,0, relative=True))
-				self.addCmd(pL(0,baselength, relative=True))
-				self.addCmd(pL(basewidth,0, relative=True))
-				self.addCmd(pL(0,-baselength, relative=True))
-				self.addCmd(pL(hhmw,0, relative=True))
-				self.addCmd(pClose())
+				cmds.append(pM(0,-length))
+				cmds.append(pL(-hmw,headlength, relative=True))
+				cmds.append(pL(hhmw,0, relative=True))
+				cmds.append(pL(0,baselength, relative=True))
+				cmds.append(pL(basewidth,0, relative=True))
+				cmds.append(pL(0,-baselength, relative=True))
+				cmds.append(pL(hhmw,0, relative=True))
+				cmds.append(pClose())
 			else: # Filled = False	
-				self.addCmd(pM(0,-length))
-				self.addCmd(pL(hmw,headlength, relative=True))
-				self.addCmd(pL(-hhmw,0, relative=True))
-				self.addCmd(pL(0,baselength, relative=True))
-				self.addCmd(pL(-basewidth,0, relative=True))
-				self.addCmd(pL(0,-baselength, relative=True))
-				self.addCmd(pL(-hhmw,0, relative=True))
-				self.addCmd(pClose())
+				cmds.append(pM(0,-length))
+				cmds.append(pL(hmw,headlength, relative=True))
+				cmds.append(pL(-hhmw,0, relative=True))
+				cmds.append(pL(0,baselength, relative=True))
+				cmds.append(pL(-basewidth,0, relative=True))
+				cmds.append(pL(0,-baselength, relative=True))
+				cmds.append(pL(-hhmw,0, relative=True))
+				cmds.append(pClose())
 		elif handle == 'cc':
 			if self._rhr:
-				self.addCmd(pM(0,-ml))
-				self.addCmd(pL(-hmw,headlength, relative=True))
-				self.addCmd(pL(hhmw,0, relative=True))
-				self.addCmd(pL(0,baselength, relative=True))
-				self.addCmd(pL(basewidth,0, relative=True))
-				self.addCmd(pL(0, -baselength, relative=True))
-				self.addCmd(pL(hhmw,0, relative=True))
-				self.addCmd(pClose())
+				cmds.append(pM(0,-ml))
+				cmds.append(pL(-hmw,headlength, relative=True))
+				cmds.append(pL(hhmw,0, relative=True))
+				cmds.append(pL(0,baselength, relative=True))
+				cmds.append(pL(basewidth,0, relative=True))
+				cmds.append(pL(0, -baselength, relative=True))
+				cmds.append(pL(hhmw,0, relative=True))
+				cmds.append(pClose())
 			else: # Filled = False				
-				self.addCmd(pM(0,-ml))
-				self.addCmd(pL(hmw,headlength, relative=True))
-				self.addCmd(pL(-hhmw,0, relative=True))
-				self.addCmd(pL(mw,ml))
-				self.addCmd(pL(-basewidth,0, relative=True))
-				self.addCmd(pL(0,-baselength, relative=True))
-				self.addCmd(pL(-hhmw,0, relative=True))
-				self.addCmd(pClose())
+				cmds.append(pM(0,-ml))
+				cmds.append(pL(hmw,headlength, relative=True))
+				cmds.append(pL(-hhmw,0, relative=True))
+				cmds.append(pL(mw,ml))
+				cmds.append(pL(-basewidth,0, relative=True))
+				cmds.append(pL(0,-baselength, relative=True))
+				cmds.append(pL(-hhmw,0, relative=True))
+				cmds.append(pClose())
+
+		return tuple(cmds)
+
+	def onAfterParentAdding(self, defselement=None):	
+		if not self._parentadded:
+			self._parentadded = True
+		else:
+		 	return False
+
+		addCachedCmds(self, SYMBOL_GEOMETRY_CACHE.get((Arrow, self.dims, self._rhr), self._buildGeometry))
 
 		return True
 
@@ -391,11 +470,8 @@ class Wedge(AnalyticalPath):
 	def changeFillRule(self, filled=True):
 		self._rhr = filled
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return -1
+	def _buildGeometry(self):
+		cmds = []
 		w = strictToNumber(self.dims[0])
 		h = strictToNumber(self.dims[1])
 		i = strictToNumber(self.dims[2])
@@ -409,22 +485,33 @@ class Wedge(AnalyticalPath):
 
 		pt = Pt(0,-R)
 
-		self.addCmd(pM(*pt))
+		cmds.append(pM(*pt))
 		if self._rhr:
-			self.addCmd(pL(-mw,h, relative=True))
+			cmds.append(pL(-mw,h, relative=True))
 			if i != 0:
-				self.addCmd(pL(mw,-i, relative=True))
-				self.addCmd(pL(mw,i, relative=True))
+				cmds.append(pL(mw,-i, relative=True))
+				cmds.append(pL(mw,i, relative=True))
 			else:
-				self.addCmd(pL(w,0, relative=True))
+				cmds.append(pL(w,0, relative=True))
 		else:
-			self.addCmd(pL(mw,h, relative=True))
+			cmds.append(pL(mw,h, relative=True))
 			if i != 0:
-				self.addCmd(pL(-mw,-i, relative=True))
-				self.addCmd(pL(-mw,i, relative=True))
+				cmds.append(pL(-mw,-i, relative=True))
+				cmds.append(pL(-mw,i, relative=True))
 			else:
-				self.addCmd(pL(-w,0, relative=True))
-		self.addCmd(pClose())
+				cmds.append(pL(-w,0, relative=True))
+		cmds.append(pClose())
+
+		return tuple(cmds), R
+
+	def onAfterParentAdding(self, defselement=None):	
+		if not self._parentadded:
+			self._parentadded = True
+		else:
+		 	return -1
+
+		cmds, R = SYMBOL_GEOMETRY_CACHE.get((Wedge, self.dims, self._rhr), self._buildGeometry)
+		addCachedCmds(self, cmds)
 
 		return R
 
@@ -448,15 +535,9 @@ class CircWedge(Wedge):
 		self.addCmd(pA(rad, rad, 0, 1, 0, -rad, 0))
 		self.refresh()
 
-class Crescent(Symbol):
-
-	def __init__(self, p_radius) -> None:
-
-		super().__init__()
-		self.radius = strictToNumber(p_radius)
-
-	def getComment(self):		
-		return f"Crescent, radius:{self.radius}"
+class _FilledOutlinedSymbol(Symbol):
+	"""Symbol drawn as a filled path and an unfilled one, _buildGeometry returning both paths 
+		commands and the viewbox dimensions, cached by class and radius"""
 
 	def onAfterParentAdding(self, defselement=None):	
 		if not self._parentadded:
@@ -464,25 +545,47 @@ class Crescent(Symbol):
 		else:
 		 	return
 
+		cmds, cmds2, dims = SYMBOL_GEOMETRY_CACHE.get((type(self), self.radius), self._buildGeometry)
+
 		self.addChild(Desc().setText(self.getComment()))
 		ap = self.addChild(AnalyticalPath())
+		addCachedCmds(ap, cmds)
+		ap.refresh()
+
+		ap2 = self.addChild(AnalyticalPath().setStyle(Sty('fill', 'none')))
+		addCachedCmds(ap2, cmds2)
+		ap2.refresh()
+
+		self.setViewbox(VBox(*dims))
+		self.use_dims = dims
+
+class Crescent(_FilledOutlinedSymbol):
+
+	def __init__(self, p_radius) -> None:
+
+		super().__init__()
+		self.radius = strictToNumber(p_radius)
+
+	def getComment(self):		
+		return f"Crescent, radius:{self.radius}"
+
+	def _buildGeometry(self):
+		cmds = []
 		
 		ang = 92
 		rad2 = self.radius+4
 		p1 = polar2rectDegs(ang, self.radius)
 		p2 = polar2rectDegs(-ang, self.radius)
 
-		ap.addCmd(pM(*p1))
-		ap.addCmd(pA(self.radius, self.radius, 0, 1, 0, *p2))
-		ap.addCmd(pM(*p2))
-		ap.addCmd(pA(rad2, rad2, 0, 0, 1, *p1))
-		ap.refresh()
+		cmds.append(pM(*p1))
+		cmds.append(pA(self.radius, self.radius, 0, 1, 0, *p2))
+		cmds.append(pM(*p2))
+		cmds.append(pA(rad2, rad2, 0, 0, 1, *p1))
 
-		ap2 = self.addChild(AnalyticalPath().setStyle(Sty('fill', 'none')))
+		cmds2 = []
 
-		ap2.addCmd(pM(*p1))
-		ap2.addCmd(pA(self.radius, self.radius, 0, 0, 1, *p2))
-		ap2.refresh()
+		cmds2.append(pM(*p1))
+		cmds2.append(pA(self.radius, self.radius, 0, 0, 1, *p2))
 
 		offset = 2
 		minx = -self.radius-offset
@@ -491,13 +594,12 @@ class Crescent(Symbol):
 		miny = minx
 		hei = wid
 
-		self.setViewbox(VBox(minx, miny, wid, hei))
-		self.use_dims = (minx, miny, wid, hei)
+		return tuple(cmds), tuple(cmds2), (minx, miny, wid, hei)
 
 	def yinvert(self, p_height: Union[float, int]):
 		self._yinverting = True
 
-class SuspPointCirc(Symbol):
+class SuspPointCirc(_FilledOutlinedSymbol):
 
 	def __init__(self, p_radius) -> None:
 		
@@ -511,36 +613,29 @@ class SuspPointCirc(Symbol):
 	def getComment(self):		
 		return f"SuspPointCirc, radius:{self.radius}"
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return
-
-		self.addChild(Desc().setText(self.getComment()))
-		ap = self.addChild(AnalyticalPath())
+	def _buildGeometry(self):
+		cmds = []
 		
 		p1 = polar2rectDegs(0, self.radius)
 		p2 = polar2rectDegs(270, self.radius)
-		ap.addCmd(pM(*p1))
-		ap.addCmd(pA(self.radius, self.radius, 0, 0, 0, *p2))
-		ap.addCmd(pL(0,0))
-		ap.addCmd(pClose())
+		cmds.append(pM(*p1))
+		cmds.append(pA(self.radius, self.radius, 0, 0, 0, *p2))
+		cmds.append(pL(0,0))
+		cmds.append(pClose())
 		
 		p3 = polar2rectDegs(180, self.radius)
 		p4 = polar2rectDegs(90, self.radius)
-		ap.addCmd(pM(*p3))
-		ap.addCmd(pA(self.radius, self.radius, 0, 0, 0, *p4))
-		ap.addCmd(pL(0,0))
-		ap.addCmd(pClose())
+		cmds.append(pM(*p3))
+		cmds.append(pA(self.radius, self.radius, 0, 0, 0, *p4))
+		cmds.append(pL(0,0))
+		cmds.append(pClose())
 		
-		ap2 = self.addChild(AnalyticalPath().setStyle(Sty('fill', 'none')))		
-		ap2.addCmd(pM(*p3))
-		ap2.addCmd(pA(self.radius, self.radius, 0, 0, 1, *p2))
+		cmds2 = []		
+		cmds2.append(pM(*p3))
+		cmds2.append(pA(self.radius, self.radius, 0, 0, 1, *p2))
 
-		ap2.addCmd(pM(*p1))
-		ap2.addCmd(pA(self.radius, self.radius, 0, 0, 1, *p4))
-		ap2.refresh()
+		cmds2.append(pM(*p1))
+		cmds2.append(pA(self.radius, self.radius, 0, 0, 1, *p4))
 
 		offset = 2
 		minx = p3.x-offset
@@ -550,13 +645,12 @@ class SuspPointCirc(Symbol):
 		maxy = p4.y+offset
 		hei = maxy-miny
 
-		self.setViewbox(VBox(minx, miny, wid, hei))
-		self.use_dims = (minx, miny, wid, hei)
+		return tuple(cmds), tuple(cmds2), (minx, miny, wid, hei)
 
 	def yinvert(self, p_height: Union[float, int]):
 		self._yinverting = True
 
-class SuspPointSquare(Symbol):
+class SuspPointSquare(_FilledOutlinedSymbol):
 
 	def __init__(self, p_radius) -> None:
 		
@@ -570,39 +664,32 @@ class SuspPointSquare(Symbol):
 	def getComment(self):		
 		return f"SuspPointSquare, radius:{self.radius}"
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return
-
-		self.addChild(Desc().setText(self.getComment()))
-		ap = self.addChild(AnalyticalPath())
+	def _buildGeometry(self):
+		cmds = []
 		
 		p1 = polar2rectDegs(-45, self.radius)
-		ap.addCmd(pM(*p1))
-		ap.addCmd(pL(-p1.x, 0, relative=True))
-		ap.addCmd(pL(0, 0))
-		ap.addCmd(pL(p1.x, 0))
-		ap.addCmd(pClose())
+		cmds.append(pM(*p1))
+		cmds.append(pL(-p1.x, 0, relative=True))
+		cmds.append(pL(0, 0))
+		cmds.append(pL(p1.x, 0))
+		cmds.append(pClose())
 		
 		p2 = polar2rectDegs(135, self.radius)
-		ap.addCmd(pM(*p2))
-		ap.addCmd(pL(-p2.x, 0, relative=True))
-		ap.addCmd(pL(0, 0))
-		ap.addCmd(pL(p2.x, 0))
-		ap.addCmd(pClose())
+		cmds.append(pM(*p2))
+		cmds.append(pL(-p2.x, 0, relative=True))
+		cmds.append(pL(0, 0))
+		cmds.append(pL(p2.x, 0))
+		cmds.append(pClose())
 
-		ap2 = self.addChild(AnalyticalPath().setStyle(Sty('fill', 'none')))
+		cmds2 = []
 		
-		ap2.addCmd(pM(*p2))
-		ap2.addCmd(pL(p2.x, p1.y))
-		ap2.addCmd(pL(0, p1.y))
+		cmds2.append(pM(*p2))
+		cmds2.append(pL(p2.x, p1.y))
+		cmds2.append(pL(0, p1.y))
 
-		ap2.addCmd(pM(0, p2.y))
-		ap2.addCmd(pL(p1.x, p2.y))
-		ap2.addCmd(pL(p1.x, 0))
-		ap2.refresh()
+		cmds2.append(pM(0, p2.y))
+		cmds2.append(pL(p1.x, p2.y))
+		cmds2.append(pL(p1.x, 0))
 
 		offset = 2
 		minx = p2.x-offset
@@ -612,13 +699,12 @@ class SuspPointSquare(Symbol):
 		maxy = p2.y+offset
 		hei = maxy-miny
 
-		self.setViewbox(VBox(minx, miny, wid, hei))
-		self.use_dims = (minx, miny, wid, hei)
+		return tuple(cmds), tuple(cmds2), (minx, miny, wid, hei)
 
 	def yinvert(self, p_height: Union[float, int]):
 		self._yinverting = True
 
-class SuspPointTriang(Symbol):
+class SuspPointTriang(_FilledOutlinedSymbol):
 
 	def __init__(self, p_radius) -> None:
 		
@@ -633,13 +719,7 @@ class SuspPointTriang(Symbol):
 	def getComment(self):		
 		return f"SuspPointTriang, radius:{self.radius}"
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return
-
-		self.addChild(Desc().setText(self.getComment()))
+	def _buildGeometry(self):
 
 		pt = polar2rectDegs(270, self.radius)
 		pl = polar2rectDegs(150, self.radius)
@@ -651,28 +731,27 @@ class SuspPointTriang(Symbol):
 		rat = mb / h 
 		l0 = pt.y * rat 
 
-		ap = self.addChild(AnalyticalPath())
+		cmds = []
 		
-		ap.addCmd(pM(*pl))
-		ap.addCmd(pL(-pl.x, 0, relative=True))
-		ap.addCmd(pL(0, 0))
-		ap.addCmd(pL(l0, 0))
-		ap.addCmd(pClose())
-
-		ap.addCmd(pM(0,0))
-		ap.addCmd(pL(-l0,0))
-		ap.addCmd(pL(*pt))
-		ap.addCmd(pClose())
-
-		ap2 = self.addChild(AnalyticalPath().setStyle(Sty('fill', 'none')))
+		cmds.append(pM(*pl))
+		cmds.append(pL(-pl.x, 0, relative=True))
+		cmds.append(pL(0, 0))
+		cmds.append(pL(l0, 0))
+		cmds.append(pClose())
+
+		cmds.append(pM(0,0))
+		cmds.append(pL(-l0,0))
+		cmds.append(pL(*pt))
+		cmds.append(pClose())
+
+		cmds2 = []
 		
-		ap2.addCmd(pM(0,pl.y))
-		ap2.addCmd(pL(*pr))
-		ap2.addCmd(pL(-l0,0)) 
+		cmds2.append(pM(0,pl.y))
+		cmds2.append(pL(*pr))
+		cmds2.append(pL(-l0,0)) 
 
-		ap2.addCmd(pM(*pt))
-		ap2.addCmd(pL(l0,0)) 
-		ap2.refresh()
+		cmds2.append(pM(*pt))
+		cmds2.append(pL(l0,0)) 
 
 		offset = 1
 		minx = pl.x-offset
@@ -682,8 +761,7 @@ class SuspPointTriang(Symbol):
 		maxy = pl.y + offset
 		hei = maxy-miny
 
-		self.setViewbox(VBox(minx, miny, wid, hei))
-		self.use_dims = (minx, miny, wid, hei)
+		return tuple(cmds), tuple(cmds2), (minx, miny, wid, hei)
 
 	def yinvert(self, p_height: Union[float, int]):
 		self._yinverting = True
@@ -701,34 +779,40 @@ class Star(AnalyticalPath):
 	def getComment(self):		
 		return f"Star, radius:{self.radius}, nspikes:{self.nspikes}, rot:{self.rot}"
 
-	def onAfterParentAdding(self, defselement=None):	
-		if not self._parentadded:
-			self._parentadded = True
-		else:
-		 	return False
-
+	def _buildGeometry(self):
 		step = 360 / self.nspikes
 		rot = self.rot - 90 # 0 is vertical
 		hstep = step / 2
 		first = True
 		ct = Pt(0,0)
+		cmds = []
 
-		opts = list(circleDividers(ct, self.radius, self.nspikes, rot))
-		ipts = list(circleDividers(ct, self.radius-self.offset, self.nspikes, rot+hstep))
+		opts = circleDividersArray(ct, self.radius, self.nspikes, rot).tolist()
+		ipts = circleDividersArray(ct, self.radius-self.offset, self.nspikes, rot+hstep).tolist()
 
 		for i, opt in enumerate(opts):
 			ipt = ipts[i]
 			if first:
-				self.addCmd(pM(*opt))
+				cmds.append(pM(*opt))
 			else:
-				self.addCmd(pL(*opt))
+				cmds.append(pL(*opt))
 
-			self.addCmd(pL(*ipt))
+			cmds.append(pL(*ipt))
 
 			first = False
 
 		if not first:
-			self.addCmd(pClose())
+			cmds.append(pClose())
+
+		return tuple(cmds)
+
+	def onAfterParentAdding(self, defselement=None):	
+		if not self._parentadded:
+			self._parentadded = True
+		else:
+		 	return False
+
+		addCachedCmds(self, SYMBOL_GEOMETRY_CACHE.get((Star, self.radius, self.offset, self.nspikes, self.rot), self._buildGeometry))
 
 		return True
 
@@ -750,10 +834,11 @@ class CircStar(Star):
 			self.addCmd(pA(rad, rad, 0, 1, 0, -rad, 0))
 			self.refresh()
 
-def addRegPolyToPath(p_analytic_path, p_rot, p_radius, p_n, p_rhr):
+def _buildRegPoly(p_rot, p_radius, p_n, p_rhr):
 	rot = p_rot - 90 # 0 is vertical
 	ct = Pt(0,0)
-	opts = list(circleDividers(ct, p_radius, p_n, rot))
+	opts = circleDividersArray(ct, p_radius, p_n, rot).tolist()
+	cmds = []
 	
 	first = True
 
@@ -762,13 +847,19 @@ def addRegPolyToPath(p_analytic_path, p_rot, p_radius, p_n, p_rhr):
 
 	for opt in opts:
 		if first:
-			p_analytic_path.addCmd(pM(*opt))
+			cmds.append(pM(*opt))
 		else:
-			p_analytic_path.addCmd(pL(*opt))
+			cmds.append(pL(*opt))
 		first = False
 
 	if not first:
-		p_analytic_path.addCmd(pClose())
+		cmds.append(pClose())
+
+	return tuple(cmds)
+
+def addRegPolyToPath(p_analytic_path, p_rot, p_radius, p_n, p_rhr):
+	cmds = SYMBOL_GEOMETRY_CACHE.get((RegPoly, p_rot, p_radius, p_n, p_rhr), lambda: _buildRegPoly(p_rot, p_radius, p_n, p_rhr))
+	addCachedCmds(p_analytic_path, cmds)
 
 class RegPoly(AnalyticalPath):
 
@@ -879,6 +970,10 @@ class Cylinder(Symbol):
 		self.height = strictToNumber(p_height)
 		self.width = strictToNumber(p_width)
 
+	def getParams(self):
+		"Constructor arguments for current dimensions, see SVGContent.getSymbol"
+		return (self.width, self.height), {"pitch_ratio": self.pitch_ratio}
+
 	def getUseDims(self):
 		return self.use_dims
 
@@ -945,6 +1040,10 @@ class Server(Symbol):
 		if not depth is None:
 			self.depth = strictToNumber(depth)
 
+	def getParams(self):
+		"Constructor arguments for current dimensions, see SVGContent.getSymbol"
+		return (self.width, self.height, self.depth), {"rotation": self.rotation, "projangle": self.projangle}
+
 	def getUseDims(self):
 		return self.use_dims
 
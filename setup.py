@@ -23,6 +23,7 @@ setuptools.setup(
     python_requires='>=3.6',
     install_requires=[
 		'lxml>=4.4.1',
-		'cairosvg>=2.5.1'
+		'cairosvg>=2.5.1',
+		'numpy>=1.17'
 	]
 )
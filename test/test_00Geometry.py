@@ -8,7 +8,8 @@ from rpSVG.SVGStyleText import CSSSty, Sty
 from rpSVG.Structs import Re
 from rpSVG.Basics import GLOBAL_ENV, Pt, Rotate, pA, pL, pM, ptAdd
 import pytest
-from rpSVG.Geometry import Elpg, Lng, Ptg, ellipseIntersections, ellipticalArcCenterAndRadii, vec2_area2, vec2_arecollinear, vec2_crossprod_det, vec2_rotate, vec2_segment_intersect
+import numpy as np
+from rpSVG.Geometry import Elpg, Lng, Ptg, ellipseIntersections, ellipseIntersectionsArray, ellipticalArcCenterAndRadii, polylineSegments, segmentIntersections, segmentsToArray, vec2_area2, vec2_arecollinear, vec2_crossprod_det, vec2_line_intersect, vec2_line_intersect_array, vec2_rotate, vec2_segment_intersect, vec2_segment_intersect_array
 
 
 #@pytest.mark.solo
@@ -93,6 +94,74 @@ def test_00Intersect():
 	ret = vec2_segment_intersect(*la, *lb)
 	assert ret is None, ret
 
+def test_00IntersectArray():
+
+	segs_a = segmentsToArray([(Ptg(1,1), Ptg(2,3)), (Ptg(1,1), Ptg(2,3)), (Ptg(-10,-1), Ptg(1,1)), (Ptg(-10,-1), Ptg(-10,1))])
+	segs_b = segmentsToArray([(Ptg(3,1.5), Ptg(5,0)), (Ptg(1.1,1.5), Ptg(5,0)), (Ptg(-10,1), Ptg(1,-1)), (Ptg(1,-1), Ptg(1,1))])
+	a_scal, b_scal, pts, hit = vec2_segment_intersect_array(segs_a, segs_b)
+	assert hit.tolist() == [False, True, True, False]
+	assert np.round(pts[1], 2).tolist() == [1.23, 1.45] and np.round(pts[2], 1).tolist() == [-4.5, 0.0]
+	assert np.isnan(pts[0]).all() and a_scal[3] == 0 and b_scal[3] == 0
+
+	# lines: same scalars as vec2_line_intersect, for every pair
+	a_scal, b_scal, pts, valid = vec2_line_intersect_array(segs_a, segs_b, allpairs=True)
+	assert pts.shape == (4, 4, 2) and not valid[3, 3]
+	for i, (ax1, ay1, ax2, ay2) in enumerate(segs_a.tolist()):
+		for j, (bx1, by1, bx2, by2) in enumerate(segs_b.tolist()):
+			ret = vec2_line_intersect(Ptg(ax1, ay1), Ptg(ax2, ay2), Ptg(bx1, by1), Ptg(bx2, by2))
+			assert ret[:2] == (a_scal[i, j], b_scal[i, j])
+			assert (ret[2] is None and not valid[i, j]) or tuple(ret[2]) == tuple(pts[i, j])
+
+	# segments against a closed contour
+	contour = segmentsToArray([Lng((0,0), (4,0)), Lng((4,0), (4,2)), Lng((4,2), (0,2)), Lng((0,2), (0,0))])
+	_a, _b, pts, hit = vec2_segment_intersect_array([[2, 1, 6, 1], [1, 1, 3, 1], [-1, -1, 5, 3]], contour, allpairs=True)
+	assert np.count_nonzero(hit, axis=1).tolist() == [1, 0, 2]
+	assert pts[0, 1].tolist() == [4.0, 1.0]
+def test_00AllIntersections():
+
+	rng = np.random.default_rng(7)
+	p0 = rng.uniform(0, 100, (600, 2))
+	segs = np.hstack((p0, p0 + rng.normal(0, 8, (600, 2))))
+	_a, _b, _pts, hit = vec2_segment_intersect_array(segs, segs, allpairs=True)
+	expected = set(zip(*[idx.tolist() for idx in np.nonzero(np.triu(hit, 1))]))
+	for cellsize in (None, 0.5, 1000):
+		i, j, a_scal, b_scal, pts = segmentIntersections(segs, cellsize=cellsize)
+		assert set(zip(i.tolist(), j.tolist())) == expected and len(i) == len(expected)
+	k = 3
+	ref = vec2_segment_intersect(Ptg(*segs[i[k],:2]), Ptg(*segs[i[k],2:]), Ptg(*segs[j[k],:2]), Ptg(*segs[j[k],2:]))
+	assert tuple(ref) == tuple(pts[k])
+
+	# polyline: joints of consecutive segments are intersections unless skipped
+	segs = polylineSegments([(0,0), (10,0), (10,10), (0,-5)])
+	assert segmentIntersections(segs)[0].tolist() == [0, 0, 1]
+	i, j, a_scal, b_scal, pts = segmentIntersections(segs, skipjoints=True)
+	assert (i.tolist(), j.tolist()) == ([0], [2]) and np.round(pts, 4).tolist() == [[3.3333, 0.0]]
+	assert len(polylineSegments([(0,0), (10,0), (10,10)], closed=True)) == 3
+	assert len(segmentIntersections(segs[:1])[0]) == 0
+def test_00EllipseIntersectArray():
+
+	# vertical, horizontal, oblique, missing the ellipse, coincident points
+	lines = np.array([[5, -30, 5, 30], [-40, 2, 40, 2], [-40, -7, 35, 12], [60, 0, 70, 80], [1, 1, 1, 1]], dtype=float)
+	for rot in (0, 30):
+		elip = Elpg((3,4), 20, ry=11, vertang=rot)
+		pa, pb, valid = ellipseIntersectionsArray(lines, elip)
+		assert valid.tolist() == [True, True, True, False, False]
+		assert np.isnan(pa[4]).all()
+		for i in range(4):
+			p1, p2 = ellipseIntersections(Lng(lines[i,:2], lines[i,2:]), elip)
+			assert np.allclose([p1, p2], [pa[i], pb[i]], rtol=0, atol=1e-9)
+
+	# one line, many ellipses
+	elips = [Elpg((0,0), 10, ry=5), Elpg((3,1), 8, ry=8, vertang=45), Elpg((-4,2), 12, ry=3, vertang=-20)]
+	line = Lng((-40, -7), (35, 12))
+	pa, pb, valid = ellipseIntersectionsArray(line, elips)
+	assert pa.shape == (3, 2) and valid.all()
+	for i, elip in enumerate(elips):
+		p1, p2 = ellipseIntersections(line, elip)
+		assert np.allclose([p1, p2], [pa[i], pb[i]], rtol=0, atol=1e-9)
+	# vertical line through the center of a circle
+	pa, pb, valid = ellipseIntersectionsArray([[0, -1, 0, 1]], [[0, 0, 5, 5, 0]])
+	assert pa.tolist() == [[0, 5]] and pb.tolist() == [[0, -5]]
 
 def genCompleteEllipsePart(p_sc, p_centerx, p_centery, p_symbdict, rot=0):
 
@@ -1,10 +1,13 @@
 
 import pytest, re
+from io import BytesIO
 
-from rpSVG.Basics import Pt, Env
-from rpSVG.Structs import Re, ReRC, VBox600x800
-from rpSVG.SVGLib import BaseSVGElem, Circle, Ellipse, Group, Line,  \
-	Rect, SVGContent, SVGRoot, TagOutOfDirectUserManipulation
+import numpy as np
+
+from rpSVG.Basics import GLOBAL_ENV, Pt, Env, Mat, NumFormatter, Rotate, Scale, SingularTransformError, SkewX, SkewY, Trans, ValueWithUnitsError, affineCompose, affineInvert, circleDividers, circleDividersArray, getUnit, glRd, glRdArray, pL, pM, polar2rectDegs, scalePrecision, strictToNumber, toNumberAndUnit
+from rpSVG.Structs import Re, ReRC, VBox, VBox600x800
+from rpSVG.SVGLib import AnalyticalPath, BaseSVGElem, Circle, Ellipse, Group, Line,  \
+	Polygon, Polyline, PrecisionChangeError, Rect, SVGContent, SVGRoot, TagOutOfDirectUserManipulation
 from rpSVG.SVGStyleText import Sty, CSSSty
 
 from lxml import etree
@@ -80,6 +83,28 @@ def test_Sty():
 	s4.addFromDict({'circle': {'stroke-opacity': '0.12'}})
 	str(s4) == "sel=circle fill=red stroke=green stroke-opacity=0.12 stroke-width=12"
 
+def test_styFrozen():
+	s1 = Sty('stroke', 'green', 'stroke-width', 2)
+	assert getattr(s1, 'stroke-width') == '2' and s1.fill == 'none' and not hasattr(s1, 'opacity')
+	assert s1.getFrozen() == (('fill', 'none'), ('stroke', 'green'), ('stroke-width', '2'))
+	assert s1.getStyleAttrs() == ['fill', 'stroke', 'stroke-width']
+	s2 = Sty('stroke-width', 2, 'stroke', 'green')
+	assert s1 == s2 and hash(s1.getFrozen()) == hash(s2.getFrozen())
+	# frozen view follows changes
+	setattr(s2, 'stroke-width', '3')
+	assert s1 != s2 and s1.diffDict(s2) == {'stroke-width': ('2', '3')}
+	del s2.fill
+	assert s2.getFrozen() == (('stroke', 'green'), ('stroke-width', '3'))
+	assert s1.diffDict(s2) == {'attrs': (['fill', 'stroke', 'stroke-width'], ['stroke', 'stroke-width'])}
+	s2.set('opacity', 0.5)
+	assert str(s2) == "opacity=0.5 stroke=green stroke-width=3"
+	with pytest.raises(AttributeError):
+		del s2.fill
+	el = etree.Element("rect")
+	s2.setXmlAttrs(el)
+	assert el.items() == [('opacity', '0.5'), ('stroke', 'green'), ('stroke-width', '3')]
+	assert Sty().fromXmlAttrs(el).toDict() == {'fill': 'none', 'opacity': '0.5', 'stroke': 'green', 'stroke-width': '3'}
+
 def test_styleElement():
 
 	sc = SVGContent(Re().full()).setIdentityViewbox(scale=10.0)
@@ -129,3 +154,246 @@ def test_similarElement():
 
 
 
+
+def test_streamWriter(tmp_path):
+
+	sc = SVGContent(Re(0,0,100,100)).setIdentityViewbox()
+	sc.addStyleRule(CSSSty('fill', 'red', selector='.c'))
+	sc.setBackground(Sty('fill', 'white'))
+
+	out = BytesIO()
+	with sc.streamTo(out) as sw:
+		g = sw.openGroup(Group().setClass('c'))
+		for i in range(200):
+			sw.addChild(Circle(10*i, 10, 5))
+		# finished elements and their wrappers are dropped
+		assert len(g.getEl()) == 1 and len(g.content) == 1
+		sw.closeGroup()
+		sw.addChild(Circle(0, 0, 2), todefs=True)
+		sw.addChild(Rect(1,2,3,4)).setStyle(Sty('stroke', 'blue'))
+		assert len(sc.getEl()) == 1 and len(sc.content) == 2
+
+	root = etree.fromstring(out.getvalue())
+	assert len(root.findall("{http://www.w3.org/2000/svg}g/{http://www.w3.org/2000/svg}circle")) == 200
+	condens = re.sub(r"[\s]+"," ", out.getvalue().decode('utf-8'))
+	assert condens.startswith("""<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" x="0" y="0" width="100" height="100" viewBox="0 0 100 100"> <defs> <style type="text/css"><![CDATA[.c { fill: red; }]]></style> </defs> <rect x="0" y="0" width="100" height="100" id="Rec0" fill="white"/> <g class="c" id="G1"> <circle cx="0" cy="10" r="5" id="Cir2"/>""")
+	assert condens.endswith("""</g> <defs> <circle cx="0" cy="0" r="2" id="Cir202"/> </defs> <rect x="1" y="2" width="3" height="4" id="Rec203" fill="none" stroke="blue"/> </svg>""")
+
+	# on errors, output is closed unfinished
+	outpath = tmp_path / "unfinished.svg"
+	sc = SVGContent(Re(0,0,100,100))
+	with pytest.raises(ValueError):
+		with sc.streamTo(str(outpath)) as sw:
+			sw.openGroup()
+			sw.addChild(Circle(1, 1, 1))
+			raise ValueError("interrupted")
+	assert not sw.isOpen()
+	assert outpath.read_bytes().startswith(b"<svg") and not b"</svg>" in outpath.read_bytes()
+
+def test_bulkPrimitives():
+
+	cx = np.array([10, 20.5, -30.25])
+	cy = np.array([40, 50, 60.75])
+	sz = [5, 6, 7]
+	sty = Sty('stroke', 'red', 'stroke-width', 2)
+
+	for yinvert in (False, True):
+
+		sc1 = SVGContent(Re(0,0,100,100), yinvert=yinvert).setIdentityViewbox()
+		for i in range(3):
+			sc1.addChild(Circle(cx[i].item(), cy[i].item(), sz[i])).setClass('k').setStyle(sty)
+			sc1.addChild(Rect(cx[i].item(), cy[i].item(), sz[i], 3)).setClass('k').setStyle(sty)
+		for i in range(3):
+			sc1.addChild(Line(cx[i].item(), cy[i].item(), sz[i], 3))
+
+		sc2 = SVGContent(Re(0,0,100,100), yinvert=yinvert).setIdentityViewbox()
+		for i in range(3):
+			assert sc2.addCircles(cx[i:i+1], cy[i:i+1], sz[i:i+1], cls='k', style=sty) == 1
+			assert sc2.addRects(cx[i:i+1], cy[i:i+1], sz[i:i+1], 3, cls='k', style=sty) == 1
+		assert sc2.addLines(cx, cy, sz, 3) == 3
+
+		assert sc1.toBytes() == sc2.toBytes()
+
+	sc = SVGContent(Re(0,0,100,100)).setIdentityViewbox()
+	g = sc.addChild(Group())
+	g.addCircles([1, 2], [3, 4], 5, genids=False)
+	assert [dict(c.attrib) for c in g.getEl()] == [{'cx': '1', 'cy': '3', 'r': '5'}, {'cx': '2', 'cy': '4', 'r': '5'}]
+	# text values are escaped, as in fixed attributes
+	g.addRects(0, 0, ['50%', '1" onload="x'], '2em', genids=False)
+	assert [(r.get("width"), r.get("height"), r.get("onload")) for r in g.getEl().findall("rect")] == [('50%', '2em', None), ('1" onload="x', '2em', None)]
+
+def test_typedStruct():
+	reo = Re(1, 2.5, "10.50", "30%")
+	assert reo._typed('x') == 1 and reo._typed('y') == 2.5
+	# strings not reproduced by number formatting are kept as given
+	assert reo._typed('width') == "10.50" and reo.width == "10.50"
+	assert reo.getNumAndUnit('height') == (30, '%')
+	assert reo.getValues() == [1, 2.5, 10.5, 30]
+	with pytest.raises(ValueWithUnitsError):
+		reo.getNumber('height')
+	reo.setUnits('px')
+	assert str(reo) == "Re x=1px y=2.5px width=10.5px height=30%"
+	assert reo.getNumeric('x') == 1 and reo.getNumAndUnit('y') == (2.5, 'px')
+
+	el = etree.Element("rect")
+	r2 = Re(0, -3.25, 100, 200.0).setXmlAttrs(el)
+	assert dict(el.attrib) == {'x': '0', 'y': '-3.25', 'width': '100', 'height': '200.0'}
+	r3 = Re().getFromXmlAttrs(el)
+	assert r3 == r2 and r3._typed('height') == 200.0
+	r3.yinvert(1000)
+	assert r3.y == "803.25" and r3.getNumber('y') == 803.25
+
+def test_numFormatter():
+	fmt = NumFormatter(3)
+	vals = [0, 1.0, -0.0002, 2.5, 10.12345, -7.25, 1e-05, 123456789012.345]
+	assert [fmt.fmt(v) for v in vals] == ['0', '1', '0', '2.5', '10.123', '-7.25', '0', '123456789012.345']
+	assert fmt.fmtArray(vals) == [fmt.fmt(v) for v in vals]
+	assert [fmt.fmt(v) for v in vals] == [str(fmt.rd(v)) for v in vals]
+	assert NumFormatter().fmt(2.50) == '2.5' and NumFormatter(0).fmt(2.5) == '2'
+
+	sc = SVGContent(Re(0, 0, 100.123, 100), precision=0).setIdentityViewbox()
+	assert sc.getEl().get("width") == "100"
+	c = sc.addChild(Circle(10.4, 20.6, 5.5))
+	assert c.getEl().get("cx") == "10" and c.getEl().get("cy") == "21"
+	# struct is read back from XML, at document precision
+	assert c.getStruct().getNumber("cx") == 10
+	c.addTransform(Trans(0.75, 1.2))
+	assert c.getEl().get("transform") == "translate(1,1)"
+	pl = sc.addChild(Polyline())
+	pl.addPList([Pt(1.6, 2), Pt(3, 4.2)])
+	assert pl.getEl().get("points") == "2,2 3,4"
+	ap = sc.addChild(AnalyticalPath())
+	ap.addCmd(pM(10.4, 20.6))
+	ap.addCmd(pL(-0.4, 5, relative=True), refresh=True)
+	assert ap.getEl().get("d") == "M10 21l0 5"
+
+def test_unitParser():
+	assert toNumberAndUnit("1.2em") == (1.2, "em") and toNumberAndUnit("100%") == (100, "%")
+	assert toNumberAndUnit(-3.0) == (-3, None) and toNumberAndUnit("1.2em") == (1.2, "em")
+	# general case, number and unit chars interleaved
+	assert toNumberAndUnit(" 1 0px") == (10, "  px")
+	assert getUnit("10px") == "px" and getUnit("10") is None and getUnit("em") == "em"
+	assert strictToNumber("12.50") == 12.5 and strictToNumber(7) == 7
+	with pytest.raises(ValueWithUnitsError):
+		strictToNumber("12pt")
+	with pytest.raises(ValueError):
+		toNumberAndUnit("em")
+	with pytest.raises(ValueError):
+		strictToNumber("1,5")
+
+def test_styleClasses():
+
+	sc = SVGContent(Re(0,0,200,100))
+	for i in range(4):
+		sc.addChild(Circle(10 * i, 10, 2)).setStyle(Sty('fill', 'red', 'stroke', 'blue', 'stroke-width', 2))
+	sc.addChild(Rect(1, 1, 5, 5)).setClass("s0").setStyle(Sty('stroke', 'blue'))
+	sc.addChild(Rect(9, 9, 5, 5)).setStyle(Sty('stroke', 'blue'))
+	sc.addChild(Line(0, 0, 5, 5)).setStyle(Sty('stroke', 'green'))
+	plain = sc.toString(pretty_print=False)
+
+	condens = re.sub(r"[\s]+"," ", sc.toString(styleclasses=True))
+	assert condens == """<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" x="0" y="0" width="200" height="100"> <defs> <style type="text/css"><![CDATA[.s1 { fill: red; stroke: blue; stroke-width: 2; }]]></style> </defs> <circle cx="0" cy="10" r="2" id="Cir0" class="s1"/> <circle cx="10" cy="10" r="2" id="Cir1" class="s1"/> <circle cx="20" cy="10" r="2" id="Cir2" class="s1"/> <circle cx="30" cy="10" r="2" id="Cir3" class="s1"/> <rect x="1" y="1" width="5" height="5" id="Rec4" class="s0" fill="none" stroke="blue"/> <rect x="9" y="9" width="5" height="5" id="Rec5" fill="none" stroke="blue"/> <line x1="0" y1="0" x2="5" y2="5" id="Lin6" fill="none" stroke="green"/> </svg> """
+	# content not changed
+	assert sc.toString(pretty_print=False) == plain
+
+	# properties set in existing rules are kept as attributes
+	sel = sc.addStyleRule(CSSSty('stroke', 'black', 'fill', 'none', selector='.s0'))
+	condens = re.sub(r"[\s]+"," ", sc.toString(styleclasses=True))
+	assert '<style type="text/css"><![CDATA[.s0 { fill: none; stroke: black; } .s1 { stroke-width: 2; }]]></style>' in condens
+	assert '<circle cx="0" cy="10" r="2" id="Cir0" fill="red" stroke="blue" class="s1"/>' in condens
+	assert '<line x1="0" y1="0" x2="5" y2="5" id="Lin6" fill="none" stroke="green"/>' in condens
+	sc.delStyleRule(sel)
+	assert sc.toString(pretty_print=False) == plain
+	# no style set repeated often enough
+	sc.STYLECLASS_MINCOUNT = 5
+	assert sc.toString(pretty_print=False, styleclasses=True) == plain
+
+
+def test_scalePrecision():
+	assert scalePrecision(1, 0.1) == 1 and scalePrecision(0.01, 0.1) == 3 and scalePrecision(1000, 0.1) == 0
+	assert scalePrecision(1, 0.5) == 0 and scalePrecision(0.1, 0.5) == 1
+
+	# 100 pixels showing 10 units, 0.1 px max error: 0.01 units, 2 places
+	sc = SVGContent(Re(0, 0, 100, 100), maxerror=0.1)
+	assert sc.getPrecision() == 1
+	sc.setViewbox(VBox(0, 0, 10, 10))
+	assert sc.getPrecision() == 2
+	c = sc.addChild(Circle(1.23456, 2, 0.5))
+	assert c.getEl().get("cx") == "1.23"
+	# transform factors and angles are not coordinates, not rounded
+	c.addTransform(Trans(0.12345, 0))
+	c.addTransform(Scale(0.123456))
+	c.addTransform(Rotate(12.3456, 1.23456, 0))
+	assert c.getEl().get("transform") == "translate(0.12,0) scale(0.123456) rotate(12.3456,1.23,0)"
+	ap = sc.addChild(AnalyticalPath())
+	ap.addCmd(pM(1.23456, 1), refresh=True)
+	# a larger extent, coarser precision for attributes written afterwards
+	sc.setViewbox(VBox(0, 0, 10000, 10000))
+	assert sc.getPrecision() == 0
+	ap.addCmd(pL(5.55, 5.55), refresh=True)
+	assert ap.getEl().get("d") == "M1 1 6 6"
+	pl = sc.addChild(Polygon())
+	pl.addPList([Pt(1.6, 2.2), Pt(3, 4.5), Pt(7, 1)])
+	assert pl.getEl().get("points") == "2,2 3,4 7,1"
+	with pytest.raises(AssertionError):
+		SVGContent(Re(0, 0, 100, 100), precision=2, maxerror=0.1)
+	# finer precision after content is written would break maxerror
+	sc = SVGContent(Re(0, 0, 100, 100), maxerror=0.1)
+	c = sc.addChild(Circle(0.123456, 0.5, 0.25))
+	assert c.getEl().get("r") == "0.2"
+	with pytest.raises(PrecisionChangeError):
+		sc.setViewbox(VBox(0, 0, 1, 1))
+	assert sc.getPrecision() == 1 and sc.getEl().get("viewBox") is None
+	sc = SVGContent(Re(0, 0, 100, 100), viewbox=VBox(0, 0, 100, 100), maxerror=0.1)
+	sc.addChild(Circle(0.123456, 0.5, 0.25))
+	with pytest.raises(PrecisionChangeError):
+		sc.setStruct(Re(0, 0, 10000, 10000))
+	assert sc.getPrecision() == 1 and sc.getEl().get("width") == "100"
+
+def test_circleDividersArray():
+	vals = np.concatenate((np.random.default_rng(1).uniform(-1000, 1000, 2000), np.arange(-50, 50) / 2e4, [2.0 ** 60]))
+	assert glRdArray(vals).tolist() == [float(glRd(v)) for v in vals.tolist()]
+
+	arr = circleDividersArray(Pt(10, 20), 7.5, 12, 15)
+	assert arr.shape == (12, 2)
+	for i, (x, y) in enumerate(arr.tolist()):
+		p = polar2rectDegs(i * 30 + 15, 7.5)
+		assert x == 10 + p.x and y == 20 + p.y
+	assert list(circleDividers(Pt(0, 0), 10, 4)) == [Pt(10, 0), Pt(0, 10), Pt(-10, 0), Pt(0, -10)]
+	assert type(list(circleDividers(Pt(0, 0), 10, 4))[0].x) is int
+	# tables are shared, the rounding follows current settings
+	places = GLOBAL_ENV["ROUND"]["places"]
+	GLOBAL_ENV["ROUND"]["places"] = 1
+	try:
+		assert circleDividersArray(Pt(10, 20), 7.5, 12, 15)[0].tolist() == [17.2, 21.9]
+	finally:
+		GLOBAL_ENV["ROUND"]["places"] = places
+
+def test_affineTransforms():
+	m = affineCompose([Trans(10, 20), Scale(2, 3), Rotate(90, 5, 5), SkewX(45), SkewY(0), Mat(1, 0, 0, 1, 1, 1)])
+	assert np.allclose(m @ affineInvert(m), np.identity(3))
+	with pytest.raises(SingularTransformError):
+		affineInvert(Scale(0, 1).getMatrix())
+
+	sc = SVGContent(Re(0, 0, 100, 100))
+	g = sc.addChild(Group())
+	g.addTransform(Trans(10, 20))
+	g.addTransform(Scale(2))
+	g2 = g.addChild(Group())
+	g2.addTransform(Rotate(90, 5, 5))
+	r = g2.addChild(Rect(0, 0, 4, 2))
+	r.addTransform(Mat(1, 0, 0, 1, 1, 1))
+	pts = r.toDocCoords([[0, 0], [4, 2]])
+	assert np.allclose(pts, [[28, 22], [24, 30]])
+	assert np.allclose(r.fromDocCoords(pts), [[0, 0], [4, 2]])
+	env = r.getDocBounds()
+	assert np.allclose([env.getNumber(f) for f in ("minx", "miny", "maxx", "maxy")], [24, 22, 28, 30])
+	# loaded documents: from 'transform' attributes
+	sc2 = SVGContent.fromBytes(sc.toBytes())
+	assert np.allclose(sc2.findByTag("rect")[0].getCTM(), r.getCTM())
+	# spatial index boxes follow the same transforms
+	assert [w.getEl() for w in sc2.findInEnvelope(Env(24, 22, 28, 30))] == [sc2.findByTag("rect")[0].getEl()]
+	assert len(sc2.findAtPoint(Pt(1, 1))) == 0
+	el = sc2.findByTag("rect")[0].getEl()
+	el.set("transform", "bogus(1)")
+	assert sc2.findByTag("rect")[0].getCTM() is None
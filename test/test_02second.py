@@ -1,8 +1,11 @@
 from test.testing import genFiles
 import pytest, re, inspect
 
-from rpSVG.Basics import Pt, Mat, Trans, Scale, Rotate, SkewX, SkewY, pA, pC, pClose, pH, pM, pL, WrongValueTransformDef, pQ, pS, pT, pV
-from rpSVG.SVGLib import Desc, Group, Polygon, Re, SVGContent, Circle, Rect, RectRC, Title, Use, Path, AnalyticalPath, Polyline
+import numpy as np
+from lxml import etree
+
+from rpSVG.Basics import Env, PathBuffer, simplifyDP, simplifyVW, PathDataError, Pt, parsePathData, Mat, Trans, Scale, Rotate, SkewX, SkewY, pA, pC, pClose, pH, pM, pL, WrongValueTransformDef, pQ, pS, pT, pV
+from rpSVG.SVGLib import VBox, Desc, Group, Polygon, Re, SVGContent, Circle, Rect, RectRC, Title, Use, Path, AnalyticalPath, Polyline
 from rpSVG.SVGStyleText import Sty, CSSSty
 
 # from lxml import etree
@@ -148,6 +151,28 @@ def test_02Paths():
 
 	assert condens == """<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" x="0" y="0" width="100%" height="100%" viewBox="0 0 1000 1000"><defs><style type="text/css"><![CDATA[path { fill: red; stroke: green; }]]></style></defs><path d="M10 12" id="Pat0"/><path d="M120 240" id="Pat1"/></svg>"""
 
+def test_02SlottedCommands():
+
+	a = pA(10, 20, 0, 1, 0, 30, 40, relative=True)
+	assert not hasattr(a, '__dict__')
+	assert getattr(a, 'large-arc-flag') == '1'
+	a.setvalue('large-arc-flag', 0)
+	assert a.getvalue('large-arc-flag') == '0'
+	assert a.get() == "a10 20 0 0 0 30 40"
+
+	r = Rotate(45)
+	assert not hasattr(r, '__dict__')
+	assert not hasattr(r, 'cx')
+	assert r.get() == "rotate(45)" and str(r) == "Rotate rotate-angle=45"
+
+	c = SVGContent(Re(0,0,100,100)).addChild(Circle(1, 2, 3))
+	assert not hasattr(c.getStruct(), '__dict__')
+	assert c.getStruct().getall() == ['1', '2', '3']
+
+	# points elements state in slots, wrapper '__dict__' left empty
+	pg = SVGContent(Re(0,0,100,100)).addChild(Polygon()).addPList([Pt(0, 0), Pt(1, 0), Pt(0, 1)])
+	assert pg.omitclosingpoint and pg.removedvertices == 0 and len(vars(pg)) == 0
+
 def test_02PathCommands():
 
 	sc = SVGContent(Re().full()).setIdentityViewbox(scale=10.0)
@@ -261,6 +286,116 @@ def test_02PolylinePath():
 
 	genFiles(inspect.currentframe().f_code.co_name, sc)
 
+def test_02PolylineArray():
+
+	pts = [
+		Pt(120, 140), Pt(290, 160), Pt(290, 160), Pt(400, 160),
+		Pt(400, 330), Pt(250.5, 500.5), Pt(-10, -20.5),
+		Pt(-12, -22), Pt(-12, -22), Pt(800,100), Pt(120, 140)
+	]
+
+	for yinvert in (False, True):
+
+		sc = SVGContent(Re(0,0,1024,1000), yinvert=yinvert).setIdentityViewbox()
+		ap1 = sc.addChild(AnalyticalPath())
+		ap1.addPolylinePList(pts)
+		ap2 = sc.addChild(AnalyticalPath())
+		ap2.addPolylineArray(np.array(pts))
+
+		assert ap1.getStruct().get("d") == ap2.getStruct().get("d")
+
+		# open polylines and commands following the encoded run
+		ap1.clear()
+		ap2.clear()
+		ap1.addPolylinePList(pts[:-1])
+		ap1.addCmd(pL(30, 40))
+		ap1.addCmd(pClose())
+		ap2.addPolylinePList(memoryview(np.array(pts[:-1])))
+		ap2.addCmd(pL(30, 40))
+		ap2.addCmd(pClose())
+
+		assert ap1.getStruct().get("d") == ap2.getStruct().get("d")
+
+	assert ap2.getStruct().get("d") == "M120 860l170-20h110v-170l-149.5-170.5L-10 1020.5l-2 1.5L800 900 30 960z"
+
+def test_02IncrementalPathData():
+
+	sc = SVGContent(Re(0,0,1000,1000)).setIdentityViewbox()
+	ap = sc.addChild(AnalyticalPath())
+	for k in range(3):
+		ap.addCmd(pM(10*k, 20)).addCmd(pL(5, 5, relative=True)).addCmd(pL(-5, 5, relative=True)).addCmd(pClose())
+	assert ap.getEl().get("d") == "M0 20l5 5-5 5zM10 20l5 5-5 5zM20 20l5 5-5 5z"
+
+	ap.insCmd(2, pL(2, 0, relative=True))
+	assert ap.getEl().get("d") == "M0 20l5 5 2 0-5 5zM10 20l5 5-5 5zM20 20l5 5-5 5z"
+	ap.delCmd(-3)
+	assert ap.getEl().get("d") == "M0 20l5 5 2 0-5 5zM10 20l5 5-5 5zM20 20l-5 5z"
+	ap.addCmd(pM(7, 7, relative=True), tostart=True, refresh=True)
+	assert ap.getEl().get("d") == "M7 7M0 20l5 5 2 0-5 5zM10 20l5 5-5 5zM20 20l-5 5z"
+
+	# already added commands changed: refresh encodes all
+	ap.cmds[1].setvalue("x", 1)
+	ap.refresh()
+	assert ap.getEl().get("d") == "M7 7M1 20l5 5 2 0-5 5zM10 20l5 5-5 5zM20 20l-5 5z"
+
+def test_02PathBuffer():
+
+	cmds = [pM(10, 20), pL(5, 5, relative=True), pL(-5, 5, relative=True), pH(30), pH(40), 
+		pA(10, 10, 0, 1, 0, 50, 60), pC(1, 2, 3, 4, 5, -6, relative=True), pClose(), pM(0, 0), pL(1.5, 2)]
+
+	for yinvert in (False, True):
+		sc = SVGContent(Re(0,0,1000,1000), yinvert=yinvert).setIdentityViewbox()
+		ap1 = sc.addChild(AnalyticalPath())
+		for cmd in PathBuffer.fromCommands(cmds).toCommands():
+			ap1.addCmd(cmd)
+		ap1.refresh()
+		ap2 = sc.addChild(AnalyticalPath())
+		ap2.addCmd(pM(10, 20)).addCmd(PathBuffer.fromCommands(cmds[1:8])).addCmd(PathBuffer.fromCommands(cmds[8:]), refresh=True)
+		if not yinvert:
+			assert ap2.getStruct().get("d") == "M10 20l5 5-5 5H30 40A10 10 0 1 0 50 60c1 2 3 4 5-6zM0 0 1.5 2"
+			assert ap1.getStruct().get("d") == ap2.getStruct().get("d")
+		else:
+			# absolute commands mirrored, relative ones change sign
+			assert ap2.getStruct().get("d") == "M10 980l5-5-5-5H30 40A10 10 0 1 1 50 940c1-2 3-4 5 6zM0 1000 1.5 998"
+			assert ap1.getStruct().get("d") == ap2.getStruct().get("d")
+
+	# command objects and PathBuffer mirror alike
+	cmds = [pM(10, 20), pL(5, 5, relative=True), pV(-5, relative=True), pA(10, 20, 30, 1, 0, 5, 6, relative=True),
+		pA(10, 20, 30, 0, 1, 50, 60), pC(1, 2, 3, 4, 5, -6, relative=True), pS(3, 4, 50, 60), pQ(1, 2, 3, 4, relative=True), pT(7, 8)]
+	pb = PathBuffer.fromCommands(cmds).yinvert(100)
+	for cmd in cmds:
+		cmd.yinvert(100)
+	assert pb.get() == PathBuffer.fromCommands(cmds).get() == "M10 80l5-5v5a10 20-30 1 1 5-6A10 20-30 0 0 50 40c1-2 3-4 5 6S3 96 50 40q1-2 3-4T7 92"
+
+	pb = PathBuffer().moveTo(1, 1).lineTo(2, 2, relative=True).hLineTo(4).vLineTo(-1, relative=True).close()
+	assert len(pb) == 5 and pb.get() == "M1 1l2 2H4v-1z"
+	assert pb.translate(10, 20).get() == "M11 21l2 2H14v-1z"
+	assert pb.scale(2, 0.5).get() == "M22 10.5l4 1H28v-0.5z"
+	assert PathBuffer().addPolyline(np.array([[0, 0], [10, 0], [10, 10.5]]), closed=True).get() == "M0 0 10 0 10 10.5z"
+
+def test_02PathDataParse():
+
+	pb = parsePathData("m1,2 3 4 5 6Z M.5.5-1e1 2E1a10 10 0 0110 10 5 5 -30 1,0 2-2l1-1")
+	assert pb.get() == "m1 2 3 4 5 6zM0.5 0.5-10 20a10 10 0 0 1 10 10 5 5-30 1 0 2-2l1-1"
+	assert [c.getLetter() for c in pb.toCommands()] == ["m", "l", "l", "z", "M", "L", "a", "a", "l"]
+
+	sc = SVGContent(Re(0,0,1000,1000)).setIdentityViewbox()
+	d = "M10 20l5 5-5 5H30 40A10 10 0 1 0 50 60c1 2 3 4 5-6zM0 0 1.5 2"
+	ap = sc.addChild(AnalyticalPath())
+	ap.addPathData(d)
+	assert len(ap.cmds) == 1 and ap.getStruct().get("d") == d
+	# editable commands, written back unchanged
+	ap2 = sc.addChild(AnalyticalPath())
+	ap2.addPathData(d, editable=True)
+	assert len(ap2.cmds) == 10 and ap2.getStruct().get("d") == d
+	ap2.cmds[3].setvalue("x", 35)
+	ap2.refresh()
+	assert ap2.getStruct().get("d") == d.replace("H30", "H35")
+
+	for wrong in ("L1 2", "M1 2 3", "M1 2 x3", "M1 2z 3", "M0 0a10 10 0 2 1 10 10"):
+		with pytest.raises(PathDataError):
+			parsePathData(wrong)
+
 def test_02PolylinePolygon():
 
 	sc = SVGContent(Re(0,0,1024,1000)).setIdentityViewbox()
@@ -313,4 +448,178 @@ def test_02GroupDefsTitleDesc():
 
 	genFiles(inspect.currentframe().f_code.co_name, sc)
 
-
+def test_02LoadedContent():
+
+	src = b"""<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="200" height="100" viewBox="0 0 200 100"><g id="layer"><rect x="1" y="2" width="30" height="40" id="Rec7" class="a b"/><circle cx="5" cy="5" r="3" class="b"/></g><path d="M 0 0 L 10 10" id="p1"/></svg>"""
+
+	sc = SVGContent.fromBytes(src, huge_tree=True)
+	# nothing wrapped yet, besides root, defs and style
+	assert len(sc._wrappers) == 3
+	assert sc.getStruct().getNumber('width') == 200 and not hasattr(sc.getStruct(), 'x')
+	assert sc.getById("missing") is None
+
+	rct = sc.getById("Rec7")
+	assert isinstance(rct, Rect) and rct.getStruct().getValues() == [1, 2, 30, 40]
+	assert sc.findByTag("rect") == [rct]
+	assert sc.findByClass("b")[0] is rct
+	assert [type(e) for e in sc.findByClass("b")] == [Rect, Circle]
+	assert sc.findByClass("c") == []
+	pth = sc.getById("p1")
+	assert isinstance(pth, Path) and pth.getStruct().d == "M 0 0 L 10 10"
+
+	# loaded attributes left untouched until changed
+	assert sc.toString(pretty_print=False) == src.decode().replace("><g", "><defs/><g")
+
+	rct.setStruct(Re(1, 2, 3, 4))
+	rct.setStyle(Sty('fill', 'red'))
+	lay = sc.getById("layer")
+	assert isinstance(lay, Group)
+	# added elements are found and generated ids don't clash with existing ones
+	newc = lay.addChild(Circle(1, 1, 1))
+	assert newc.getId() == "Cir8"
+	assert sc.findByTag("circle") == [sc.findByClass("b")[1], newc]
+
+	assert sc.toString(pretty_print=False) == """<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="200" height="100" viewBox="0 0 200 100"><defs/><g id="layer"><rect x="1" y="2" width="3" height="4" id="Rec7" class="a b" fill="red"/><circle cx="5" cy="5" r="3" class="b"/><circle cx="1" cy="1" r="1" id="Cir8"/></g><path d="M 0 0 L 10 10" id="p1"/></svg>"""
+
+	with pytest.raises(RuntimeError):
+		SVGContent.fromBytes(b"<notsvg/>")
+
+def test_02Indexes():
+
+	sc = SVGContent(Re(0,0,200,100))
+	g = sc.addChild(Group())
+	r1 = g.addChild(Rect(1, 2, 3, 4)).setClass("a b")
+	c1 = sc.addChild(Circle(5, 5, 3))
+	assert not sc.isIndexed()
+	# indexes built on first lookup
+	assert sc.getById("Rec1") is r1 and sc.isIndexed()
+	assert sc.findByTag("rect") == [r1] and sc.findByClass("b") == [r1]
+
+	# kept on adding, id and class changes
+	r2 = g.addChild(Rect(5, 5, 1, 1)).setClass("b")
+	assert sc.findByClass("b") == [r1, r2] and sc.getById("Rec3") is r2
+	r1.setId("first")
+	assert sc.getById("Rec1") is None and sc.getById("first") is r1
+	r1.setClass("c")
+	assert sc.findByClass("b") == [r2] and sc.findByClass("a") == [] and sc.findByClass("c") == [r1]
+	assert sc.addCircles([10, 20], 30, 1, cls="bulk") == 2
+	assert [e.getId() for e in sc.findByClass("bulk")] == ["Cir4", "Cir5"]
+	assert sc.findByTag("circle")[0] is c1 and len(sc.findByTag("circle")) == 3
+	assert sc.findByTag("desc") == []
+
+	# removing
+	par = r2.removeEl()
+	assert sc.getById("Rec3") is None and sc.findByClass("b") == []
+	r2.readdElToParent(par)
+	assert sc.getById("Rec3") is r2 and sc.findByClass("b") == [r2]
+	g.removeEl()
+	assert sc.getById("first") is None and sc.getById("G0") is None and sc.findByTag("rect") == []
+	c1.delEl()
+	assert sc.findByTag("circle") == sc.findByClass("bulk")
+	# removed elements no longer indexed on changes
+	r1.setId("again")
+	assert sc.getById("again") is None
+
+	# repeated ids: the next holder found once the first one is removed
+	d1 = sc.addChild(Rect(0, 0, 1, 1)).setId("x")
+	d2 = sc.addChild(Rect(2, 2, 1, 1)).setId("x")
+	assert sc.getById("x") is d1
+	d1.delEl()
+	assert sc.getById("x") is d2
+	d2.setId("y")
+	assert sc.getById("x") is None and sc.getById("y") is d2
+
+def test_02SpatialIndex():
+
+	sc = SVGContent(Re(0,0,200,100))
+	g = sc.addChild(Group())
+	r1 = g.addChild(Rect(10, 10, 20, 20))
+	c1 = sc.addChild(Circle(100, 50, 10))
+	p1 = sc.addChild(Path("M150 10 l20 0 V40"))
+	assert sc.findAtPoint(Pt(15, 15)) == [r1]
+	assert sc.findInEnvelope(Env(0, 0, 200, 100)) == [r1, c1, p1]
+	assert sc.findInEnvelope(Env(165, 25, 180, 35)) == [p1]
+	assert sc.findInEnvelope(Env(40, 40, 60, 60)) == []
+
+	# kept on geometry and ancestor transform changes, adding and removing
+	g.addTransform(Trans(100, 0))
+	assert sc.findAtPoint(Pt(15, 15)) == [] and sc.findAtPoint(Pt(115, 15)) == [r1]
+	c1.setStructAttr("cx", 20)
+	assert sc.findAtPoint(Pt(20, 50)) == [c1]
+	r2 = g.addChild(Rect(0, 50, 10, 10))
+	assert sc.findAtPoint(Pt(105, 55)) == [r2]
+	assert sc.addCircles([50, 60], 90, 2) == 2
+	assert [e.getStruct().getNumber("cx") for e in sc.findInEnvelope(Env(0, 85, 200, 95))] == [50, 60]
+	g.removeEl()
+	assert sc.findInEnvelope(Env(100, 0, 200, 100)) == [p1]
+	c1.delEl()
+	assert sc.findAtPoint(Pt(20, 50)) == []
+
+	# loaded documents: defs content and unknown boxes not found, nested transforms applied
+	sc = SVGContent.fromBytes(b"""<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="100" height="100">
+		<defs><symbol id="s"><rect width="1" height="1"/></symbol></defs>
+		<g transform="translate(10 0) scale(2)"><polygon id="pg" points="0,0 5,0 5,5"/><text x="1" y="1">t</text></g>
+		<use id="u" xlink:href="#s" x="50" y="50" width="10" height="10"/><rect id="pct" width="10%" height="5"/></svg>""")
+	assert [e.getId() for e in sc.findInEnvelope(Env(0, 0, 100, 100))] == ["pg", "u"]
+	assert [e.getId() for e in sc.findAtPoint(Pt(19, 9))] == ["pg"]
+	assert sc.findAtPoint(Pt(0.5, 0.5)) == []
+
+def test_02ViewportCulling(monkeypatch):
+
+	sc = SVGContent(Re(0,0,100,100))
+	sc.addChild(Rect(1, 1, 5, 5)).setStyle(Sty("fill", "url(#Lin2)"))
+	sc.addChild(Rect(80, 80, 5, 5))
+	sc.addChild(Rect(90, 0, 5, 5)).setStyle(Sty("fill", "red"))
+	sc.addRects([2, 50], 2, 1, 1, style=Sty("fill", "red"))
+	full = sc.toString(pretty_print=False)
+	sc.getEl().find("defs").append(etree.fromstring('<linearGradient id="Lin2"/>'))
+	sc.getEl().find("defs").append(etree.fromstring('<linearGradient id="Lin3"/>'))
+
+	out = sc.toString(pretty_print=False, window=Env(0, 0, 9, 9), margin=1)
+	assert 'viewBox="-1 -1 11 11"' in out
+	assert 'id="Lin2"' in out and not 'id="Lin3"' in out
+	assert [m.group(1) for m in re.finditer(r'<rect[^>]* id="([^"]+)"', out)] == ["Rec0", "Rec3"]
+	# with generated style classes too, content unchanged afterwards
+	out = sc.toString(pretty_print=False, window=Env(0, 0, 100, 10), styleclasses=True)
+	assert [m.group(1) for m in re.finditer(r'<rect[^>]* id="([^"]+)"', out)] == ["Rec0", "Rec2", "Rec3", "Rec4"]
+	# failing output, content restored all the same
+	before = sc.toString(pretty_print=False)
+	def failingOutput(*args, **kwargs):
+		raise RuntimeError("output failed")
+	monkeypatch.setattr(etree, "tostring", failingOutput)
+	with pytest.raises(RuntimeError):
+		sc.toString(window=Env(0, 0, 100, 10), styleclasses=True)
+	monkeypatch.undo()
+	assert sc.toString(pretty_print=False) == before and sc.getEl().get("viewBox") is None
+	for el in sc.getEl().find("defs").findall("linearGradient"):
+		el.getparent().remove(el)
+	assert sc.toString(pretty_print=False) == full
+	assert len(sc.findByTag("rect")) == 5
+
+def test_02Simplification():
+
+	line = [[0, 0], [1, 0.1], [2, -0.1], [3, 5], [4, 6], [5, 7], [6, 8.05], [7, 9]]
+	assert simplifyDP(line, 0.5).tolist() == [True, False, True, True, False, False, False, True]
+	assert simplifyVW(line, 0.5).tolist() == [True, False, True, True, False, False, False, True]
+	# rings keep closure and three distinct vertices
+	square = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+	assert simplifyDP(square, 100).tolist() == [True, True, True, False, True]
+	assert simplifyVW(square, 100).tolist() == [True, False, True, True, True]
+	assert simplifyDP(square[:-1], 100, ring=True).sum() == simplifyVW(square[:-1], 100, ring=True).sum() == 3
+	triangle = [[0, 0], [10, 0], [5, 1]]
+	assert simplifyDP(triangle, 5, ring=True).all() and simplifyVW(triangle, 5, ring=True).all()
+
+	# tolerance in output pixels: 10 user units per pixel
+	sc = SVGContent(Re(0,0,100,100)).setViewbox(VBox(0, 0, 1000, 1000))
+	assert sc.getPixelSize() == 10
+	pl = sc.addChild(Polyline())
+	pl.addPList([Pt(*p) for p in line], simplify="dp", tolerance=0.05)
+	assert pl.removedvertices == 4 and pl.getStruct().get("points") == "0,0 2,-0.1 3,5 7,9"
+	pg = sc.addChild(Polygon())
+	pg.addPList([Pt(*p) for p in square] + [Pt(0, 0)], simplify="vw", tolerance=0.01)
+	assert pg.removedvertices == 1 and pg.getStruct().get("points") == "0,0 10,0 10,10 0,10"
+	ap = sc.addChild(AnalyticalPath())
+	ap.addPolylineArray(np.array(line), simplify="vw", tolerance=0.05)
+	assert ap.removedvertices == 4 and ap.getStruct().get("d") == "M0 0 2-0.1 3 5l4 4"
+	with pytest.raises(AssertionError):
+		pl.addPList([Pt(0, 0)], simplify="other")
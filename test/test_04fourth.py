@@ -5,7 +5,7 @@ from test.testing import genFiles
 import cairosvg, pytest
 
 
-from rpSVG.Symbols import Arrow, Asterisk, Cylinder, CircArrow, CircAsterisk, CircRegPoly, CircStar, CircWedge, Crescent, Cross, CrossSight, Diamond, Donut, DonutPoly, RegPoly, Server, Square, SquaredArrow, Star, SuspPointCirc, SuspPointSquare, SuspPointTriang, Wedge, XSight, XSymb
+from rpSVG.Symbols import SYMBOL_GEOMETRY_CACHE, Arrow, Asterisk, Cylinder, CircArrow, CircAsterisk, CircRegPoly, CircStar, CircWedge, Crescent, Cross, CrossSight, Diamond, Donut, DonutPoly, RegPoly, Server, Square, SquaredArrow, Star, SuspPointCirc, SuspPointSquare, SuspPointTriang, Wedge, XSight, XSymb
 
 from rpSVG.Basics import GLOBAL_ENV, Pt, circleDividers
 from rpSVG.SVGStyleText import CSSSty, Sty
@@ -1123,3 +1123,56 @@ def test_04Symbols3():
 	genSymbols3(False)
 	genSymbols3(True)
 
+
+def test_04SymbolGeometryCache():
+
+	cache = SYMBOL_GEOMETRY_CACHE
+	cache.clear()
+	ds = []
+	for i in range(3):
+		sc = SVGContent(Re(0,0,200,200)).setIdentityViewbox()
+		st = sc.addChild(Star(20, 12, 5, rot=10))
+		sc.addChild(Star(20, 12, 5, rot=10))
+		sc.addChild(CircWedge(24, 40, indent=8, coffset=3))
+		sc.addChild(SuspPointTriang(8), todefs=True)
+		ds.append([p.getEl().get("d") for p in sc.findByTag("path")])
+	assert ds[0] == ds[1] == ds[2]
+	assert cache.stats()["misses"] == 3 and cache.hits == 3 * 4 - 3
+	# paths get copies, changes on them leave cached prototypes untouched
+	proto = cache.get((Star, 20, 12, 5, 10), None)
+	assert not st.cmds[0] is proto[0]
+	d = st.getEl().get("d")
+	st.cmds[0].yinvert(100)
+	st.refresh()
+	assert proto[0].y != st.cmds[0].y and st.getEl().get("d") != d
+
+	# rounding is part of the key
+	places = GLOBAL_ENV["ROUND"]["places"]
+	GLOBAL_ENV["ROUND"]["places"] = places + 1
+	try:
+		sc = SVGContent(Re(0,0,200,200))
+		sc.addChild(Star(20, 12, 5, rot=10))
+		assert cache.misses == 4
+	finally:
+		GLOBAL_ENV["ROUND"]["places"] = places
+
+	# symbols sharing their path building code, cached apart
+	sc = SVGContent(Re(0,0,200,200))
+	sc.addChild(SuspPointCirc(8), todefs=True)
+	sc.addChild(SuspPointSquare(8), todefs=True)
+	assert cache.misses == 6 and not cache.get((SuspPointCirc, 8), None) is cache.get((SuspPointSquare, 8), None)
+
+	cache.setSize(2)
+	assert len(cache) == 2
+	cache.clear()
+	for n in (3, 4, 3, 5, 4):
+		SVGContent(Re(0,0,200,200)).addChild(RegPoly(10, n))
+	assert cache.stats()["size"] == 2 and cache.misses == 4 and cache.hits == 1
+	cache.setSize(2, policy='fifo').clear()
+	for n in (3, 4, 3, 5, 4):
+		SVGContent(Re(0,0,200,200)).addChild(RegPoly(10, n))
+	assert cache.misses == 3 and cache.hits == 2
+	cache.setSize(0)
+	SVGContent(Re(0,0,200,200)).addChild(RegPoly(10, 3))
+	assert len(cache) == 0 and cache.misses == 4
+	cache.setSize(1024, policy='lru').clear()
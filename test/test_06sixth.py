@@ -519,3 +519,29 @@ def test_06TextBoxMultilineShapesNormal_():
 def test_06TextBoxMultilineShapesNormalYI():
 		sc = genTxBoxParagraph(True, '16pt', None)
 		genFiles(inspect.currentframe().f_code.co_name, sc)
+
+def test_06SymbolRegistry():
+
+	sc = SVGContent(Re(0,0,400,400))
+	xs = sc.getSymbol(XSight, 24, 36, 7, noyinvert=True)
+	assert sc.getSymbol(XSight, 24.0, 36, 7, noyinvert=True) is xs
+	assert not sc.getSymbol(XSight, 24, 36, 8, noyinvert=True) is xs
+	cyl = sc.getSymbol(Cylinder, 84, 58, pitch_ratio=0.3)
+	assert sc.getSymbol(Cylinder, 84, 58, pitch_ratio=0.3) is cyl and not sc.getSymbol(Cylinder, 84, 58) is cyl
+	assert len(sc.findByTag("symbol")) == 2 and len(sc.findByTag("path")) == 2 + 2 * 2
+
+	# text boxes of equal dimensions share their shape definition
+	for i in range(3):
+		tb = TextBox(10 + 100 * i, 10, 80, 40)
+		tb.setBaseShape(Server(0, 0, 0, rotation=18, projangle=145))
+		sc.addChild(tb)
+	tb = TextBox(10, 200, 80, 60)
+	tb.setBaseShape(Server(0, 0, 0, rotation=18, projangle=145))
+	sc.addChild(tb)
+	assert len(sc.findByTag("symbol")) == 4
+	uses = sc.findByTag("use")
+	assert len(uses) == 4 and len(set([u.getEl().get("{http://www.w3.org/1999/xlink}href") for u in uses])) == 2
+
+	# removed definitions are created again
+	xs.delEl()
+	assert not sc.getSymbol(XSight, 24, 36, 7, noyinvert=True) is xs